@@ -1,19 +1,124 @@
 import clickhouse_connect
 import pandas as pd
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 
+from client_pool import ClientPool, PooledClient
+from query_cache import QueryCache, cached, uncached
+from query_runs import QueryCancelled, RunRegistry
+from trading_calendar import TradingCalendar
+
 class QuantDB:
     """量化平台核心数据库交互类"""
 
-    def __init__(self, host='', port='', user='', password='', database=''):
-        """初始化 ClickHouse 客户端连接"""
-        self.client = clickhouse_connect.get_client(
-            host=host, 
-            port=port, 
-            username=user, 
-            password=password, 
-            database=database
-        )
+    def __init__(self, host='', port='', user='', password='', database='', cache_bytes=256 * 1024 ** 2,
+                 fetch_workers=8, pool_size=8, pool_timeout=30):
+        """初始化 ClickHouse 客户端连接池 (cache_bytes=0 关闭查询结果缓存)
+
+        self.client 为连接池代理: 每次查询由当前线程从池中取用一个客户端, 多个会话真正并行。
+        """
+        # 不使用 HTTP 会话: 会话会串行化同一会话内的请求并拒绝并发查询
+        def connect():
+            return clickhouse_connect.get_client(
+                host=host, 
+                port=port, 
+                username=user, 
+                password=password, 
+                database=database,
+                autogenerate_session_id=False
+            )
+
+        self.pool = ClientPool(connect, size=pool_size, timeout=pool_timeout)
+        with self.pool.checkout():
+            pass  # 预建首个连接, 配置错误时立即报错
+        self.runs = RunRegistry(kill=lambda sql: self.pool.call('command', sql))
+        self.client = PooledClient(self.pool, self.runs)
+        self.calendar = TradingCalendar(self.client)
+        self._lazy_alphas = None
+        self.cache = QueryCache(max_bytes=cache_bytes) if cache_bytes else None
+        self._executor = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix='quantdb-fetch')
+
+    @property
+    def lazy_alphas(self):
+        """Alpha 因子按需计算器 (首次使用时才加载因子引擎)"""
+        if self._lazy_alphas is None:
+            from lazy_alpha import LazyAlphaEvaluator
+            self._lazy_alphas = LazyAlphaEvaluator(self.client, calendar=self.calendar)
+        return self._lazy_alphas
+
+    def cache_info(self):
+        """查询结果缓存的命中/未命中统计与内存占用"""
+        return self.cache.info() if self.cache is not None else {}
+
+    def new_run(self, scope):
+        """当前线程开始作用域 scope (会话 + 页面) 的新一轮运行
+
+        本线程此后的查询 (含 fetch_many 并发查询) 均带该运行的 query_id; 同一作用域上一轮运行
+        仍在执行的查询在服务端被终止, 其线程后续发起的查询抛出 QueryCancelled。
+        """
+        return self.runs.new_run(scope)
+
+    def run_info(self):
+        """页面运行与查询取消统计 (取消次数、被取消查询已耗用及估计节省的服务端秒数)"""
+        return self.runs.info()
+
+    def pool_info(self):
+        """连接池占用、空闲、排队等待及重连统计"""
+        return self.pool.info()
+
+    def clear_cache(self):
+        """清空查询结果缓存"""
+        if self.cache is not None:
+            self.cache.clear()
+
+    def fetch_many(self, calls, timeout=30, timeouts=None):
+        """并发执行一批互不依赖的查询, 全部完成后一并返回
+
+        calls: {结果名: 可调用对象 或 (可调用对象, *位置参数)}, 如 {'ladder': (db.get_kpl_ladder, date)}
+        timeout: 单个查询的默认超时秒数; timeouts: {结果名: 秒数} 按查询覆盖
+        超时从该查询开始执行时计起 (在共享线程池中排队的时间不计入)。
+        返回 {结果名: 结果}; 任一查询失败或超时时抛出异常 (超时为 TimeoutError), 同批未完成的查询
+        在服务端被 KILL, 耗时约等于最慢的查询。
+        """
+        timeouts = timeouts or {}
+        limits = {key: timeouts.get(key, timeout) for key in calls}
+        run = self.runs.current()
+        started, tasks, futures = {}, {}, {}
+
+        def timed(key, func):
+            def call(*args):
+                started[key] = time.monotonic()
+                return func(*args)
+            return call
+
+        for key, call in calls.items():
+            func, args = (call[0], call[1:]) if isinstance(call, tuple) else (call, ())
+            tasks[key] = threading.Event()
+            bound = self.runs.bind(timed(key, func), run, tasks[key])
+            futures[key] = self._executor.submit(bound, *args)
+
+        pending = set(futures)
+        try:
+            while pending:
+                now = time.monotonic()
+                # 未开始的查询最早也要 limit 秒后才会超时
+                wait_for = min(started[k] + limits[k] - now if k in started else limits[k] for k in pending)
+                wait([futures[k] for k in pending], timeout=max(wait_for, 0), return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                for key in list(pending):
+                    if futures[key].done():
+                        pending.discard(key)
+                        futures[key].result()
+                    elif key in started and now >= started[key] + limits[key]:
+                        raise TimeoutError(f"查询 {key} 超时 ({limits[key]}s)")
+        except BaseException:
+            for key in pending:
+                if not futures[key].cancel():
+                    self.runs.cancel_task(tasks[key])
+            raise
+        return {key: future.result() for key, future in futures.items()}
 
     def _fix_code(self, code):
         """标准化证券代码格式"""
@@ -25,23 +130,33 @@ class QuantDB:
         return f"{code}.SH" if code.startswith('6') else f"{code}.SZ"
 
     def get_latest_trade_date(self):
-        """获取全库最新有效交易日期"""
-        sql = "SELECT max(trade_date) FROM market_stock_active_daily"
+        """获取全库最新有效交易日期 (内存交易日历)"""
         try:
-            res = self.client.query(sql).result_rows
-            return res[0][0] if res else datetime.now().date()
+            return self.calendar.latest()
+        except QueryCancelled:
+            raise   # 所属运行已被取代: 不以兜底日期继续
         except Exception:
             return datetime.now().date()
 
     def get_previous_trading_date(self, date_str):
-        """查询指定日期的前一个有效交易日"""
-        sql = f"SELECT max(trade_date) FROM market_stock_active_daily WHERE trade_date < '{date_str}'"
+        """查询指定日期的前一个有效交易日 (内存交易日历)"""
         try:
-            res = self.client.query(sql).result_rows
-            return res[0][0] if (res and res[0][0]) else None
+            return self.calendar.previous(date_str)
+        except QueryCancelled:
+            raise
         except Exception:
             return None
 
+    def _window_start(self, end_date, days, calendar_days):
+        """截至 end_date 最近 days 个交易日的首日; 交易日历不可用时退回按 calendar_days 个自然日估算"""
+        try:
+            return str(self.calendar.window_start(end_date, days))
+        except QueryCancelled:
+            raise
+        except Exception:
+            return (pd.to_datetime(end_date) - timedelta(days=calendar_days)).strftime("%Y-%m-%d")
+
+    @cached(ttl=3600)
     def get_stock_info(self, code):
         """查询个股基础属性：名称、行业、地域及上市时间"""
         code = self._fix_code(code)
@@ -50,8 +165,9 @@ class QuantDB:
             df = self.client.query_df(sql)
             return df.iloc[0].to_dict() if not df.empty else {'name': code, 'industry': '-', 'area': '-'}
         except Exception:
-            return {'name': code, 'industry': '-', 'area': '-'}
+            return uncached({'name': code, 'industry': '-', 'area': '-'})
 
+    @cached(ttl=600)
     def get_stock_available_range(self, stock_code):
         """查询特定个股在数据库中的日期覆盖范围"""
         code = self._fix_code(stock_code)
@@ -60,8 +176,9 @@ class QuantDB:
             res = self.client.query(sql).result_rows
             return res[0][0], res[0][1]
         except Exception:
-            return None, None
+            return uncached((None, None))
     
+    @cached(ttl=600)
     def get_stock_base_kline(self, stock_code, start_date, end_date):
         """获取指定时间范围的基础K线数据"""
         code = self._fix_code(stock_code)
@@ -74,6 +191,7 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=600)
     def get_stock_dynamic_indicators(self, stock_code, start_date, end_date, field_configs):
         """基于配置动态构建多表关联查询, 提取多维因子序列"""
         code = self._fix_code(stock_code)
@@ -98,6 +216,7 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=600)
     def get_stock_factor_snapshot(self, stock_code, target_date):
         """提取个股在特定日期的因子全景快照（涵盖技术、基本面、情绪、动量）"""
         code = self._fix_code(stock_code)
@@ -122,8 +241,9 @@ class QuantDB:
             df = self.client.query_df(sql)
             return df.iloc[0].to_dict() if not df.empty else {}
         except Exception:
-            return {}
+            return uncached({})
 
+    @cached(ttl=600)
     def get_stock_fundamentals_history(self, stock_code, start_date, end_date):
         """查询个股基本面历史财务指标及股本变更数据"""
         code = self._fix_code(stock_code)
@@ -136,6 +256,7 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=600)
     def get_industry_peers_snapshot(self, stock_code, date):
         """获取同行业（申万二级）中市值排名前列的对标个股快照数据"""
         code = self._fix_code(stock_code)
@@ -155,6 +276,7 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=600)
     def get_screener_data(self, date):
         """多表关联查询：提取选股器所需的全市场因子宽表快照"""
         sql = f"""
@@ -178,6 +300,7 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=600)
     def get_technical_vector(self, stock_code, date):
         """获取个股形态特征向量(基于 RSI, CCI, BIAS 指标)"""
         sql = f"SELECT rsi_14, cci_14, bias_20 FROM factor_db.factor_technical_daily WHERE stock_code = '{stock_code}' AND trade_date = '{date}'"
@@ -185,8 +308,9 @@ class QuantDB:
             res = self.client.query(sql).result_rows
             return res[0] if res else None
         except Exception:
-            return None
+            return uncached(None)
 
+    @cached(ttl=600)
     def find_similar_history(self, current_vector, current_date, top_n=3):
         """全库搜索：基于加权欧氏距离匹配历史形态最接近的个股样本"""
         tgt_rsi, tgt_cci, tgt_bias = current_vector
@@ -201,10 +325,24 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=600, live=True)
     def get_kline_window(self, stock_code, center_date, days_before=10, days_after=20):
-        """提取特定日期前后的K线序列, 并进行基准日价格归一化处理"""
-        start_date = (pd.to_datetime(center_date) - timedelta(days=days_before*2)).strftime("%Y-%m-%d")
-        end_date = (pd.to_datetime(center_date) + timedelta(days=days_after*2)).strftime("%Y-%m-%d")
+        """提取特定日期前后的K线序列, 并进行基准日价格归一化处理
+
+        day_offset 为相对基准日 (center_date 当日或之前最近交易日) 的市场交易日偏移, 窗口内停牌日
+        没有对应行 (序列变短但偏移不错位); 交易日历不可用时退回按该股自身行数计偏移。
+        """
+        try:
+            window = pd.DatetimeIndex(self.calendar.between(self.calendar.offset(center_date, -days_before),
+                                                            self.calendar.offset(center_date, days_after)))
+            center = window.get_loc(pd.Timestamp(self.calendar.offset(center_date, 0)))
+            start_date, end_date = window[0].strftime("%Y-%m-%d"), window[-1].strftime("%Y-%m-%d")
+        except QueryCancelled:
+            raise
+        except Exception:
+            window = None
+            start_date = (pd.to_datetime(center_date) - timedelta(days=days_before*2)).strftime("%Y-%m-%d")
+            end_date = (pd.to_datetime(center_date) + timedelta(days=days_after*2)).strftime("%Y-%m-%d")
         
         sql = f"SELECT trade_date, close_qfq AS close, pct_chg FROM market_stock_active_daily WHERE stock_code = '{stock_code}' AND trade_date >= '{start_date}' AND trade_date <= '{end_date}' ORDER BY trade_date"
         df = self.client.query_df(sql)
@@ -215,14 +353,19 @@ class QuantDB:
         
         try:
             idx = df[df['trade_date'] <= center_dt].index[-1]
-            start_idx, end_idx = max(0, idx - days_before), min(len(df), idx + days_after + 1)
-            df_slice = df.iloc[start_idx:end_idx].copy()
-            df_slice['day_offset'] = range(start_idx - idx, end_idx - idx)
+            if window is not None:
+                df_slice = df.copy()
+                df_slice['day_offset'] = window.get_indexer(df['trade_date']) - center
+            else:
+                start_idx, end_idx = max(0, idx - days_before), min(len(df), idx + days_after + 1)
+                df_slice = df.iloc[start_idx:end_idx].copy()
+                df_slice['day_offset'] = range(start_idx - idx, end_idx - idx)
             df_slice['norm_close'] = df_slice['close'] / df.iloc[idx]['close']
             return df_slice
         except Exception:
-            return pd.DataFrame()
+            return uncached(pd.DataFrame())
 
+    @cached(ttl=3600)
     def get_all_alpha_names(self):
         """通过元数据检索获取因子库中所有 Alpha 因子名称"""
         try:
@@ -230,8 +373,9 @@ class QuantDB:
             alphas = df[df['name'].str.startswith('alpha_')]['name'].tolist()
             return sorted(alphas)
         except Exception:
-            return [f"alpha_{i:03d}" for i in range(1, 102)] 
+            return uncached([f"alpha_{i:03d}" for i in range(1, 102)])
 
+    @cached(ttl=600)
     def get_alpha_performance_data(self, date, alpha_name):
         """获取单日因子分布及其对应的股票收益表现数据"""
         safe_alpha = alpha_name.replace("'", "")
@@ -243,8 +387,36 @@ class QuantDB:
             LEFT JOIN market_stock_active_daily AS t3 ON t1.stock_code = t3.stock_code AND t1.trade_date = t3.trade_date
             WHERE t1.trade_date = '{date}' AND t3.pct_chg IS NOT NULL AND t1.{safe_alpha} IS NOT NULL
         """
-        return self.client.query_df(sql)
+        df = self.client.query_df(sql)
+        if df.empty:
+            df = self._on_demand_cross_section(date, safe_alpha)
+            if isinstance(df, uncached):
+                return df   # 按需计算失败: 空结果不入缓存
+            if not df.empty:
+                df = df[df['pct_chg'].notna()].rename(columns={'alpha_val': 'alpha_value'})
+                df = df[['stock_code', 'stock_name', 'industry', 'alpha_value', 'pct_chg', 'close', 'amount']]
+                df.attrs['on_demand'] = True
+        return df
+
+    def _on_demand_cross_section(self, date, alpha_name):
+        """factor_db 缺失该日时, 按需计算单因子截面并关联名称、行业与当日行情"""
+        try:
+            values = self.lazy_alphas.compute(alpha_name, date, date)
+        except Exception:
+            return uncached(pd.DataFrame())
+        if values.empty:
+            return pd.DataFrame()
+        sql = f"""
+            SELECT t1.stock_code AS stock_code, t2.name AS stock_name, t2.industry AS industry,
+                   t1.pct_chg AS pct_chg, t1.close AS close, t1.amount AS amount
+            FROM market_stock_active_daily AS t1
+            LEFT JOIN meta_stock_info AS t2 ON t1.stock_code = t2.ts_code
+            WHERE t1.trade_date = '{date}'
+        """
+        market = self.client.query_df(sql)
+        return values[['stock_code', 'alpha_val']].merge(market, on='stock_code', how='left')
 
+    @cached(ttl=600)
     def get_cross_section_all_alphas(self, date):
         """获取全市场 Alpha 因子的横截面数据"""
         try:
@@ -252,7 +424,7 @@ class QuantDB:
             alpha_cols = df_desc[df_desc['name'].str.startswith('alpha_')]['name'].tolist()
             alpha_select = ", ".join([f"t1.{c} AS {c}" for c in alpha_cols])
         except Exception:
-            return pd.DataFrame() 
+            return uncached(pd.DataFrame())
 
         sql = f"""
             SELECT t1.stock_code AS stock_code, t2.pct_chg AS pct_chg, {alpha_select}
@@ -262,10 +434,11 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=600)
     def get_single_alpha_history(self, alpha_name, end_date, days=60):
-        """获取特定因子在指定时间范围内的历史数值序列"""
+        """获取特定因子在指定时间范围内的历史数值序列 (factor_db 未覆盖的交易日按需计算补齐)"""
         safe_alpha = alpha_name.replace("'", "")
-        start_date = (pd.to_datetime(end_date) - timedelta(days=days*1.5)).strftime("%Y-%m-%d")
+        start_date = self._window_start(end_date, days, days*1.5)
         sql = f"""
             SELECT t1.trade_date AS trade_date, t1.{safe_alpha} AS alpha_val, t2.pct_chg AS pct_chg
             FROM factor_db.factor_alphas_daily AS t1
@@ -274,8 +447,32 @@ class QuantDB:
               AND t2.pct_chg IS NOT NULL AND t1.{safe_alpha} IS NOT NULL
             ORDER BY t1.trade_date
         """
-        return self.client.query_df(sql)
+        df = self.client.query_df(sql)
+        try:
+            stored = set(pd.to_datetime(df['trade_date'])) if not df.empty else set()
+            missing = [pd.Timestamp(d) for d in self.calendar.between(start_date, end_date) if pd.Timestamp(d) not in stored]
+            if not missing:
+                return df
+            values = self.lazy_alphas.compute(safe_alpha, missing[0].date(), end_date)
+        except Exception:
+            return uncached(df)
+        values = values[values['trade_date'].isin(missing)]
+        if values.empty:
+            return df
+        returns = self.client.query_df(f"""
+            SELECT trade_date, stock_code, pct_chg FROM market_stock_active_daily
+            WHERE trade_date >= '{missing[0].date()}' AND trade_date <= '{end_date}' AND pct_chg IS NOT NULL
+        """)
+        returns['trade_date'] = pd.to_datetime(returns['trade_date'])
+        extra = values.merge(returns, on=['trade_date', 'stock_code'])[['trade_date', 'alpha_val', 'pct_chg']]
+        if not df.empty:
+            df['trade_date'] = pd.to_datetime(df['trade_date'])
+        df = pd.concat([df, extra], ignore_index=True) if not df.empty else extra
+        df = df.sort_values('trade_date', kind='stable').reset_index(drop=True)
+        df.attrs['on_demand'] = len(missing)
+        return df
 
+    @cached(ttl=600)
     def get_alpha_top_bottom_list(self, date, alpha_name, top_n=20):
         """查询当日因子值最高及最低的个股榜单"""
         safe_alpha = alpha_name.replace("'", "")
@@ -288,8 +485,18 @@ class QuantDB:
             WHERE t1.trade_date = '{date}' AND t1.{safe_alpha} IS NOT NULL
             ORDER BY t1.{safe_alpha} DESC
         """
-        return self.client.query_df(sql)
+        df = self.client.query_df(sql)
+        if df.empty:
+            df = self._on_demand_cross_section(date, safe_alpha)
+            if isinstance(df, uncached):
+                return df   # 按需计算失败: 空结果不入缓存
+            if not df.empty:
+                df = df.sort_values('alpha_val', ascending=False).reset_index(drop=True)
+                df = df[['stock_code', 'stock_name', 'industry', 'alpha_val', 'pct_chg', 'close']]
+                df.attrs['on_demand'] = True
+        return df
 
+    @cached(ttl=600)
     def get_sector_rotation_rank(self, date):
         """统计申万二级行业的核心财务、行情及动量指标排名"""
         sql = f"""
@@ -309,10 +516,10 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=600)
     def get_sector_index_history(self, sector_name, end_date_str, days=60):
         """获取行业指数（聚合计算）的历史走势、成交额及估值水平"""
-        end_dt = pd.to_datetime(end_date_str)
-        start_date = (end_dt - timedelta(days=days*1.5)).strftime("%Y-%m-%d")
+        start_date = self._window_start(end_date_str, days, days*1.5)
         safe_name = sector_name.replace("'", "")
         sql = f"""
             SELECT t1.trade_date AS trade_date, avg(t1.pct_chg) AS sector_chg,
@@ -326,6 +533,7 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=600)
     def get_sector_constituents(self, date, sector_name):
         """获取行业成分股表现明细及其基本面指标"""
         safe = sector_name.replace("'", "").split("-")[-1]
@@ -341,6 +549,7 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=600)
     def get_sector_data_enhanced(self, date):
         """获取行业热力图数据, 优先查询预计算表, 缺失则动态聚合"""
         df = self.client.query_df(f"SELECT name, pct_chg, heat, rank FROM rank_block_industry WHERE trade_date = '{date}' ORDER BY pct_chg DESC")
@@ -355,6 +564,7 @@ class QuantDB:
             return self.client.query_df(sql)
         return df
 
+    @cached(ttl=300)
     def get_market_index_daily(self, date):
         """查询当日各大市场指数的涨跌幅及收盘价"""
         sql = f"""
@@ -368,10 +578,12 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=300)
     def get_market_snapshot(self, date):
         """获取全市场个股当日涨跌幅及成交额原始快照"""
         return self.client.query_df(f"SELECT stock_code, pct_chg, amount FROM market_stock_active_daily WHERE trade_date = '{date}'")
 
+    @cached(ttl=300)
     def get_market_general_stats(self, date):
         """统计当日市场总体统计指标（总成交、中位数、涨跌家数）"""
         prev = self.get_previous_trading_date(str(date)) or date
@@ -387,13 +599,14 @@ class QuantDB:
         stats['prev_amt'] = prev_df.iloc[0]['total_amt'] if not prev_df.empty else stats['total_amt']
         return stats
 
+    @cached(ttl=300)
     def get_market_index_history(self, end_date_str, days=30):
         """获取主流市场指数的历史收盘价序列"""
-        end = pd.to_datetime(end_date_str)
-        start = (end - timedelta(days=days*1.5)).strftime("%Y-%m-%d")
+        start = self._window_start(end_date_str, days, days*1.5)
         codes = "'000001.SH','399001.SZ','399006.SZ','000688.SH','000016.SH','000905.SH'"
         return self.client.query_df(f"SELECT trade_date, stock_code, stock_name, close FROM market_index_daily WHERE stock_code IN ({codes}) AND trade_date >= '{start}' AND trade_date <= '{end_date_str}' ORDER BY trade_date")
 
+    @cached(ttl=300)
     def get_daily_limit_stats(self, date):
         """统计当日涨停、炸板及跌停（<-9.5%）个股家数"""
         sql = f"""
@@ -403,14 +616,17 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=300)
     def get_kpl_ladder(self, date):
         """查询涨停梯队详情：包含连板数、封板时间及题材原因"""
         return self.client.query_df(f"SELECT stock_code, stock_name, streak, reason, plate, limit_time, seal_amt FROM kpl_limit_up WHERE trade_date = '{date}'")
 
+    @cached(ttl=300)
     def get_limit_down_detail(self, date):
         """查询跌停板详情"""
         return self.client.query_df(f"SELECT stock_code, stock_name, streak, reason, plate, limit_time, seal_amt FROM kpl_limit_down WHERE trade_date = '{date}'")
 
+    @cached(ttl=300)
     def get_limit_broken_detail(self, date):
         """查询今日炸板个股及其当前行情数据"""
         sql = f"""
@@ -422,6 +638,7 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=300)
     def get_sentiment_factor_rank(self, date):
         """查询当日情绪类因子（如连板数、封单额）领先的股票排名"""
         sql = f"""
@@ -434,12 +651,14 @@ class QuantDB:
         """
         return self.client.query_df(sql)
 
+    @cached(ttl=300)
     def get_sentiment_trend(self, days=30):
         """获取近期市场涨跌停家数的历史趋势"""
         end = self.get_latest_trade_date()
-        start = (end - timedelta(days=days*2)).strftime("%Y-%m-%d")
+        start = self._window_start(end, days, days*2)
         return self.client.query_df(f"SELECT trade_date, toInt32(countIf(pct_chg > 9.5)) AS limit_up, toInt32(countIf(pct_chg < -9.5)) AS limit_down FROM market_stock_active_daily WHERE trade_date >= '{start}' GROUP BY trade_date ORDER BY trade_date")
 
+    @cached(ttl=300)
     def get_yesterday_limit_up_performance(self, current_date, prev_date):
         """计算昨日涨停个股在今日的平均收益表现"""
         sql = f"""
@@ -450,4 +669,4 @@ class QuantDB:
         try: 
             return self.client.query(sql).result_rows[0][0], None
         except Exception: 
-            return 0.0, None
\ No newline at end of file
+            return uncached((0.0, None))
\ No newline at end of file
@@ -0,0 +1,172 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from clickhouse_connect.driver.exceptions import OperationalError
+
+
+class ClientPool:
+    """有界 ClickHouse 客户端连接池
+
+    每个线程同一时刻最多占用一个客户端 (嵌套调用复用同一客户端); 池满时排队等待, 超时报错。
+    空闲超过 health_interval 秒的客户端在取出时先 ping 检查, 失效则重建。
+    """
+
+    def __init__(self, factory, size=8, timeout=30, health_interval=30):
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.stats = {'created': 0, 'checkouts': 0, 'waits': 0, 'wait_seconds': 0.0, 'max_wait': 0.0,
+                      'timeouts': 0, 'ping_failures': 0, 'reconnects': 0}
+        self._idle = queue.LifoQueue()  # (client, 归还时间)
+        self._created = 0
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _create(self):
+        client = self.factory()
+        with self._lock:
+            self.stats['created'] += 1
+        return client
+
+    def _acquire(self):
+        """取出空闲客户端; 无空闲且未达上限时新建, 否则排队等待"""
+        try:
+            client, returned = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = self._created < self.size
+                if grow:
+                    self._created += 1
+            if grow:
+                try:
+                    return self._create()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            start = time.monotonic()
+            try:
+                client, returned = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                with self._lock:
+                    self.stats['timeouts'] += 1
+                raise TimeoutError(f"等待数据库连接超时 ({self.timeout}s, 连接池上限 {self.size})") from None
+            waited = time.monotonic() - start
+            with self._lock:
+                self.stats['waits'] += 1
+                self.stats['wait_seconds'] += waited
+                self.stats['max_wait'] = max(self.stats['max_wait'], waited)
+
+        if time.monotonic() - returned > self.health_interval and not self._ping(client):
+            with self._lock:
+                self.stats['ping_failures'] += 1
+            client = self._replace(client)
+        return client
+
+    @staticmethod
+    def _ping(client):
+        try:
+            return bool(client.ping())
+        except Exception:
+            return False
+
+    def _replace(self, client):
+        """关闭失效客户端并新建一个替代 (占用名额不变)"""
+        try:
+            client.close()
+        except Exception:
+            pass
+        with self._lock:
+            self.stats['reconnects'] += 1
+        try:
+            return self._create()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    @contextmanager
+    def checkout(self):
+        """当前线程占用一个客户端; 嵌套调用直接复用"""
+        held = getattr(self._local, 'client', None)
+        if held is not None:
+            yield held
+            return
+        client = self._acquire()
+        with self._lock:
+            self.stats['checkouts'] += 1
+            self._in_use += 1
+        self._local.client = client
+        try:
+            yield client
+        finally:
+            client = self._local.client
+            self._local.client = None
+            with self._lock:
+                self._in_use -= 1
+            if client is not None:
+                self._idle.put((client, time.monotonic()))
+
+    def call(self, method, *args, **kwargs):
+        """在占用的客户端上执行 client.method(...); 连接类错误时重建客户端并重试一次"""
+        with self.checkout() as client:
+            try:
+                return getattr(client, method)(*args, **kwargs)
+            except OperationalError:
+                self._local.client = None
+                self._local.client = client = self._replace(client)
+                return getattr(client, method)(*args, **kwargs)
+
+    def info(self):
+        """连接池规模、占用/空闲数量及排队等待指标"""
+        with self._lock:
+            return {**self.stats, 'size': self.size, 'open': self._created,
+                    'in_use': self._in_use, 'idle': self._idle.qsize()}
+
+    def close(self):
+        while True:
+            try:
+                client, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                client.close()
+            except Exception:
+                pass
+            with self._lock:
+                self._created -= 1
+
+
+class PooledClient:
+    """与 clickhouse_connect 客户端同接口的代理, 每次调用从连接池取用客户端
+
+    给定 runs (RunRegistry) 时, 查询带上所属页面运行的 query_id, 以便被新一轮运行终止。
+    """
+
+    def __init__(self, pool, runs=None):
+        self.pool = pool
+        self.runs = runs
+
+    def _call(self, method, sql, *args, **kwargs):
+        if self.runs is None:
+            return self.pool.call(method, sql, *args, **kwargs)
+        with self.runs.track(sql) as query_id:
+            if query_id is not None:
+                kwargs['settings'] = {**(kwargs.get('settings') or {}), 'query_id': query_id}
+            return self.pool.call(method, sql, *args, **kwargs)
+
+    def query(self, *args, **kwargs):
+        return self._call('query', *args, **kwargs)
+
+    def query_df(self, *args, **kwargs):
+        return self._call('query_df', *args, **kwargs)
+
+    def command(self, *args, **kwargs):
+        return self._call('command', *args, **kwargs)
+
+    def insert_df(self, *args, **kwargs):
+        return self.pool.call('insert_df', *args, **kwargs)
@@ -0,0 +1,128 @@
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+# 因子引擎位于仓库 database/functions 目录, 按本文件位置定位
+FUNCTIONS_DIR = Path(__file__).resolve().parents[2] / 'database' / 'functions'
+if str(FUNCTIONS_DIR) not in sys.path:
+    sys.path.insert(0, str(FUNCTIONS_DIR))
+
+from alpha101_engine import Alpha101Engine
+from alpha101_formulas import default_library
+from alpha101_loader import FIELD_SQL, GROUP_TYPES
+
+
+class LazyAlphaEvaluator:
+    """factor_db 尚未覆盖的日期/股票池上的 Alpha 因子按需计算器
+
+    只拉取目标因子所需字段、所需最短回看窗口的日线数据, 只计算该因子的依赖子图,
+    结果按 (因子, 日期区间, 股票池) 缓存复用。
+    """
+
+    def __init__(self, client, max_entries=64, calendar=None):
+        self.client = client
+        self.calendar = calendar
+        self.library = default_library()
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()   # 多会话共享同一计算器
+
+    def trading_dates(self, start_date, end_date):
+        """区间内有行情的交易日 (升序)"""
+        if self.calendar is not None:
+            return [pd.Timestamp(d) for d in self.calendar.between(start_date, end_date)]
+        sql = f"""
+            SELECT DISTINCT trade_date FROM market_stock_active_daily
+            WHERE trade_date >= '{start_date}' AND trade_date <= '{end_date}'
+            ORDER BY trade_date
+        """
+        return [pd.Timestamp(r[0]) for r in self.client.query(sql).result_rows]
+
+    def _warmup_start(self, first_date, rows):
+        """first_date 之前第 rows 个交易日 (回看窗口起点)"""
+        if rows <= 0:
+            return pd.Timestamp(first_date)
+        if self.calendar is not None:
+            return pd.Timestamp(self.calendar.offset(first_date, -int(rows)))
+        sql = f"""
+            SELECT min(trade_date) FROM (
+                SELECT DISTINCT trade_date FROM market_stock_active_daily
+                WHERE trade_date < '{pd.Timestamp(first_date).date()}'
+                ORDER BY trade_date DESC LIMIT {int(rows)}
+            )
+        """
+        res = self.client.query(sql).result_rows
+        return pd.Timestamp(res[0][0]) if res and res[0][0] else pd.Timestamp(first_date)
+
+    def _load_panels(self, alpha_name, start, end, stocks=None):
+        """按因子依赖拉取 [start, end] 的日线并转为 日期 × 股票 面板"""
+        spec = self.library[alpha_name]
+        fields = [f for f in spec.inputs if f in FIELD_SQL]
+        join = ("LEFT JOIN stock_fundamental_daily AS f "
+                "ON t.stock_code = f.stock_code AND t.trade_date = f.trade_date") if 'cap' in fields else ""
+        universe = ""
+        if stocks:
+            universe = "AND t.stock_code IN (" + ", ".join(f"'{s}'" for s in stocks) + ")"
+        select = ", ".join(f"{FIELD_SQL[f]} AS {f}" for f in fields)
+        sql = f"""
+            SELECT t.trade_date AS trade_date, t.stock_code AS stock_code, {select}
+            FROM market_stock_active_daily AS t
+            {join}
+            WHERE t.trade_date >= '{start.date()}' AND t.trade_date <= '{end.date()}' {universe}
+        """
+        df = self.client.query_df(sql)
+        if df.empty:
+            return {}
+        df['trade_date'] = pd.to_datetime(df['trade_date'])
+        data = {f: Alpha101Engine.to_panel(df, f) for f in fields}
+
+        if spec.groups:
+            types = ", ".join(f"'{GROUP_TYPES[g]}'" for g in spec.groups)
+            rel = self.client.query_df(f"""
+                SELECT stock_code, sector_type, sector_name FROM rel_stock_sector
+                WHERE sector_type IN ({types})
+            """)
+            for group in spec.groups:
+                labels = rel[rel['sector_type'] == GROUP_TYPES[group]].drop_duplicates('stock_code')
+                data[group] = labels.set_index('stock_code')['sector_name']
+        return data
+
+    def compute(self, alpha_name, start_date, end_date, stocks=None):
+        """计算 [start_date, end_date] 内每个交易日的因子值
+
+        返回长表 trade_date, stock_code, alpha_val (与 factor_db 查询口径一致, 剔除空值)。
+        """
+        if alpha_name not in self.library:
+            raise KeyError(f"Unknown alpha {alpha_name!r}")
+        dates = self.trading_dates(start_date, end_date)
+        key = (alpha_name, tuple(dates), tuple(sorted(stocks)) if stocks else None)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+            else:
+                self.stats['misses'] += 1
+        if cached is not None:
+            return cached.copy()
+
+        result = pd.DataFrame(columns=['trade_date', 'stock_code', 'alpha_val'])
+        if dates:
+            start = self._warmup_start(dates[0], self.library[alpha_name].lookback - 1)
+            data = self._load_panels(alpha_name, start, dates[-1], stocks)
+            if data:
+                panel = self.library.compute(data, [alpha_name])[alpha_name]
+                panel = panel.reindex(pd.DatetimeIndex(dates, name='trade_date'))
+                panel.columns.name = 'stock_code'
+                result = Alpha101Engine.from_panel(panel, 'alpha_val').reset_index()
+
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result.copy()
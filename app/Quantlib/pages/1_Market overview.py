@@ -2,11 +2,11 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from utils import get_db_connection
+from utils import get_page_db
 
 # 页面基础配置：采用宽屏模式
 st.set_page_config(page_title="市场综述 - 宏观量化全景", layout="wide")
-db = get_db_connection()
+db = get_page_db('Market overview')
 
 # ================= 1. 全局状态初始化 =================
 if 'global_date' not in st.session_state:
@@ -3,10 +3,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from utils import get_db_connection
+from utils import get_page_db
 
 st.set_page_config(page_title="市场情绪监控", layout="wide")
-db = get_db_connection()
+db = get_page_db('Sentiment radar')
 
 # ================= 1. 全局状态与控制面板 =================
 if 'global_date' not in st.session_state:
@@ -32,17 +32,26 @@ st.title("市场情绪量化")
 
 # ================= 2. 数据获取与预处理 =================
 try:
-    df_stats = db.get_daily_limit_stats(date_str)
-    df_stats_comp = db.get_daily_limit_stats(comp_date_str)
-    df_ladder = db.get_kpl_ladder(date_str)
-    df_down_detail = db.get_limit_down_detail(date_str)
-    df_snap = db.get_market_snapshot(date_str)
-    df_snap_comp = db.get_market_snapshot(comp_date_str)
-    df_trend = db.get_sentiment_trend(days=30)
-    df_broken = db.get_limit_broken_detail(date_str)
-    zt_premium, _ = db.get_yesterday_limit_up_performance(date_str, str(prev_date))
-    df_factors = db.get_sentiment_factor_rank(date_str)
-    
+    # 各查询互不依赖, 并发执行: 页面耗时约等于最慢的单个查询
+    data = db.fetch_many({
+        'stats': (db.get_daily_limit_stats, date_str),
+        'stats_comp': (db.get_daily_limit_stats, comp_date_str),
+        'ladder': (db.get_kpl_ladder, date_str),
+        'down_detail': (db.get_limit_down_detail, date_str),
+        'snap': (db.get_market_snapshot, date_str),
+        'snap_comp': (db.get_market_snapshot, comp_date_str),
+        'trend': (db.get_sentiment_trend, 30),
+        'broken': (db.get_limit_broken_detail, date_str),
+        'premium': (db.get_yesterday_limit_up_performance, date_str, str(prev_date)),
+        'factors': (db.get_sentiment_factor_rank, date_str),
+    }, timeout=30)
+    df_stats, df_stats_comp = data['stats'], data['stats_comp']
+    df_ladder, df_down_detail = data['ladder'], data['down_detail']
+    df_snap, df_snap_comp = data['snap'], data['snap_comp']
+    df_trend, df_broken = data['trend'], data['broken']
+    zt_premium, _ = data['premium']
+    df_factors = data['factors']
+
     def safe_numeric(df, cols):
         """类型强制转换工具：确保分析维度为数值型"""
         for col in cols:
@@ -1,9 +1,9 @@
 import streamlit as st
 import pandas as pd
-from utils import get_db_connection
+from utils import get_page_db
 
 st.set_page_config(page_title="多因子选股器", layout="wide")
-db = get_db_connection()
+db = get_page_db('Smart screener')
 
 # 初始化全局交易日期状态
 if 'global_date' not in st.session_state:
@@ -22,7 +22,6 @@ with st.sidebar:
     date_str = str(st.session_state['global_date'])
 
 # ================= 2. 数据获取与预处理 =================
-@st.cache_data(ttl=600)
 def load_screener_data(d):
     """从数据库获取全市场截面因子数据"""
     return db.get_screener_data(d)
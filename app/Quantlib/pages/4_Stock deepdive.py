@@ -2,10 +2,10 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from utils import get_db_connection
+from utils import get_page_db
 
 st.set_page_config(page_title="个股深度研究", layout="wide")
-db = get_db_connection()
+db = get_page_db('Stock deepdive')
 
 st.title("个股深度研究")
 
@@ -4,10 +4,10 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from scipy.stats import spearmanr
-from utils import get_db_connection
+from utils import get_page_db
 
 st.set_page_config(page_title="Alpha 因子看板", layout="wide")
-db = get_db_connection()
+db = get_page_db('Alpha lab')
 
 if 'global_date' not in st.session_state:
     st.session_state['global_date'] = db.get_latest_trade_date()
@@ -100,6 +100,8 @@ with tab_deep:
         df_hist.columns = [c.split('.')[-1] for c in df_hist.columns]
         
         st.subheader(f"因子稳定性与单调性分析 (Performance Analysis: {target_alpha})")
+        if df_hist.attrs.get('on_demand'):
+            st.caption(f"因子库尚未覆盖其中 {df_hist.attrs['on_demand']} 个交易日，已基于日线行情按需实时计算补齐。")
 
         daily_ic = df_hist.groupby('trade_date').apply(
             lambda x: spearmanr(x['alpha_val'], x['pct_chg'])[0]
@@ -3,10 +3,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from utils import get_db_connection
+from utils import get_page_db
 
 st.set_page_config(page_title="行业轮动量化面板", layout="wide")
-db = get_db_connection()
+db = get_page_db('Sector rotation')
 
 # ================= 1. 全局状态管理 =================
 if 'global_date' not in st.session_state:
@@ -24,7 +24,6 @@ with st.sidebar:
     date_str = str(st.session_state['global_date'])
 
 # ================= 2. 行业数据加载 =================
-@st.cache_data(ttl=600)
 def load_sector_data(target_date):
     """
     调取指定日期的行业截面汇总数据。
@@ -0,0 +1,199 @@
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from query_runs import QueryCancelled
+
+_MISS = object()
+
+
+def _normalize(name, value):
+    """参数归一化: 日期统一为 YYYY-MM-DD, 容器转为可哈希元组"""
+    if value is None:
+        return None
+    if 'date' in name:
+        try:
+            return pd.Timestamp(value).strftime('%Y-%m-%d')
+        except (TypeError, ValueError):
+            return str(value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(k, v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        items = [_normalize('', v) for v in value]
+        return tuple(sorted(items)) if isinstance(value, set) else tuple(items)
+    return value
+
+
+def _sizeof(value):
+    """结果占用内存估算 (字节)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _copy(value):
+    """返回副本, 避免调用方原地修改污染缓存"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, (dict, list)):
+        return value.copy()
+    return value
+
+
+class uncached:
+    """查询异常时的兜底返回值: 装饰器原样返回 value, 但不写入缓存 (避免瞬时故障被长期缓存)"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class QueryCache:
+    """跨会话共享的查询结果缓存 (LRU + 内存上限 + 按方法 TTL)
+
+    只涉及历史交易日的结果常驻 (仅受 LRU 淘汰); 涉及最新交易日 (或不含日期参数) 的结果
+    按方法 TTL 过期, 并在全库最新交易日推进时整体失效。
+    """
+
+    def __init__(self, max_bytes=256 * 1024 ** 2, latest_poll=60):
+        self.max_bytes = max_bytes
+        self.latest_poll = latest_poll
+        self.nbytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'invalidated': 0}
+        self.methods = {}
+        self._entries = OrderedDict()   # key -> (value, size, expires_at, live_date)
+        self._lock = threading.RLock()
+        self._latest = None
+        self._latest_checked = 0.0
+
+    def latest(self, fetch):
+        """当前最新交易日 (每 latest_poll 秒最多查询一次), 推进时失效最新日相关条目
+
+        fetch 失败时异常原样抛出, 已记录的最新交易日保持不变, 下次调用重新查询。
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._latest is not None and now - self._latest_checked < self.latest_poll:
+                return self._latest
+        latest = pd.Timestamp(fetch()).strftime('%Y-%m-%d')
+        with self._lock:
+            self._latest_checked = now
+            if latest != self._latest:
+                stale = [k for k, e in self._entries.items() if e[3] is not None and e[3] < latest]
+                for key in stale:
+                    self._drop(key)
+                self.stats['invalidated'] += len(stale)
+                self._latest = latest
+            return latest
+
+    def get(self, key):
+        with self._lock:
+            counter = self.methods.setdefault(key[0], {'hits': 0, 'misses': 0})
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] < time.monotonic():
+                self._drop(key)
+                self.stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                counter['misses'] += 1
+                return _MISS
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            counter['hits'] += 1
+            return entry[0]
+
+    def put(self, key, value, ttl=None, live_date=None):
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + ttl if (live_date is not None and ttl) else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, expires, live_date)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.stats['evictions'] += 1
+
+    def _drop(self, key):
+        self.nbytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def info(self):
+        """命中/未命中计数、条目数、内存占用及各方法命中情况"""
+        with self._lock:
+            hits, misses = self.stats['hits'], self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+                'entries': len(self._entries),
+                'bytes': self.nbytes,
+                'latest_date': self._latest,
+                'methods': {k: dict(v) for k, v in self.methods.items()},
+            }
+
+
+def cached(ttl=600, live=False):
+    """QuantDB 查询方法缓存装饰器
+
+    以 (方法名, 归一化参数) 为键; 参数名含 date 的视为日期参数, 其最大值早于最新交易日的结果
+    常驻缓存, 否则按 ttl 秒过期。live=True 表示结果总依赖最新数据 (如含向后窗口的查询)。
+    方法以 uncached(兜底值) 返回的结果只返回给调用方, 不入缓存; 最新交易日取自 self.calendar,
+    查询失败 (最新日未知) 时结果同样不入缓存。
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.cache
+            if cache is None:
+                value = method(self, *args, **kwargs)
+                return value.value if isinstance(value, uncached) else value
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = tuple((k, _normalize(k, v)) for k, v in list(bound.arguments.items())[1:])
+            key = (method.__name__, params)
+            try:
+                latest = cache.latest(self.calendar.latest)
+            except QueryCancelled:
+                raise           # 所属运行已被取代, 由调用方停止本轮运行
+            except Exception:
+                latest = None   # 交易日历暂不可用: 不改动共享的最新交易日, 本次结果也不入缓存
+            value = cache.get(key)
+            if value is not _MISS:
+                return _copy(value)
+
+            value = method(self, *args, **kwargs)
+            if isinstance(value, uncached):
+                return value.value
+            if latest is None:
+                return value
+            runs = getattr(self, 'runs', None)
+            if runs is not None and runs.superseded():
+                return value    # 查询可能已被取消, 结果不入缓存
+            dates = [v for k, v in params if 'date' in k and v is not None]
+            historical = not live and dates and max(dates) < latest
+            cache.put(key, value, ttl, None if historical else latest)
+            return _copy(value)
+
+        return wrapper
+    return decorator
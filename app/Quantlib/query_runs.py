@@ -0,0 +1,134 @@
+import hashlib
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+MAX_SHAPES = 1000
+
+
+class QueryCancelled(RuntimeError):
+    """所属页面运行已被同一作用域的新一轮运行取代"""
+
+
+def _fingerprint(sql):
+    """去除字面量后的 SQL 形态, 用于统计同类查询的平均耗时"""
+    shape = re.sub(r"'[^']*'|\b\d+(\.\d+)?\b", '?', sql)
+    return re.sub(r"\s+", ' ', shape).strip()
+
+
+class RunRegistry:
+    """按作用域 (会话 + 页面) 管理页面运行及其在途查询
+
+    每个查询带上 query_id = qdb-<作用域摘要>-<运行序号>-<随机串>; 同一作用域开始新一轮运行时,
+    上一轮仍在执行的查询通过 KILL QUERY 在服务端终止, 上一轮线程之后发起的查询直接拒绝。
+    bind 时可附带任务取消标记 (threading.Event), cancel_task 只终止该任务的查询 (如 fetch_many 超时)。
+    """
+
+    def __init__(self, kill):
+        self.kill = kill
+        self.stats = {'runs': 0, 'queries': 0, 'cancelled': 0, 'rejected': 0, 'kill_errors': 0,
+                      'cancelled_seconds': 0.0, 'reclaimed_seconds': 0.0}
+        self._runs = {}        # 作用域 -> 当前运行序号
+        self._inflight = {}    # query_id -> (作用域, 运行序号, 开始时间, SQL 形态, 任务)
+        self._durations = {}   # SQL 形态 -> 平均耗时 (指数滑动平均)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def new_run(self, scope):
+        """当前线程开始作用域 scope 的新一轮运行, 并终止上一轮的在途查询"""
+        with self._lock:
+            run = self._runs.get(scope, 0) + 1
+            self._runs[scope] = run
+            self.stats['runs'] += 1
+            stale = {qid: info for qid, info in self._inflight.items()
+                     if info[0] == scope and info[1] is not None and info[1] < run}
+        self._local.run = (scope, run)
+        if stale:
+            self._cancel(stale)
+        return run
+
+    def current(self):
+        return getattr(self._local, 'run', None)
+
+    def superseded(self):
+        """当前线程所属运行是否已被取代 (其查询结果可能因取消而不完整)"""
+        run = self.current()
+        with self._lock:
+            return run is not None and self._runs.get(run[0], 0) > run[1]
+
+    def bind(self, func, run, task=None):
+        """让 func 在其他线程 (如 fetch_many 工作线程) 中归属同一页面运行, 其查询另记入任务 task"""
+        def bound(*args, **kwargs):
+            previous = self.current(), getattr(self._local, 'task', None)
+            self._local.run, self._local.task = run, task
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.run, self._local.task = previous
+        return bound
+
+    def cancel_task(self, task):
+        """终止任务 task 的在途查询, 其线程之后发起的查询抛出 QueryCancelled"""
+        task.set()
+        with self._lock:
+            stale = {qid: info for qid, info in self._inflight.items() if info[4] is task}
+        if stale:
+            self._cancel(stale)
+
+    def _cancel(self, stale):
+        now = time.monotonic()
+        ids = ", ".join(f"'{qid}'" for qid in stale)
+        try:
+            self.kill(f"KILL QUERY WHERE query_id IN ({ids}) ASYNC")
+        except Exception:
+            with self._lock:
+                self.stats['kill_errors'] += 1
+            return
+        with self._lock:
+            for scope, run, start, shape, _ in stale.values():
+                elapsed = now - start
+                self.stats['cancelled'] += 1
+                self.stats['cancelled_seconds'] += elapsed
+                self.stats['reclaimed_seconds'] += max(self._durations.get(shape, elapsed) - elapsed, 0.0)
+
+    @contextmanager
+    def track(self, sql):
+        """为当前线程的查询分配 query_id 并登记为在途; 不属于任何运行或任务时返回 None"""
+        run = self.current()
+        task = getattr(self._local, 'task', None)
+        if run is None and task is None:
+            yield None
+            return
+        scope, number = run if run is not None else ('task', None)
+        shape = _fingerprint(sql)
+        with self._lock:
+            if number is not None and self._runs.get(scope, 0) > number:
+                self.stats['rejected'] += 1
+                raise QueryCancelled(f"页面运行 {scope}#{number} 已被新一轮运行取代")
+            if task is not None and task.is_set():
+                self.stats['rejected'] += 1
+                raise QueryCancelled("所属任务已被取消 (超时或同批查询失败)")
+            digest = hashlib.blake2b(scope.encode(), digest_size=6).hexdigest()
+            query_id = f"qdb-{digest}-{number or 0}-{uuid.uuid4().hex[:8]}"
+            self._inflight[query_id] = (scope, number, time.monotonic(), shape, task)
+            self.stats['queries'] += 1
+        ok = False
+        try:
+            yield query_id
+            ok = True
+        finally:
+            with self._lock:
+                _, _, start, _, _ = self._inflight.pop(query_id)
+                if ok:
+                    elapsed = time.monotonic() - start
+                    if len(self._durations) > MAX_SHAPES:
+                        self._durations.clear()
+                    previous = self._durations.get(shape)
+                    self._durations[shape] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+
+    def info(self):
+        """运行数、查询数、取消/拒绝数、被取消查询已耗用及估计节省的服务端时间"""
+        with self._lock:
+            return {**self.stats, 'inflight': len(self._inflight), 'scopes': len(self._runs)}
@@ -0,0 +1,101 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+class TradingCalendar:
+    """内存交易日历: 有序交易日数组, 前后/偏移查找均为二分 O(log n)
+
+    首次使用时从 market_stock_active_daily 一次性加载; 之后每 refresh_interval 秒最多检查一次
+    max(trade_date), 出现新交易日时只增量追加新日期。
+    """
+
+    def __init__(self, client, refresh_interval=60):
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self._days = np.empty(0, dtype='datetime64[D]')
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def _load(self, after=None):
+        where = f"WHERE trade_date > '{after}'" if after is not None else ""
+        sql = f"SELECT DISTINCT trade_date FROM market_stock_active_daily {where} ORDER BY trade_date"
+        rows = self.client.query(sql).result_rows
+        return np.array([_day(r[0]) for r in rows], dtype='datetime64[D]')
+
+    def refresh(self, force=False):
+        """加载 (首次) 或增量追加新交易日; 未到检查间隔时直接返回"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._checked is not None and now - self._checked < self.refresh_interval:
+                return
+            if not len(self._days):
+                self._days = self._load()
+            else:
+                res = self.client.query("SELECT max(trade_date) FROM market_stock_active_daily").result_rows
+                if res and res[0][0] and _day(res[0][0]) > self._days[-1]:
+                    self._days = np.concatenate([self._days, self._load(after=self._days[-1])])
+            self._checked = now
+
+    @property
+    def days(self):
+        self.refresh()
+        return self._days
+
+    def __len__(self):
+        return len(self.days)
+
+    def __contains__(self, date):
+        days = self.days
+        i = np.searchsorted(days, _day(date))
+        return i < len(days) and days[i] == _day(date)
+
+    @staticmethod
+    def _date(day):
+        return pd.Timestamp(day).date()
+
+    def latest(self):
+        """最新交易日"""
+        days = self.days
+        if not len(days):
+            raise LookupError("交易日历为空")
+        return self._date(days[-1])
+
+    def previous(self, date):
+        """date 之前 (不含) 的最近交易日, 不存在时返回 None"""
+        days = self.days
+        i = np.searchsorted(days, _day(date), side='left')
+        return self._date(days[i - 1]) if i > 0 else None
+
+    def next(self, date):
+        """date 之后 (不含) 的最近交易日, 不存在时返回 None"""
+        days = self.days
+        i = np.searchsorted(days, _day(date), side='right')
+        return self._date(days[i]) if i < len(days) else None
+
+    def offset(self, date, n):
+        """以 date 当日 (非交易日取之前最近交易日) 为基准偏移 n 个交易日, 越界时截断到日历首尾"""
+        days = self.days
+        if not len(days):
+            raise LookupError("交易日历为空")
+        base = np.searchsorted(days, _day(date), side='right') - 1
+        if base < 0 and n > 0:
+            base, n = 0, n - 1   # date 早于日历起点: 以首个交易日为第 1 个
+        return self._date(days[min(max(base + n, 0), len(days) - 1)])
+
+    def window_start(self, end_date, days):
+        """截至 end_date 的最近 days 个交易日的首日 (精确区间, 替代按自然日估算)"""
+        return self.offset(end_date, -(days - 1))
+
+    def between(self, start_date, end_date):
+        """[start_date, end_date] 内的交易日"""
+        days = self.days
+        lo = np.searchsorted(days, _day(start_date), side='left')
+        hi = np.searchsorted(days, _day(end_date), side='right')
+        return [self._date(d) for d in days[lo:hi]]
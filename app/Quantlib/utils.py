@@ -1,5 +1,6 @@
 import streamlit as st
 import plotly.graph_objects as go
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from QuantDB import QuantDB
 
 @st.cache_resource
@@ -16,6 +17,17 @@ def get_db_connection():
         password=''
     )
 
+def get_page_db(page):
+    """
+    获取数据库连接并登记本次页面运行。
+    同一会话同一页面的新一轮 rerun (如拖动日期控件) 会终止上一轮仍在服务端执行的查询。
+    """
+    db = get_db_connection()
+    ctx = get_script_run_ctx()
+    session_id = ctx.session_id if ctx is not None else 'local'
+    db.new_run(f"{session_id}:{page}")
+    return db
+
 def init_page_config(page_title="Quant Platform"):
     """
     统一初始化页面布局与全局样式。
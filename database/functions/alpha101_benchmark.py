@@ -0,0 +1,264 @@
+"""
+Benchmark Suite for Alpha101Engine.
+
+Generates synthetic A-share-like OHLCV panels (random-walk prices, staggered
+listings, multi-day suspensions as NaN gaps, Shenwan-style group labels) at
+several scales, times every engine operator and a representative set of
+alphas, and reports throughput (cells/sec) and peak traced memory. Results
+can be saved as a baseline JSON and later runs compared against it with a
+relative slowdown threshold; the CLI exits with status 1 on a regression.
+
+    python alpha101_benchmark.py --scale small --save bench_small.json
+    python alpha101_benchmark.py --scale small --baseline bench_small.json --threshold 0.2
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from alpha101_engine import Alpha101Engine
+from alpha101_expr import compile_formulas, load_formulas
+
+TRADING_DAYS = 244
+
+# name: (stocks, years)
+SCALES = {
+    'tiny': (100, 1),
+    'small': (500, 1),
+    'medium': (2000, 5),
+    'large': (5000, 15),
+}
+
+# Alphas covering deep TS/CS chains, wide windows, moments, decay and neutralization.
+REPRESENTATIVE_ALPHAS = ('alpha_001', 'alpha_013', 'alpha_025', 'alpha_044', 'alpha_062',
+                         'alpha_074', 'alpha_087', 'alpha_096', 'alpha_101')
+
+WINDOW = 10
+
+
+def synthetic_panels(n_stocks: int, n_dates: int, seed: int = 0, suspension_rate: float = 0.002) -> dict:
+    """Random-walk OHLCV panels (dates × stocks) with listings and suspensions as NaN."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2010-01-04', periods=n_dates, name='trade_date')
+    columns = pd.Index([f'{i:06d}.{"SH" if i % 2 else "SZ"}' for i in range(n_stocks)], name='stock_code')
+    shape = (n_dates, n_stocks)
+
+    returns = rng.standard_t(4, shape) * rng.uniform(0.01, 0.03, n_stocks)
+    close = rng.uniform(3, 80, n_stocks) * np.exp(np.cumsum(np.clip(returns, -0.1, 0.1), axis=0))
+    open_ = close * np.exp(rng.normal(0, 0.008, shape))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, shape)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, shape)))
+    volume = rng.lognormal(13, 0.8, n_stocks) * rng.lognormal(0, 0.5, shape)
+    vwap = np.clip((open_ + high + low + close) / 4 * np.exp(rng.normal(0, 0.002, shape)), low, high)
+
+    # Staggered listings: some stocks only start part-way through the history.
+    missing = np.arange(n_dates)[:, None] < np.where(rng.random(n_stocks) < 0.2,
+                                                     rng.integers(0, n_dates, n_stocks), 0)
+    # Suspensions: runs of 1-20 days starting at random dates.
+    starts = rng.random(shape) < suspension_rate
+    lengths = rng.integers(1, 21, shape)
+    for row, col in zip(*np.nonzero(starts)):
+        missing[row:row + lengths[row, col], col] = True
+
+    frame = lambda a: pd.DataFrame(np.where(missing, np.nan, a), index=index, columns=columns)
+    data = {
+        'open': frame(open_), 'high': frame(high), 'low': frame(low), 'close': frame(close),
+        'volume': frame(volume), 'vwap': frame(vwap), 'amount': frame(volume * vwap),
+        'cap': frame(close * rng.lognormal(21, 1, n_stocks)),
+    }
+    sector = rng.integers(0, 31, n_stocks)
+    data['sector'] = pd.Series(sector, index=columns)
+    data['industry'] = pd.Series(sector * 4 + rng.integers(0, 4, n_stocks), index=columns)
+    data['subindustry'] = pd.Series(data['industry'].to_numpy() * 2 + rng.integers(0, 2, n_stocks), index=columns)
+    return data
+
+
+def operator_cases(data: dict) -> dict:
+    """{name: zero-argument callable} exercising every engine operator once."""
+    E, x, y = Alpha101Engine, data['close'], data['volume']
+    cases = {
+        'delay': lambda: E.delay(x, WINDOW),
+        'delta': lambda: E.delta(x, WINDOW),
+        'correlation': lambda: E.correlation(x, y, WINDOW),
+        'covariance': lambda: E.covariance(x, y, WINDOW),
+        'ts_min': lambda: E.ts_min(x, WINDOW),
+        'ts_max': lambda: E.ts_max(x, WINDOW),
+        'ts_argmax': lambda: E.ts_argmax(x, WINDOW),
+        'ts_argmin': lambda: E.ts_argmin(x, WINDOW),
+        'ts_rank': lambda: E.ts_rank(x, WINDOW),
+        'sum': lambda: E.sum(x, WINDOW),
+        'product': lambda: E.product(x / E.delay(x, 1), WINDOW),
+        'stddev': lambda: E.stddev(x, WINDOW),
+        'decay_linear': lambda: E.decay_linear(x, WINDOW),
+        'rank': lambda: E.rank(x),
+        'scale': lambda: E.scale(x),
+        'indneutralize': lambda: E.indneutralize(x, data['industry']),
+        'signedpower': lambda: E.signedpower(x - E.delay(x, 1), 2.0),
+        'if_else': lambda: E.if_else(x > y, x, y),
+    }
+    return cases
+
+
+def reference_cases(data: dict) -> dict:
+    """pandas/rolling.apply implementations kept for validating kernels (slow)."""
+    E, x, y = Alpha101Engine, data['close'], data['volume']
+    return {
+        'ref:sum': lambda: E._ref_sum(x, WINDOW),
+        'ref:stddev': lambda: E._ref_stddev(x, WINDOW),
+        'ref:ts_argmax': lambda: E._ref_ts_argmax(x, WINDOW),
+        'ref:ts_rank': lambda: E._ref_ts_rank(x, WINDOW),
+        'ref:decay_linear': lambda: E._ref_decay_linear(x, WINDOW),
+        'ref:correlation': lambda: E._ref_correlation(x, y, WINDOW),
+        'ref:rank': lambda: E._ref_rank(x),
+        'ref:indneutralize': lambda: E._ref_indneutralize(x, data['industry']),
+    }
+
+
+def alpha_cases(data: dict, names=REPRESENTATIVE_ALPHAS) -> dict:
+    """Representative alphas one by one, plus the full shared graph of all 101."""
+    formulas = load_formulas()
+    cases = {}
+    for name in names:
+        graph = compile_formulas({name: formulas[name]})
+        cases[name] = lambda graph=graph: graph.evaluate(data)
+    full = compile_formulas(formulas)
+    cases['all_101'] = lambda: full.evaluate(data)
+    return cases
+
+
+def measure(func, cells: int, repeat: int = 3) -> dict:
+    """Best-of-`repeat` wall time, throughput and peak traced bytes of one case."""
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': seconds, 'cells_per_sec': cells / seconds if seconds > 0 else float('inf'),
+            'peak_bytes': peak}
+
+
+def run_suite(scale: str = 'small', repeat: int = 3, include_reference: bool = False,
+              include_alphas: bool = True, seed: int = 0) -> dict:
+    """Time all cases at one scale; returns {case: measurement}."""
+    n_stocks, years = SCALES[scale]
+    data = synthetic_panels(n_stocks, years * TRADING_DAYS, seed)
+    cells = data['close'].size
+    cases = operator_cases(data)
+    if include_reference:
+        cases.update(reference_cases(data))
+    if include_alphas:
+        cases.update(alpha_cases(data))
+    results = {}
+    for name, func in cases.items():
+        results[name] = measure(func, cells, 1 if name == 'all_101' or name.startswith('ref:') else repeat)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.2) -> pd.DataFrame:
+    """Per-case ratio to the baseline time; `regression` marks slowdowns beyond the threshold."""
+    rows = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        ratio = current['seconds'] / baseline[name]['seconds']
+        rows.append({'case': name, 'baseline_s': baseline[name]['seconds'], 'current_s': current['seconds'],
+                     'ratio': ratio, 'peak_ratio': current['peak_bytes'] / max(baseline[name]['peak_bytes'], 1),
+                     'regression': ratio > 1 + threshold})
+    columns = ['case', 'baseline_s', 'current_s', 'ratio', 'peak_ratio', 'regression']
+    return pd.DataFrame(rows, columns=columns).astype({'regression': bool}).set_index('case')
+
+
+def precision_report(data: dict, dtype='float32', formulas: dict = None,
+                     tolerance: float = 1e-4) -> pd.DataFrame:
+    """Per-alpha deviation of a reduced-precision run from the float64 run.
+
+    `max_abs_dev` is taken over cells finite in both runs, `max_rel_dev`
+    scales it by the largest float64 magnitude of the alpha, `share_off`
+    is the fraction of those cells off by more than `tolerance` on that
+    scale (mostly rank ties broken differently), and `finite_mismatch`
+    counts cells finite in only one of the runs.
+    """
+    graph = compile_formulas(load_formulas() if formulas is None else formulas)
+    names = list(graph.outputs)
+    with Alpha101Engine.precision(np.float64):
+        reference = graph.evaluate(data)
+    with Alpha101Engine.precision(dtype):
+        reduced = graph.evaluate(data)
+    rows = {}
+    for name in names:
+        ref = reference[name].to_numpy(dtype=np.float64)
+        low = reduced[name].to_numpy(dtype=np.float64)
+        both = np.isfinite(ref) & np.isfinite(low)
+        dev = np.abs(ref - low)[both]
+        top = np.abs(ref[both]).max() if both.any() else 0.0
+        rows[name] = {
+            'max_abs_dev': dev.max() if dev.size else 0.0,
+            'max_rel_dev': dev.max() / top if dev.size and top > 0 else 0.0,
+            'share_off': float((dev > tolerance * top).mean()) if dev.size else 0.0,
+            'finite_mismatch': int((np.isfinite(ref) != np.isfinite(low)).sum()),
+        }
+    frame = pd.DataFrame.from_dict(rows, orient='index')
+    frame.index.name = 'alpha'
+    return frame.sort_values('max_rel_dev', ascending=False)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Alpha101Engine benchmark suite')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--reference', action='store_true', help='also time the pandas reference operators')
+    parser.add_argument('--no-alphas', action='store_true', help='only time single operators')
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='compare against results saved with --save')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed relative slowdown')
+    parser.add_argument('--precision', metavar='DTYPE',
+                        help='also time all_101 in DTYPE and report per-alpha deviation from float64')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.scale, args.repeat, args.reference, not args.no_alphas)
+    table = pd.DataFrame(results).T
+    table['peak_mb'] = table.pop('peak_bytes') / 2 ** 20
+    print(f"scale={args.scale} stocks×years={SCALES[args.scale]}")
+    print(table.to_string(float_format=lambda v: f'{v:,.4g}'))
+
+    if args.precision:
+        n_stocks, years = SCALES[args.scale]
+        data = synthetic_panels(n_stocks, years * TRADING_DAYS)
+        full = compile_formulas(load_formulas())
+        with Alpha101Engine.precision(args.precision):
+            reduced = measure(lambda: full.evaluate(data), data['close'].size, 1)
+        print(f"all_101 in {args.precision}: {reduced['seconds']:.4g}s, peak {reduced['peak_bytes'] / 2 ** 20:,.1f} MB")
+        print(precision_report(data, args.precision).to_string(float_format=lambda v: f'{v:.3g}'))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'scale': args.scale, 'results': results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('scale') != args.scale:
+            print(f"Baseline was recorded at scale {baseline.get('scale')!r}", file=sys.stderr)
+            return 2
+        report = compare(results, baseline['results'], args.threshold)
+        if report.empty:
+            print("No comparable cases: the baseline shares no case with this run", file=sys.stderr)
+            return 2
+        print(report.to_string(float_format=lambda v: f'{v:,.3f}'))
+        if report['regression'].any():
+            print(f"Regressions beyond {args.threshold:.0%}: {', '.join(report.index[report['regression']])}",
+                  file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Content-Addressed Checkpoint Cache for Alpha101 evaluation.
+
+Replaces the existence check on ``cache_alpha101/p{N}.parquet``. Every
+alpha output and every value materialized between TS/CS stages is stored
+per calendar month under a key that hashes
+
+* the node's canonical expression,
+* the operator code version (source of the engine, kernels and compiler),
+* a fingerprint of the input rows the month depends on, including the
+  lookback reaching into earlier months, and the first date available.
+
+A partition is reused whenever its key still matches, so editing one
+formula only recomputes the nodes that formula no longer shares, and
+extending the date range only computes the new months (plus their
+lookback). Files are evicted least-recently-used once the cache exceeds
+its size bound.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from alpha101_expr import AlphaGraph
+from alpha101_planner import plan_stages
+
+MODULE_DIR = Path(__file__).parent
+VERSIONED_SOURCES = ('alpha101_engine.py', 'alpha101_kernels.py', 'alpha101_expr.py')
+
+
+def operator_version() -> str:
+    """Digest of the operator sources; any change invalidates every partition."""
+    digest = hashlib.blake2b(digest_size=8)
+    for name in VERSIONED_SOURCES:
+        digest.update((MODULE_DIR / name).read_bytes())
+    return digest.hexdigest()
+
+
+class CheckpointCache:
+    """Month-partitioned Parquet store with LRU eviction (by file mtime)."""
+
+    def __init__(self, root='cache_alpha101', max_bytes: int = 20 * 1024 ** 3):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._sizes = {p: p.stat().st_size for p in self.root.rglob('*.parquet')}
+
+    def path(self, label: str, month, key: str) -> Path:
+        return self.root / label / f"{month}-{key}.parquet"
+
+    def contains(self, label: str, month, key: str) -> bool:
+        return self.path(label, month, key) in self._sizes
+
+    def get(self, label: str, month, key: str):
+        """Cached partition, or None; a hit refreshes its LRU position."""
+        path = self.path(label, month, key)
+        if path not in self._sizes:
+            self.stats['misses'] += 1
+            return None
+        os.utime(path)
+        self.stats['hits'] += 1
+        return pd.read_parquet(path)
+
+    def put(self, label: str, month, key: str, frame: pd.DataFrame):
+        path = self.path(label, month, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in path.parent.glob(f"{month}-*.parquet"):
+            self._remove(stale)
+        frame.to_parquet(path)
+        self._sizes[path] = path.stat().st_size
+        self.stats['writes'] += 1
+
+    def size(self) -> int:
+        return sum(self._sizes.values())
+
+    def evict(self):
+        """Drop least-recently-used partitions until the cache fits `max_bytes`."""
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        for path in sorted(self._sizes, key=lambda p: p.stat().st_mtime):
+            total -= self._sizes[path]
+            self._remove(path)
+            self.stats['evictions'] += 1
+            if total <= self.max_bytes:
+                break
+
+    def _remove(self, path: Path):
+        self._sizes.pop(path, None)
+        path.unlink(missing_ok=True)
+
+
+class _Keys:
+    """Partition keys for the nodes of one evaluation."""
+
+    def __init__(self, graph: AlphaGraph, data: dict, names: list):
+        self.data = data
+        self.index = data['close'].index
+        self.version = operator_version()
+        self.depth = graph.depths(names)
+        periods = self.index.to_period('M')
+        bounds = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1], True])
+        self.months = [(str(periods[a]).replace('-', ''), int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+        self.fields = {}
+        for node in graph.required(names):
+            own = {node.params[0]} if node.op == 'input' else set()
+            self.fields[node.id] = own.union(*(self.fields[a.id] for a in node.args))
+        self._month_digest = {}
+
+    def _digest(self, field: str, month: int) -> bytes:
+        if (field, month) not in self._month_digest:
+            value = self.data[field]
+            digest = hashlib.blake2b(digest_size=16)
+            if isinstance(value, pd.DataFrame):
+                _, start, stop = self.months[month]
+                rows = value.iloc[start:stop]
+                digest.update(np.ascontiguousarray(rows.to_numpy(dtype=np.float64)).tobytes())
+                digest.update(','.join(map(str, rows.columns)).encode())
+            else:
+                digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+            self._month_digest[field, month] = digest.digest()
+        return self._month_digest[field, month]
+
+    def key(self, node, month: int) -> str:
+        _, start, _ = self.months[month]
+        first_row = max(0, start - self.depth[node.id] + 1)
+        first_month = next(i for i, (_, a, b) in enumerate(self.months) if a <= first_row < b)
+        digest = hashlib.blake2b(digest_size=10)
+        digest.update(f"{self.version}|{node.expr}|{self.index[first_row]}".encode())
+        for field in sorted(self.fields[node.id]):
+            for covered in range(first_month, month + 1):
+                digest.update(self._digest(field, covered))
+        return digest.hexdigest()
+
+
+def cached_evaluate(graph: AlphaGraph, data: dict, cache: CheckpointCache, names=None) -> dict:
+    """Evaluate alphas on dates × stocks panels, reusing every still-valid cached partition."""
+    names = list(graph.outputs) if names is None else list(names)
+    plan = plan_stages(graph, names)
+    keys = _Keys(graph, data, names)
+    labels = {graph.outputs[n].id: n for n in names}
+    checkpoints = {k for stage in plan.stages for k in stage.materialize} | set(labels)
+
+    def label(node_id):
+        return labels.get(node_id) or f"node-{hashlib.blake2b(graph.nodes[node_id].expr.encode(), digest_size=8).hexdigest()}"
+
+    key = {(k, m): keys.key(graph.nodes[k], m) for k in checkpoints for m in range(len(keys.months))}
+    cached = {(k, m) for (k, m), h in key.items() if cache.contains(label(k), keys.months[m][0], h)}
+
+    lo = len(keys.index)
+    missing = [(graph.outputs[n].id, m) for n in names for m in range(len(keys.months))
+               if (graph.outputs[n].id, m) not in cached]
+    computed = {}
+    if missing:
+        lo = max(0, min(keys.months[m][1] - keys.depth[k] + 1 for k, m in missing))
+        covered = [m for m, (_, a, b) in enumerate(keys.months) if b > lo]
+        computed = _compute_range(graph, data, cache, keys, key, cached, label, checkpoints,
+                                  {k for k, _ in missing}, covered, lo)
+
+    outputs = {}
+    for name in names:
+        node_id = graph.outputs[name].id
+        parts = []
+        for m, (month, start, stop) in enumerate(keys.months):
+            # Computed rows are exact only once the output's own lookback lies inside the
+            # window; earlier months (kept cached, since every missing one is exact) load.
+            exact = lo == 0 or start - keys.depth[node_id] + 1 >= lo
+            if node_id in computed and exact:
+                parts.append(computed[node_id].iloc[start - lo:stop - lo])
+            else:
+                parts.append(cache.get(name, month, key[node_id, m]))
+        outputs[name] = pd.concat(parts)
+    # Evict only after the run, so partitions planned for loading stay on disk.
+    cache.evict()
+    return outputs
+
+
+def _compute_range(graph, data, cache, keys, key, cached, label, checkpoints, targets, covered, lo):
+    """Evaluate `targets` on rows [lo, end), loading fully cached checkpoints instead of computing them."""
+    window = {k: v.iloc[lo:] if isinstance(v, pd.DataFrame) else v for k, v in data.items()}
+    load, compute, stack = set(), set(), list(targets)
+    while stack:
+        node_id = stack.pop()
+        if node_id in load or node_id in compute:
+            continue
+        if node_id not in targets and node_id in checkpoints and all((node_id, m) in cached for m in covered):
+            load.add(node_id)
+            continue
+        compute.add(node_id)
+        stack.extend(a.id for a in graph.nodes[node_id].args)
+
+    order = [n for n in graph.nodes if n.id in load or n.id in compute]
+    remaining = {}
+    for node in order:
+        if node.id in compute:
+            for child in set(node.args):
+                remaining[child.id] = remaining.get(child.id, 0) + 1
+    values = {}
+    for node in order:
+        if node.id in load:
+            parts = [cache.get(label(node.id), keys.months[m][0], key[node.id, m]) for m in covered]
+            values[node.id] = pd.concat(parts).iloc[lo - keys.months[covered[0]][1]:]
+        else:
+            values[node.id] = graph._compute(node, [values[a.id] for a in node.args], window)
+            _store(node, values[node.id], cache, keys, key, cached, label, checkpoints, covered, lo)
+            for child in set(node.args):
+                remaining[child.id] -= 1
+                if remaining[child.id] == 0 and child.id not in targets:
+                    del values[child.id]
+    return {k: values[k] for k in targets}
+
+
+def _store(node, value, cache, keys, key, cached, label, checkpoints, covered, lo):
+    """Write the months of a computed checkpoint whose lookback lies inside the window."""
+    if node.id not in checkpoints or not isinstance(value, pd.DataFrame):
+        return
+    for m in covered:
+        month, start, stop = keys.months[m]
+        exact = lo == 0 or start - keys.depth[node.id] + 1 >= lo
+        if exact and (node.id, m) not in cached:
+            cache.put(label(node.id), month, key[node.id, m], value.iloc[start - lo:stop - lo].astype(np.float64))
+            cached.add((node.id, m))
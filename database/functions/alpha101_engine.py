@@ -1,112 +1,308 @@
+import threading
+from contextlib import contextmanager
+from typing import Union
+
 import numpy as np
 import pandas as pd
 from scipy.stats import rankdata
 
-class Alpha101Engine:
+import alpha101_kernels as kernels
+
+# Operators accept either a single stock's Series or a dates × stocks panel.
+Frame = Union[pd.Series, pd.DataFrame]
+
+# Storage dtype set by Alpha101Engine.precision, per thread.
+_PRECISION = threading.local()
+
+
+class _EngineType(type):
+    @property
+    def dtype(cls) -> np.dtype:
+        """Storage dtype of the calling thread (float64 unless inside `precision`)."""
+        return getattr(_PRECISION, 'dtype', cls.default_dtype)
+
+
+class Alpha101Engine(metaclass=_EngineType):
     """
     Alpha 101 Quantitative Factor Computation Engine.
     
     Implementation based on WorldQuant's "101 Formulaic Alphas" using NumPy 
     and Pandas for vectorized time-series and cross-sectional operations.
+
+    Every operator also runs in panel mode: pass a DataFrame indexed by
+    trade_date with one column per stock and the whole market is computed in
+    one vectorized pass. Time-series operators work down the columns, and
+    column ``c`` of the result equals the Series result for ``panel[c]``.
+    Cross-sectional operators work across each row.
+
+    Kernel results are stored as ``Alpha101Engine.dtype`` (float64 unless
+    changed through `precision` in the calling thread); the kernels
+    themselves always accumulate rolling sums, moments and group means in
+    float64.
     """
 
+    default_dtype = np.dtype(np.float64)
+
+    @staticmethod
+    @contextmanager
+    def precision(dtype='float32'):
+        """Store panels and operator results as `dtype` inside the `with` block,
+        e.g. float32 for half the memory of a full run.
+
+        The setting is per thread, so concurrent sessions keep their own dtype;
+        threads started inside the block use the default."""
+        previous = Alpha101Engine.dtype
+        _PRECISION.dtype = np.dtype(dtype)
+        try:
+            yield
+        finally:
+            _PRECISION.dtype = previous
+
+    @staticmethod
+    def profile(track_memory: bool = True):
+        """Opt-in instrumentation: `with Alpha101Engine.profile() as prof:` records
+        per-operator and per-alpha time and memory (see alpha101_profiler)."""
+        from alpha101_profiler import EngineProfiler
+        return EngineProfiler(track_memory)
+
+    # --------------------------------------------------------------------------
+    # Panel Layout (Long <-> Dates × Stocks)
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def to_panel(df: pd.DataFrame, field: str, index: str = 'trade_date',
+                 columns: str = 'stock_code') -> pd.DataFrame:
+        """Pivot long-format rows into a sorted dates × stocks panel for one field.
+
+        Days on which a stock has no row (suspensions, pre-listing) become NaN,
+        so windows spanning them yield NaN exactly as a Series reindexed to the
+        full trading calendar would.
+        """
+        panel = df.pivot(index=index, columns=columns, values=field)
+        return panel.sort_index().sort_index(axis=1).astype(Alpha101Engine.dtype)
+
+    @staticmethod
+    def from_panel(panel: pd.DataFrame, name: str = None,
+                   index: pd.MultiIndex = None) -> pd.Series:
+        """Stack a panel back to a long Series keyed by (trade_date, stock_code).
+
+        Pass the original long index to keep exactly the input rows, including
+        those whose result is NaN; otherwise all-NaN cells are dropped.
+        """
+        stacked = panel.stack()
+        stacked = stacked.reindex(index) if index is not None else stacked.dropna()
+        return stacked.rename(name)
+
+    @staticmethod
+    def _apply_kernel(series: Frame, kernel, *args) -> Frame:
+        """Run a 2-D NumPy kernel over a Series or panel and restore its labels."""
+        values = series.to_numpy().reshape(len(series), -1)
+        return Alpha101Engine._restore(kernel(values, *args), series)
+
+    @staticmethod
+    def _restore(out: np.ndarray, like: Frame) -> Frame:
+        """Label a 2-D kernel result like `like`, stored in the engine dtype."""
+        out = out.astype(Alpha101Engine.dtype, copy=False)
+        if isinstance(like, pd.DataFrame):
+            return pd.DataFrame(out, index=like.index, columns=like.columns, copy=False)
+        return pd.Series(out[:, 0], index=like.index, name=like.name)
+
     # --------------------------------------------------------------------------
     # Time-Series Operators (Temporal Operations)
     # --------------------------------------------------------------------------
 
     @staticmethod
-    def delay(series: pd.Series, period: int) -> pd.Series:
+    def delay(series: Frame, period: int) -> Frame:
         """Lag operator: Shifts the series back by a specified period."""
         return series.shift(period)
 
     @staticmethod
-    def delta(series: pd.Series, period: int) -> pd.Series:
+    def delta(series: Frame, period: int) -> Frame:
         """Difference operator: Calculates x_t - x_{t-n}."""
         return series.diff(period)
 
     @staticmethod
-    def correlation(x: pd.Series, y: pd.Series, window: int) -> pd.Series:
+    def moments(x: Frame, y: Frame, window: int) -> dict:
+        """Fused Rolling Moments: mean_x, mean_y, var_x, var_y, cov and corr from one pass."""
+        x, y = x.align(y)
+        values_x = x.to_numpy(dtype=np.float64).reshape(len(x), -1)
+        values_y = y.to_numpy(dtype=np.float64).reshape(len(y), -1)
+        out = kernels.rolling_moments(values_x, values_y, window)
+        return {k: Alpha101Engine._restore(v, x) for k, v in out.items()}
+
+    @staticmethod
+    def correlation(x: Frame, y: Frame, window: int) -> Frame:
         """Rolling Correlation: Computes Pearson correlation coefficient over a sliding window."""
-        return x.rolling(window=window).corr(y)
+        return Alpha101Engine.moments(x, y, window)['corr']
 
     @staticmethod
-    def covariance(x: pd.Series, y: pd.Series, window: int) -> pd.Series:
+    def covariance(x: Frame, y: Frame, window: int) -> Frame:
         """Rolling Covariance: Computes the covariance between two series over a sliding window."""
-        return x.rolling(window=window).cov(y)
+        return Alpha101Engine.moments(x, y, window)['cov']
 
     @staticmethod
-    def ts_min(series: pd.Series, window: int) -> pd.Series:
+    def ts_min(series: Frame, window: int) -> Frame:
         """Rolling Minimum: Returns the minimum value within a sliding window."""
-        return series.rolling(window=window).min()
+        out = series.rolling(window=window).min().to_numpy()
+        return Alpha101Engine._restore(out.reshape(len(series), -1), series)
 
     @staticmethod
-    def ts_max(series: pd.Series, window: int) -> pd.Series:
+    def ts_max(series: Frame, window: int) -> Frame:
         """Rolling Maximum: Returns the maximum value within a sliding window."""
-        return series.rolling(window=window).max()
+        out = series.rolling(window=window).max().to_numpy()
+        return Alpha101Engine._restore(out.reshape(len(series), -1), series)
 
     @staticmethod
-    def ts_argmax(series: pd.Series, window: int) -> pd.Series:
+    def ts_argmax(series: Frame, window: int) -> Frame:
         """Temporal Argmax: Returns the relative index of the maximum value within the window."""
-        return series.rolling(window).apply(lambda x: float(np.argmax(x)), raw=True)
+        return Alpha101Engine._apply_kernel(series, kernels.rolling_argmax, window)
 
     @staticmethod
-    def ts_argmin(series: pd.Series, window: int) -> pd.Series:
+    def ts_argmin(series: Frame, window: int) -> Frame:
         """Temporal Argmin: Returns the relative index of the minimum value within the window."""
-        return series.rolling(window).apply(lambda x: float(np.argmin(x)), raw=True)
+        return Alpha101Engine._apply_kernel(series, kernels.rolling_argmin, window)
 
     @staticmethod
-    def ts_rank(series: pd.Series, window: int) -> pd.Series:
+    def ts_rank(series: Frame, window: int) -> Frame:
         """Rolling Rank: Computes the percentile rank of the current value within a sliding window."""
-        def _rank_last(arr):
-            return rankdata(arr)[-1]
-        return series.rolling(window).apply(_rank_last, raw=True)
+        return Alpha101Engine._apply_kernel(series, kernels.rolling_rank_last, window)
 
     @staticmethod
-    def sum(series: pd.Series, window: int) -> pd.Series:
+    def sum(series: Frame, window: int) -> Frame:
         """Rolling Sum: Computes the sum of values over a sliding window."""
-        return series.rolling(window).sum()
+        return Alpha101Engine._apply_kernel(series, kernels.rolling_sum, window)
 
     @staticmethod
-    def product(series: pd.Series, window: int) -> pd.Series:
+    def product(series: Frame, window: int) -> Frame:
         """Rolling Product: Computes the geometric product using log-transformation for numerical stability."""
-        return np.exp(np.log(series).rolling(window).sum())
+        return np.exp(Alpha101Engine._apply_kernel(np.log(series), kernels.rolling_sum, window))
 
     @staticmethod
-    def stddev(series: pd.Series, window: int) -> pd.Series:
+    def stddev(series: Frame, window: int) -> Frame:
         """Rolling Standard Deviation: Computes the volatility over a sliding window."""
-        return series.rolling(window).std()
+        return Alpha101Engine._apply_kernel(series, kernels.rolling_std, window)
 
     @staticmethod
-    def decay_linear(series: pd.Series, window: int) -> pd.Series:
+    def decay_linear(series: Frame, window: int) -> Frame:
         """Linear Decay Weighted Moving Average: Computes LWMA with weights 1 to d."""
-        weights = np.arange(1, window + 1)
-        w_sum = weights.sum()
-        return series.rolling(window).apply(lambda x: np.dot(x, weights) / w_sum, raw=True)
+        return Alpha101Engine._apply_kernel(series, kernels.rolling_lwma, window)
 
     # --------------------------------------------------------------------------
     # Cross-Sectional Operators (Spatial Operations)
     # --------------------------------------------------------------------------
 
     @staticmethod
-    def rank(series: pd.Series) -> pd.Series:
+    def rank(series: Frame) -> Frame:
         """Cross-Sectional Rank: Normalizes the series into percentile ranks [0, 1]."""
+        if isinstance(series, pd.DataFrame):
+            return Alpha101Engine._restore(kernels.row_rank_pct(series.to_numpy()), series)
         return series.rank(pct=True)
 
     @staticmethod
-    def scale(series: pd.Series, target: float = 1.0) -> pd.Series:
+    def scale(series: Frame, target: float = 1.0) -> Frame:
         """Rescaling Operator: Rescales the series such that sum(abs(x)) equals the target value."""
+        if isinstance(series, pd.DataFrame):
+            return Alpha101Engine._restore(kernels.row_scale(series.to_numpy(dtype=np.float64), target), series)
         return series.mul(target).div(np.abs(series).sum())
 
+    @staticmethod
+    def indneutralize(series: Frame, groups: Frame) -> Frame:
+        """Industry Neutralization: Subtracts the cross-sectional mean of each industry group.
+
+        For panels, `groups` is either a panel of group labels or a Series of
+        one label per stock applied to every date (e.g. SW1/SW2/SW3 codes).
+        """
+        if not isinstance(series, pd.DataFrame):
+            return series - series.groupby(groups).transform('mean')
+        if isinstance(groups, pd.Series):
+            codes, _ = pd.factorize(groups.reindex(series.columns))
+        else:
+            codes, _ = pd.factorize(groups.reindex_like(series).to_numpy().ravel())
+            codes = codes.reshape(series.shape)
+        result = kernels.group_demean(series.to_numpy(dtype=np.float64), codes)
+        return Alpha101Engine._restore(result, series)
+
     # --------------------------------------------------------------------------
     # Mathematical and Logical Operators
     # --------------------------------------------------------------------------
 
     @staticmethod
-    def signedpower(series: pd.Series, exponent: float) -> pd.Series:
+    def signedpower(series: Frame, exponent: float) -> Frame:
         """Signed Power: Computes sign(x) * |x|^a to preserve the direction of the signal."""
         return np.sign(series) * (np.abs(series) ** exponent)
 
     @staticmethod
-    def if_else(condition: pd.Series, x: pd.Series, y: pd.Series) -> pd.Series:
+    def if_else(condition: Frame, x: Frame, y: Frame) -> Frame:
         """Element-wise Conditional: Returns x if condition is true, otherwise y."""
-        return np.where(condition, x, y)
\ No newline at end of file
+        result = np.where(condition, x, y)
+        if isinstance(condition, pd.DataFrame):
+            return pd.DataFrame(result, index=condition.index, columns=condition.columns)
+        return result
+
+    # --------------------------------------------------------------------------
+    # Reference Implementations (pandas, kept for validating kernels)
+    # --------------------------------------------------------------------------
+
+    @staticmethod
+    def _ref_ts_argmax(series: Frame, window: int) -> Frame:
+        """Per-window np.argmax through rolling.apply."""
+        return series.rolling(window).apply(lambda x: float(np.argmax(x)), raw=True)
+
+    @staticmethod
+    def _ref_ts_argmin(series: Frame, window: int) -> Frame:
+        """Per-window np.argmin through rolling.apply."""
+        return series.rolling(window).apply(lambda x: float(np.argmin(x)), raw=True)
+
+    @staticmethod
+    def _ref_ts_rank(series: Frame, window: int) -> Frame:
+        """Per-window scipy rankdata through rolling.apply."""
+        def _rank_last(arr):
+            return rankdata(arr)[-1]
+        return series.rolling(window).apply(_rank_last, raw=True)
+
+    @staticmethod
+    def _ref_decay_linear(series: Frame, window: int) -> Frame:
+        """Per-window weighted dot product through rolling.apply."""
+        weights = np.arange(1, window + 1)
+        w_sum = weights.sum()
+        return series.rolling(window).apply(lambda x: np.dot(x, weights) / w_sum, raw=True)
+
+    @staticmethod
+    def _ref_correlation(x: Frame, y: Frame, window: int) -> Frame:
+        """Pairwise rolling correlation through pandas."""
+        return x.rolling(window=window).corr(y)
+
+    @staticmethod
+    def _ref_covariance(x: Frame, y: Frame, window: int) -> Frame:
+        """Pairwise rolling covariance through pandas."""
+        return x.rolling(window=window).cov(y)
+
+    @staticmethod
+    def _ref_sum(series: Frame, window: int) -> Frame:
+        """Running-sum rolling window through pandas."""
+        return series.rolling(window).sum()
+
+    @staticmethod
+    def _ref_stddev(series: Frame, window: int) -> Frame:
+        """Rolling sample standard deviation through pandas."""
+        return series.rolling(window).std()
+
+    @staticmethod
+    def _ref_rank(series: pd.DataFrame) -> pd.DataFrame:
+        """Row-wise percentile rank through pandas."""
+        return series.rank(axis=1, pct=True)
+
+    @staticmethod
+    def _ref_scale(series: pd.DataFrame, target: float = 1.0) -> pd.DataFrame:
+        """Row-wise L1 rescaling through pandas."""
+        return series.mul(target).div(np.abs(series).sum(axis=1), axis=0)
+
+    @staticmethod
+    def _ref_indneutralize(series: pd.DataFrame, groups: Frame) -> pd.DataFrame:
+        """Per-date group de-meaning through a stacked pandas groupby."""
+        if isinstance(groups, pd.Series):
+            groups = pd.DataFrame(np.tile(groups.reindex(series.columns).to_numpy(), (len(series), 1)),
+                                  index=series.index, columns=series.columns)
+        stacked = series.stack()
+        keys = [stacked.index.get_level_values(0), groups.reindex_like(series).stack().reindex(stacked.index)]
+        return (stacked - stacked.groupby(keys).transform('mean')).unstack().reindex_like(series)
@@ -0,0 +1,435 @@
+"""
+Alpha Expression Compiler for Alpha101Engine.
+
+Parses the formulas of ``alpha101_function.md`` into one shared DAG of
+engine operators. Identical subexpressions (``rank(volume)``, ``delta(close, 1)``,
+``returns``, ``adv20`` ...) are interned once across all alphas, so every
+shared node is evaluated once per run and released as soon as its last
+consumer has been computed.
+"""
+
+import re
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from alpha101_engine import Alpha101Engine
+
+FORMULA_FILE = Path(__file__).with_name('alpha101_function.md')
+
+# Raw panels expected by the evaluator (dates × stocks).
+INPUTS = ('open', 'high', 'low', 'close', 'volume', 'vwap', 'amount', 'cap')
+
+# Industry classifications map to the Shenwan levels in rel_stock_sector.
+GROUPS = {
+    'IndClass.sector': 'sector',            # SW1
+    'IndClass.industry': 'industry',        # SW2
+    'IndClass.subindustry': 'subindustry',  # SW3
+}
+
+# Derived inputs are expanded into ordinary nodes so they are shared too.
+# adv{d} is average daily turnover (amount), see the notes on alpha_007/021.
+DERIVED = {
+    'returns': 'close / delay(close, 1) - 1',
+}
+ADV_PATTERN = re.compile(r'adv(\d+)$')
+
+# Operator taxonomy, mirroring the sections of Alpha101Engine.
+TS_OPS = {'delay', 'delta', 'ts_min', 'ts_max', 'ts_argmax', 'ts_argmin', 'ts_rank',
+          'sum', 'product', 'stddev', 'decay_linear', 'moments'}
+CS_OPS = {'rank', 'scale', 'indneutralize'}
+COMMUTATIVE = {'add', 'mul', 'min', 'max', 'eq', 'ne', 'and', 'or', 'moments'}
+
+
+# ------------------------------------------------------------------------------
+# Parser
+# ------------------------------------------------------------------------------
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(\d+\.\d*|\.\d+|\d+)|([A-Za-z_][A-Za-z_0-9.]*)|(\|\||&&|<=|>=|==|!=|[-+*/^?:(),<>]))')
+
+
+def tokenize(formula: str) -> list:
+    """Split a formula into (kind, text) tokens."""
+    tokens, pos, text = [], 0, formula.strip()
+    while pos < len(text):
+        match = TOKEN_PATTERN.match(text, pos)
+        if not match or match.end() == pos:
+            raise SyntaxError(f"Unexpected character at {pos}: {text[pos:pos + 10]!r}")
+        number, name, symbol = match.groups()
+        tokens.append(('num', number) if number else ('name', name) if name else ('sym', symbol))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing a nested-tuple AST.
+
+    Precedence, lowest first: ?:, ||, &&, comparisons, + -, * /, unary -, ^.
+    """
+
+    BINARY_LEVELS = [
+        {'||': 'or'},
+        {'&&': 'and'},
+        {'<': 'lt', '>': 'gt', '<=': 'le', '>=': 'ge', '==': 'eq', '!=': 'ne'},
+        {'+': 'add', '-': 'sub'},
+        {'*': 'mul', '/': 'div'},
+    ]
+
+    def __init__(self, formula: str):
+        self.tokens = tokenize(formula)
+        self.pos = 0
+
+    def parse(self):
+        node = self._ternary()
+        if self.pos != len(self.tokens):
+            raise SyntaxError(f"Unexpected token {self.tokens[self.pos][1]!r}")
+        return node
+
+    def _peek(self):
+        return self.tokens[self.pos][1] if self.pos < len(self.tokens) else None
+
+    def _expect(self, symbol):
+        if self._peek() != symbol:
+            raise SyntaxError(f"Expected {symbol!r}, got {self._peek()!r}")
+        self.pos += 1
+
+    def _ternary(self):
+        cond = self._binary(0)
+        if self._peek() != '?':
+            return cond
+        self.pos += 1
+        left = self._ternary()
+        self._expect(':')
+        return ('where', cond, left, self._ternary())
+
+    def _binary(self, level):
+        if level == len(self.BINARY_LEVELS):
+            return self._unary()
+        ops = self.BINARY_LEVELS[level]
+        node = self._binary(level + 1)
+        while self._peek() in ops:
+            op = ops[self.tokens[self.pos][1]]
+            self.pos += 1
+            node = (op, node, self._binary(level + 1))
+        return node
+
+    def _unary(self):
+        if self._peek() == '-':
+            self.pos += 1
+            return ('neg', self._unary())
+        if self._peek() == '+':
+            self.pos += 1
+            return self._unary()
+        return self._power()
+
+    def _power(self):
+        base = self._primary()
+        if self._peek() == '^':
+            self.pos += 1
+            return ('pow', base, self._unary())
+        return base
+
+    def _primary(self):
+        if self.pos >= len(self.tokens):
+            raise SyntaxError("Unexpected end of formula")
+        kind, text = self.tokens[self.pos]
+        self.pos += 1
+        if kind == 'num':
+            return ('const', float(text))
+        if kind == 'name':
+            if self._peek() != '(':
+                return ('var', text)
+            self.pos += 1
+            args = []
+            if self._peek() != ')':
+                args.append(self._ternary())
+                while self._peek() == ',':
+                    self.pos += 1
+                    args.append(self._ternary())
+            self._expect(')')
+            return ('call', text, args)
+        if text == '(':
+            node = self._ternary()
+            self._expect(')')
+            return node
+        raise SyntaxError(f"Unexpected token {text!r}")
+
+
+def parse(formula: str):
+    """Parse one alpha formula into a nested-tuple AST."""
+    return _Parser(formula).parse()
+
+
+def load_formulas(path=FORMULA_FILE) -> dict:
+    """Read {alpha_name: formula} from the alpha101_function.md table."""
+    text = Path(path).read_text(encoding='utf-8')
+    rows = re.findall(r'\|\s*\*\*(alpha_\d+)\*\*\s*\|\s*`(.+?)`\s*\|', text)
+    return {name: formula.replace('\\|', '|') for name, formula in rows}
+
+
+# ------------------------------------------------------------------------------
+# Graph
+# ------------------------------------------------------------------------------
+
+class Node:
+    """One interned operator application; `args` are child Nodes or constants."""
+
+    __slots__ = ('id', 'op', 'args', 'params', 'expr')
+
+    def __init__(self, node_id, op, args, params, expr):
+        self.id = node_id
+        self.op = op
+        self.args = args
+        self.params = params
+        self.expr = expr
+
+    @property
+    def kind(self) -> str:
+        """'input', 'const', 'ts', 'cs' or 'elem'."""
+        if self.op in ('input', 'const'):
+            return self.op
+        if self.op in TS_OPS:
+            return 'ts'
+        return 'cs' if self.op in CS_OPS else 'elem'
+
+    def __repr__(self):
+        return f"Node({self.id}, {self.expr})"
+
+
+def lookback(node: Node) -> int:
+    """Rows of each argument that `node` reads to produce one output row."""
+    if node.op in ('delay', 'delta'):
+        return node.params[0] + 1
+    if node.op in TS_OPS:
+        return node.params[0]
+    return 1
+
+
+class AlphaGraph:
+    """Hash-consed DAG of all compiled alphas with shared subexpressions."""
+
+    def __init__(self):
+        self.nodes = []
+        self.outputs = {}
+        self._index = {}
+        self._requests = Counter()
+
+    # -------------------------------- building --------------------------------
+
+    def intern(self, op: str, args=(), params=()) -> Node:
+        """Return the unique node for (op, args, params), creating it if needed."""
+        args = tuple(args)
+        if op in COMMUTATIVE:
+            args = tuple(sorted(args, key=lambda n: n.id))
+        key = (op, tuple(a.id for a in args), tuple(params))
+        self._requests[op] += 1
+        node = self._index.get(key)
+        if node is None:
+            inner = [a.expr for a in args] + [repr(p) for p in params]
+            expr = repr(params[0]) if op == 'const' else params[0] if op == 'input' else f"{op}({', '.join(inner)})"
+            node = Node(len(self.nodes), op, args, tuple(params), expr)
+            self.nodes.append(node)
+            self._index[key] = node
+        return node
+
+    def add_formula(self, name: str, formula: str) -> Node:
+        """Compile one formula into the graph and register it as an output."""
+        node = self._lower(parse(formula))
+        self.outputs[name] = node
+        return node
+
+    def _const(self, value: float) -> Node:
+        return self.intern('const', params=(float(value),))
+
+    def _window(self, ast) -> int:
+        node = self._lower(ast)
+        if node.op != 'const':
+            raise ValueError(f"Window must be a constant, got {node.expr}")
+        return int(node.params[0])
+
+    def _lower(self, ast) -> Node:
+        tag = ast[0]
+        if tag == 'const':
+            return self._const(ast[1])
+        if tag == 'var':
+            return self._lower_var(ast[1])
+        if tag == 'call':
+            return self._lower_call(ast[1], ast[2])
+        children = [self._lower(a) for a in ast[1:]]
+        if all(c.op == 'const' for c in children) and tag in _ELEMENTWISE:
+            return self._const(_ELEMENTWISE[tag](*[c.params[0] for c in children]))
+        return self.intern(tag, children)
+
+    def _lower_var(self, name: str) -> Node:
+        if name in INPUTS:
+            return self.intern('input', params=(name,))
+        if name in GROUPS:
+            return self.intern('input', params=(GROUPS[name],))
+        if name in DERIVED:
+            return self._lower(parse(DERIVED[name]))
+        match = ADV_PATTERN.match(name)
+        if match:
+            return self._lower(parse(f"sum(amount, {match.group(1)}) / {match.group(1)}"))
+        raise ValueError(f"Unknown variable {name!r}")
+
+    def _lower_call(self, name: str, args: list) -> Node:
+        if name == 'mean':
+            window = self._window(args[1])
+            return self.intern('div', [self._lower(('call', 'sum', args)), self._const(window)])
+        if name in ('correlation', 'covariance'):
+            moments = self.intern('moments', [self._lower(args[0]), self._lower(args[1])],
+                                  (self._window(args[2]),))
+            return self.intern('field', [moments], ('corr' if name == 'correlation' else 'cov',))
+        if name in TS_OPS:
+            return self.intern(name, [self._lower(args[0])], (self._window(args[1]),))
+        if name == 'scale':
+            target = self._lower(args[1]).params[0] if len(args) > 1 else 1.0
+            return self.intern('scale', [self._lower(args[0])], (target,))
+        if name in _FUNCTIONS or name in CS_OPS:
+            return self.intern(name, [self._lower(a) for a in args])
+        raise ValueError(f"Unknown function {name!r}")
+
+    # -------------------------------- analysis --------------------------------
+
+    def required(self, names=None) -> list:
+        """Nodes needed for the given outputs, in evaluation (topological) order."""
+        names = list(self.outputs) if names is None else names
+        needed, stack = set(), [self.outputs[n] for n in names]
+        while stack:
+            node = stack.pop()
+            if node.id not in needed:
+                needed.add(node.id)
+                stack.extend(node.args)
+        return [n for n in self.nodes if n.id in needed]
+
+    def depths(self, names=None) -> dict:
+        """Rows of history each required node reads for one fully defined value.
+
+        A chain of rolling operators adds up: ts_rank(sum(x, 10), 5) reads
+        10 + 5 - 1 = 14 rows of x.
+        """
+        depth = {}
+        for node in self.required(names):
+            depth[node.id] = max([depth[a.id] - 1 for a in node.args] + [0]) + lookback(node)
+        return depth
+
+    def history(self, names=None) -> int:
+        """Rows of history the given outputs need (the longest chain of windows)."""
+        names = list(self.outputs) if names is None else names
+        depth = self.depths(names)
+        return max(depth[self.outputs[n].id] for n in names)
+
+    def consumers(self, names=None) -> Counter:
+        """Number of distinct consumers of each node among the required nodes."""
+        counts = Counter()
+        for node in self.required(names):
+            for child in set(node.args):
+                counts[child.id] += 1
+        return counts
+
+    def sharing_report(self, top: int = 10) -> dict:
+        """Summary of how much work common-subexpression elimination saved."""
+        ops = [n for n in self.nodes if n.op not in ('input', 'const')]
+        requested = sum(c for op, c in self._requests.items() if op not in ('input', 'const'))
+        consumers = self.consumers()
+        shared = sorted((n for n in ops if consumers[n.id] > 1), key=lambda n: -consumers[n.id])
+        return {
+            'alphas': len(self.outputs),
+            'operator_calls_requested': requested,
+            'operator_calls_unique': len(ops),
+            'operator_calls_saved': requested - len(ops),
+            'shared_nodes': len(shared),
+            'by_kind': dict(Counter(n.kind for n in ops)),
+            'top_shared': [(n.expr, consumers[n.id]) for n in shared[:top]],
+        }
+
+    # ------------------------------- evaluation -------------------------------
+
+    def evaluate(self, data: dict, names=None) -> dict:
+        """Evaluate the requested alphas on a dict of dates × stocks panels.
+
+        Each node runs once; intermediate values are dropped as soon as their
+        last consumer has run, so peak memory follows the live frontier of the
+        DAG rather than the total number of nodes.
+        """
+        names = list(self.outputs) if names is None else list(names)
+        order = self.required(names)
+        remaining = self.consumers(names)
+        keep = {self.outputs[n].id for n in names}
+        values = {}
+        for node in order:
+            values[node.id] = self._compute(node, [values[a.id] for a in node.args], data)
+            for child in set(node.args):
+                remaining[child.id] -= 1
+                if remaining[child.id] == 0 and child.id not in keep:
+                    del values[child.id]
+        return {n: values[self.outputs[n].id] for n in names}
+
+    def _compute(self, node: Node, args: list, data: dict):
+        if node.op == 'input':
+            if node.params[0] not in data:
+                raise KeyError(f"Missing input panel {node.params[0]!r}")
+            value = data[node.params[0]]
+            return _as_float(value) if node.params[0] in INPUTS else value
+        if node.op == 'const':
+            return node.params[0]
+        if node.op == 'moments':
+            return Alpha101Engine.moments(args[0], args[1], node.params[0])
+        if node.op == 'field':
+            return args[0][node.params[0]]
+        if node.op in TS_OPS:
+            return getattr(Alpha101Engine, node.op)(_as_float(args[0]), node.params[0])
+        if node.op == 'scale':
+            return Alpha101Engine.scale(_as_float(args[0]), node.params[0])
+        if node.op in CS_OPS:
+            return getattr(Alpha101Engine, node.op)(_as_float(args[0]), *args[1:])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if node.op in _ELEMENTWISE:
+                return _ELEMENTWISE[node.op](*args)
+            return _FUNCTIONS[node.op](*args)
+
+
+def _as_float(value):
+    """Booleans from comparisons enter numeric operators as 0/1, and every
+    panel in the engine's storage dtype (see Alpha101Engine.precision)."""
+    if isinstance(value, pd.DataFrame) and any(dt != Alpha101Engine.dtype for dt in value.dtypes):
+        return value.astype(Alpha101Engine.dtype)
+    return value
+
+
+_ELEMENTWISE = {
+    'add': lambda a, b: a + b,
+    'sub': lambda a, b: a - b,
+    'mul': lambda a, b: a * b,
+    'div': lambda a, b: a / b,
+    'pow': lambda a, b: np.power(a, b),
+    'neg': lambda a: -a,
+    'lt': lambda a, b: a < b,
+    'gt': lambda a, b: a > b,
+    'le': lambda a, b: a <= b,
+    'ge': lambda a, b: a >= b,
+    'eq': lambda a, b: a == b,
+    'ne': lambda a, b: a != b,
+    'and': lambda a, b: np.logical_and(a, b),
+    'or': lambda a, b: np.logical_or(a, b),
+    'where': lambda c, a, b: Alpha101Engine.if_else(c, a, b),
+}
+
+_FUNCTIONS = {
+    'abs': np.abs,
+    'log': np.log,
+    'sign': np.sign,
+    'signedpower': Alpha101Engine.signedpower,
+    'min': np.minimum,
+    'max': np.maximum,
+}
+
+
+def compile_formulas(formulas: dict = None) -> AlphaGraph:
+    """Compile {alpha_name: formula} (default: every alpha in the doc) into one graph."""
+    graph = AlphaGraph()
+    for name, formula in (load_formulas() if formulas is None else formulas).items():
+        graph.add_formula(name, formula)
+    return graph
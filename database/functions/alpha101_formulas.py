@@ -0,0 +1,135 @@
+"""
+Alpha101 Formula Library.
+
+Every alpha of ``alpha101_function.md`` as one expression compiled onto the
+panel-mode operators of Alpha101Engine, together with a registry describing
+what each alpha needs: raw input panels, industry labels, rows of history
+(maximum lookback) and how deeply time-series and cross-sectional operators
+nest. Any subset can be computed in one pass over a shared graph, so callers
+only pay for the alphas (and common subexpressions) they ask for.
+
+    library = AlphaLibrary()
+    library.registry()                                 # one row per alpha
+    names = library.select(max_lookback=60, groups=False)
+    out = library.compute(panels, names)               # {alpha_name: dates × stocks}
+"""
+
+from functools import lru_cache
+
+import pandas as pd
+
+from alpha101_engine import Alpha101Engine
+from alpha101_expr import GROUPS, INPUTS, compile_formulas, load_formulas
+from alpha101_planner import plan_stages
+
+
+class AlphaSpec:
+    """Registry entry of one alpha; calling it evaluates just that alpha."""
+
+    __slots__ = ('name', 'formula', 'inputs', 'groups', 'lookback', 'ts_depth', 'cs_depth',
+                 'stages', 'operators', '_library')
+
+    def __init__(self, library, name: str, formula: str):
+        graph = library.graph
+        nodes = graph.required([name])
+        fields = {n.params[0] for n in nodes if n.op == 'input'}
+        self.name = name
+        self.formula = formula
+        self.inputs = tuple(f for f in INPUTS if f in fields)
+        self.groups = tuple(g for g in GROUPS.values() if g in fields)
+        self.lookback = graph.history([name])
+        self.ts_depth, self.cs_depth = _nesting(nodes, graph.outputs[name])
+        self.stages = plan_stages(graph, [name]).depth(name)
+        self.operators = sum(1 for n in nodes if n.kind in ('ts', 'cs', 'elem'))
+        self._library = library
+
+    def __call__(self, data: dict) -> pd.DataFrame:
+        return self._library.compute(data, [self.name])[self.name]
+
+    def __repr__(self):
+        return f"AlphaSpec({self.name}, lookback={self.lookback}, ts={self.ts_depth}, cs={self.cs_depth})"
+
+    def as_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__ if not slot.startswith('_')}
+
+
+def _nesting(nodes: list, output) -> tuple:
+    """Most time-series and most cross-sectional operators on any input-to-output path."""
+    ts, cs = {}, {}
+    for node in nodes:
+        ts[node.id] = max([ts[a.id] for a in node.args] + [0]) + (node.kind == 'ts')
+        cs[node.id] = max([cs[a.id] for a in node.args] + [0]) + (node.kind == 'cs')
+    return ts[output.id], cs[output.id]
+
+
+class AlphaLibrary:
+    """All formulas compiled into one shared graph, plus their registry."""
+
+    def __init__(self, formulas: dict = None):
+        self.formulas = load_formulas() if formulas is None else dict(formulas)
+        self.graph = compile_formulas(self.formulas)
+        self.specs = {name: AlphaSpec(self, name, formula) for name, formula in self.formulas.items()}
+
+    def __getitem__(self, name: str) -> AlphaSpec:
+        return self.specs[name]
+
+    def __iter__(self):
+        return iter(self.specs)
+
+    def __len__(self):
+        return len(self.specs)
+
+    def registry(self) -> pd.DataFrame:
+        """One row per alpha: formula, inputs, groups, lookback, nesting depths and stage count."""
+        frame = pd.DataFrame([spec.as_dict() for spec in self.specs.values()]).set_index('name')
+        frame.index.name = 'alpha'
+        return frame
+
+    def select(self, max_lookback: int = None, inputs=None, groups: bool = True) -> list:
+        """Alphas computable from the given history length and input panels.
+
+        `inputs` restricts the raw panels available (default: all of INPUTS);
+        `groups=False` drops alphas that need industry labels.
+        """
+        available = set(INPUTS if inputs is None else inputs)
+        return [
+            name for name, spec in self.specs.items()
+            if (max_lookback is None or spec.lookback <= max_lookback)
+            and set(spec.inputs) <= available
+            and (groups or not spec.groups)
+        ]
+
+    def required_inputs(self, names=None) -> list:
+        """Raw panels and group labels needed by the given alphas."""
+        specs = [self.specs[n] for n in (self.specs if names is None else names)]
+        fields = {f for spec in specs for f in spec.inputs + spec.groups}
+        return [f for f in (*INPUTS, *GROUPS.values()) if f in fields]
+
+    def lookback(self, names=None) -> int:
+        """Rows of history the given alphas need for their first fully defined date."""
+        return self.graph.history(list(self.specs) if names is None else list(names))
+
+    def compute(self, data: dict, names=None, dtype=None) -> dict:
+        """Evaluate a subset of alphas (default: all) on a dict of dates × stocks panels.
+
+        Shared subexpressions are computed once; nodes only used by alphas
+        outside `names` are never touched. `dtype` (e.g. 'float32') runs the
+        evaluation under Alpha101Engine.precision.
+        """
+        names = list(self.specs) if names is None else list(names)
+        unknown = [n for n in names if n not in self.specs]
+        if unknown:
+            raise KeyError(f"Unknown alphas: {', '.join(unknown)}")
+        missing = [f for f in self.required_inputs(names) if f not in data]
+        if missing:
+            raise KeyError(f"Missing input panels for {len(names)} alphas: {', '.join(missing)}")
+        if dtype is None:
+            return self.graph.evaluate(data, names)
+        with Alpha101Engine.precision(dtype):
+            return self.graph.evaluate(data, names)
+
+
+@lru_cache(maxsize=1)
+def default_library() -> AlphaLibrary:
+    """The library of alpha101_function.md, compiled once per process."""
+    return AlphaLibrary()
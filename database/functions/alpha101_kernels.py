@@ -0,0 +1,494 @@
+"""
+Vectorized sliding-window kernels backing Alpha101Engine.
+
+Every kernel takes a 2-D float array shaped (dates, stocks). Sliding-window
+kernels work down axis 0, so a single Series is simply a one-column panel,
+and follow the pandas ``rolling(window)`` convention: the first ``window - 1``
+rows and any window containing a NaN or +/-inf (which pandas treats as
+missing) produce NaN. Cross-sectional kernels work across axis 1, one whole
+history per call, and skip NaN like their pandas counterparts.
+
+Kernels that only compare values (arg-extrema, ranks) run in the float width
+they are given, so float32 panels stay float32; every kernel that adds values
+(sums, averages, moments, group means) accumulates in float64.
+"""
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------------
+# Window Helpers
+# ------------------------------------------------------------------------------
+
+# Rows per tile for cumulative-sum kernels; restarting the sums every tile
+# keeps their magnitude, and hence the cancellation error, bounded.
+TILE_ROWS = 256
+
+# Windows up to this length are summed lag by lag instead of through running
+# sums: O(window) passes, but each output then depends only on its own window,
+# not on where the window sits in the panel, so recomputing a date from a
+# trailing tail reproduces the full-history value bit for bit (and exact ties,
+# e.g. correlations of +/-1, stay exact ties for the cross-sectional rank).
+DIRECT_WINDOW = 20
+
+
+def window_count(flags: np.ndarray, window: int) -> np.ndarray:
+    """Number of True flags in each trailing window (partial for the first rows)."""
+    count = np.cumsum(flags, axis=0, dtype=np.int32)
+    count[window:] -= count[:-window].copy()
+    return count
+
+
+def incomplete_windows(values: np.ndarray, window: int) -> np.ndarray:
+    """Boolean mask of rows whose trailing window is short or contains a non-finite value."""
+    mask = window_count(~np.isfinite(values), window) > 0
+    mask[:window - 1] = True
+    return mask
+
+
+def as_floats(values) -> np.ndarray:
+    """`values` as a float array; float32 is kept for kernels that only compare values."""
+    values = np.asarray(values)
+    return values if values.dtype in (np.float32, np.float64) else values.astype(np.float64)
+
+
+def _finite_mean(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Column means over finite entries (0 for columns without any)."""
+    count = valid.sum(axis=0)
+    total = np.where(valid, values, 0.0).sum(axis=0)
+    return np.divide(total, count, out=np.zeros(total.shape), where=count > 0)
+
+
+def _lags(values: np.ndarray, window: int, start: int, stop: int):
+    """Row-shifted views of `values` for output rows [start, stop), oldest lag first."""
+    return [values[start - window + 1 + j:stop - window + 1 + j] for j in range(window)]
+
+
+def _tiles(n_rows: int, window: int):
+    """Yield (start, stop) output row ranges covering [window - 1, n_rows)."""
+    for start in range(window - 1, n_rows, TILE_ROWS):
+        yield start, min(start + TILE_ROWS, n_rows)
+
+
+# ------------------------------------------------------------------------------
+# Arg-Extremum Kernels (van Herk / Gil-Werman)
+# ------------------------------------------------------------------------------
+
+def _block_scan(values: np.ndarray, window: int):
+    """Prefix and suffix running maxima (with first-occurrence row indices) per block of `window` rows."""
+    n_rows, n_cols = values.shape
+    n_blocks = -(-n_rows // window)
+    padded = np.full((n_blocks * window, n_cols), -np.inf, dtype=values.dtype)
+    padded[:n_rows] = values
+    blocks = padded.reshape(n_blocks, window, n_cols)
+    rows = np.arange(n_blocks * window).reshape(n_blocks, window, 1)
+
+    prefix_max = np.maximum.accumulate(blocks, axis=1)
+    rises = np.ones(blocks.shape, dtype=bool)
+    rises[:, 1:] = blocks[:, 1:] > prefix_max[:, :-1]
+    prefix_idx = np.maximum.accumulate(np.where(rises, rows, -1), axis=1)
+
+    suffix_max = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1]
+    holds = blocks == suffix_max
+    suffix_idx = np.minimum.accumulate(np.where(holds, rows, np.iinfo(np.int64).max)[:, ::-1], axis=1)[:, ::-1]
+
+    def flat(a):
+        return a.reshape(n_blocks * window, n_cols)[:n_rows]
+
+    return flat(prefix_max), flat(prefix_idx), flat(suffix_max), flat(suffix_idx)
+
+
+def rolling_argmax(values: np.ndarray, window: int) -> np.ndarray:
+    """Position (0 = oldest) of the first maximum in each trailing window, in amortized O(1) per cell.
+
+    Each window [t-d+1, t] is the union of a block suffix starting at t-d+1
+    and a block prefix ending at t, so two running-max scans per block replace
+    the per-window argmax. Ties resolve to the earliest row, as np.argmax does.
+    """
+    values = as_floats(values)
+    out = np.full(values.shape, np.nan, dtype=values.dtype)
+    if window < 1 or values.shape[0] < window:
+        return out
+    filled = np.where(np.isnan(values), values.dtype.type(-np.inf), values)
+    prefix_max, prefix_idx, suffix_max, suffix_idx = _block_scan(filled, window)
+
+    start = np.arange(values.shape[0] - window + 1)
+    end = start + window - 1
+    take_suffix = suffix_max[start] >= prefix_max[end]
+    best = np.where(take_suffix, suffix_idx[start], prefix_idx[end])
+    out[window - 1:] = best - start[:, None]
+    np.copyto(out, np.nan, where=incomplete_windows(values, window))
+    return out
+
+
+def rolling_argmin(values: np.ndarray, window: int) -> np.ndarray:
+    """Position (0 = oldest) of the first minimum in each trailing window."""
+    return rolling_argmax(-as_floats(values), window)
+
+
+# ------------------------------------------------------------------------------
+# Order-Statistic Kernels
+# ------------------------------------------------------------------------------
+
+def rolling_rank_last(values: np.ndarray, window: int) -> np.ndarray:
+    """Average-tie rank (1..d) of the newest value within each trailing window.
+
+    Only the newest element is ranked, so it is enough to count the smaller and
+    equal elements in the window: rank = less + (equal + 1) / 2, identical to
+    ``rankdata(window)[-1]``. Each lag is compared against the current row in
+    one vectorized pass, without sorting or allocating per window.
+    """
+    values = as_floats(values)
+    out = np.full(values.shape, np.nan, dtype=values.dtype)
+    n_rows = values.shape[0]
+    if window < 1 or n_rows < window:
+        return out
+    current = values[window - 1:]
+    less = np.zeros(current.shape, dtype=np.int32)
+    equal = np.ones(current.shape, dtype=np.int32)
+    for lag in range(1, window):
+        lagged = values[window - 1 - lag:n_rows - lag]
+        less += lagged < current
+        equal += lagged == current
+    out[window - 1:] = less + (equal + 1) / 2.0
+    np.copyto(out, np.nan, where=incomplete_windows(values, window))
+    return out
+
+
+# ------------------------------------------------------------------------------
+# Moving Sum Kernels
+# ------------------------------------------------------------------------------
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing window sum.
+
+    Replaces pandas' running-sum update, whose rounding depends on every row
+    since the start of the panel, so tiles and incremental tails could not
+    reproduce it. Windows up to DIRECT_WINDOW are added lag by lag; longer
+    ones difference a cumulative sum of tile-centred values, restarted every
+    tile like the other kernels.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    n_rows = values.shape[0]
+    if window < 1 or n_rows < window:
+        return out
+    finite = np.isfinite(values)
+    for start, stop in _tiles(n_rows, window):
+        if window <= DIRECT_WINDOW:
+            acc = out[start:stop]
+            acc[:] = 0.0
+            for lag in _lags(values, window, start, stop):
+                acc += lag
+            continue
+        local, valid = values[start - window + 1:stop], finite[start - window + 1:stop]
+        center = _finite_mean(local, valid)
+        s0 = np.zeros((local.shape[0] + 1, local.shape[1]))
+        np.cumsum(np.where(valid, local - center, 0.0), axis=0, out=s0[1:])
+        out[start:stop] = (s0[window:] - s0[:-window]) + window * center
+
+    np.copyto(out, np.nan, where=incomplete_windows(values, window))
+    return out
+
+
+# ------------------------------------------------------------------------------
+# Weighted Moving Average Kernels
+# ------------------------------------------------------------------------------
+
+def rolling_lwma(values: np.ndarray, window: int) -> np.ndarray:
+    """Linearly weighted moving average with weights 1 (oldest) .. d (newest).
+
+    Uses the closed form of the O(1) LWMA recurrence: with running sums
+    S = cumsum(x) and K = cumsum(k * x), the weighted window sum ending at k
+    is (K_k - K_{k-d}) - (k - d) * (S_k - S_{k-d}). Sums restart every tile
+    and run on values centred by the tile mean (LWMA is shift-invariant), so
+    they stay small and cancellation error is bounded. Windows up to
+    DIRECT_WINDOW are summed directly.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    n_rows = values.shape[0]
+    if window < 1 or n_rows < window:
+        return out
+    finite = np.isfinite(values)
+    w_sum = window * (window + 1) / 2.0
+    for start, stop in _tiles(n_rows, window):
+        if window <= DIRECT_WINDOW:
+            acc = out[start:stop]
+            acc[:] = 0.0
+            term = np.empty_like(acc)
+            for weight, lag in enumerate(_lags(values, window, start, stop), 1):
+                acc += np.multiply(lag, weight, out=term)
+            acc /= w_sum
+            continue
+        local, valid = values[start - window + 1:stop], finite[start - window + 1:stop]
+        center = _finite_mean(local, valid)
+        local = np.where(valid, local - center, 0.0)
+        k = np.arange(local.shape[0], dtype=np.float64)[:, None]
+        s0 = np.zeros((local.shape[0] + 1, local.shape[1]))
+        s1 = np.zeros_like(s0)
+        np.cumsum(local, axis=0, out=s0[1:])
+        np.cumsum(local * k, axis=0, out=s1[1:])
+        head, tail = s0[window:], s0[:-window]
+        offset = k[window - 1:] - window
+        weighted = (s1[window:] - s1[:-window]) - offset * (head - tail)
+        out[start:stop] = weighted / w_sum + center
+
+    np.copyto(out, np.nan, where=incomplete_windows(values, window))
+    return out
+
+
+# ------------------------------------------------------------------------------
+# Fused Moment Kernels (Mean / Variance / Covariance / Correlation)
+# ------------------------------------------------------------------------------
+
+MOMENTS = ('mean_x', 'mean_y', 'var_x', 'var_y', 'cov', 'corr')
+
+# Windows whose sums of squares (as accumulated within the tile) exceed their
+# centred sum of squares by more than this factor lose too many digits to
+# cancellation and are redone with an exact two-pass formula.
+CONDITION_LIMIT = 1e6
+
+
+def constant_windows(values: np.ndarray, window: int) -> np.ndarray:
+    """Rows whose trailing window holds a single repeated value (exact zero variance)."""
+    if window < 2:
+        return np.ones(values.shape, dtype=bool)
+    same = np.zeros(values.shape, dtype=bool)
+    same[1:] = values[1:] == values[:-1]
+    return window_count(same, window - 1) == window - 1
+
+
+def _exact_moments(x, y, rows, cols, window, ddof):
+    """Two-pass variances and covariance for selected (row, column) windows."""
+    starts = rows - window + 1
+    offsets = np.arange(window)
+    wx = x[starts[:, None] + offsets, cols[:, None]]
+    wy = y[starts[:, None] + offsets, cols[:, None]]
+    dx = wx - wx.mean(axis=1, keepdims=True)
+    dy = wy - wy.mean(axis=1, keepdims=True)
+    denom = window - ddof
+    return (dx * dx).sum(axis=1) / denom, (dy * dy).sum(axis=1) / denom, (dx * dy).sum(axis=1) / denom
+
+
+def _direct_moments(x, y, window, denom, start, stop, out, mask):
+    """Two-pass moments for output rows [start, stop), written into `out`."""
+    poison = np.where(mask[start:stop], np.nan, 0.0)
+    lags_x, lags_y = _lags(x, window, start, stop), _lags(y, window, start, stop)
+    mean_x, mean_y = out['mean_x'][start:stop], out['mean_y'][start:stop]
+    mean_x[:], mean_y[:] = poison, poison
+    for lx, ly in zip(lags_x, lags_y):
+        mean_x += lx
+        mean_y += ly
+    mean_x /= window
+    mean_y /= window
+    ssx, ssy, sxy = out['var_x'][start:stop], out['var_y'][start:stop], out['cov'][start:stop]
+    ssx[:], ssy[:], sxy[:] = 0.0, 0.0, 0.0
+    dx, dy, prod = np.empty_like(ssx), np.empty_like(ssx), np.empty_like(ssx)
+    for lx, ly in zip(lags_x, lags_y):
+        np.subtract(lx, mean_x, out=dx)
+        np.subtract(ly, mean_y, out=dy)
+        ssx += np.multiply(dx, dx, out=prod)
+        ssy += np.multiply(dy, dy, out=prod)
+        sxy += np.multiply(dx, dy, out=prod)
+    ssx /= denom
+    ssy /= denom
+    sxy /= denom
+
+
+def rolling_moments(x: np.ndarray, y: np.ndarray, window: int, ddof: int = 1) -> dict:
+    """Rolling means, variances, covariance and correlation of x and y in one pass.
+
+    All five window sums (x, y, x^2, y^2, xy) come from one cumulative sum
+    taken per tile on values centred by the tile mean. The accumulated squares
+    also bound each window's cancellation error, and the few ill-conditioned
+    windows (tiny variance far from the tile mean) are recomputed exactly, so
+    accuracy does not degrade on price-level data. As in pandas, a window that
+    is incomplete in either input yields NaN and a window of one repeated value
+    has variance exactly 0; correlation against such a window is undefined and
+    returned as NaN. Windows up to DIRECT_WINDOW use the two-pass formula
+    directly, lag by lag.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n_rows = x.shape[0]
+    if window < 1 or n_rows < window:
+        return {name: np.full(x.shape, np.nan) for name in MOMENTS}
+    out = {name: np.empty(x.shape) for name in MOMENTS}
+    for name in MOMENTS:
+        out[name][:window - 1] = np.nan
+    valid = np.isfinite(x) & np.isfinite(y)
+    mask = window_count(~valid, window) > 0
+    mask[:window - 1] = True
+    flat_x = constant_windows(x, window) & ~mask
+    flat_y = constant_windows(y, window) & ~mask
+    unstable = np.zeros(x.shape, dtype=bool)
+    denom = window - ddof
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start, stop in _tiles(n_rows, window):
+            if window <= DIRECT_WINDOW:
+                _direct_moments(x, y, window, denom, start, stop, out, mask)
+                continue
+            rows = slice(start - window + 1, stop)
+            tile_valid = valid[rows]
+            cx, cy = _finite_mean(x[rows], tile_valid), _finite_mean(y[rows], tile_valid)
+            terms = np.zeros((5, tile_valid.shape[0] + 1, tile_valid.shape[1]))
+            lx, ly = terms[0, 1:], terms[1, 1:]
+            np.subtract(x[rows], cx, out=lx, where=tile_valid)
+            np.subtract(y[rows], cy, out=ly, where=tile_valid)
+            np.multiply(lx, lx, out=terms[2, 1:])
+            np.multiply(ly, ly, out=terms[3, 1:])
+            np.multiply(lx, ly, out=terms[4, 1:])
+            np.cumsum(terms, axis=1, out=terms)
+            sx, sy, sxx, syy, sxy = terms[:, window:] - terms[:, :-window]
+
+            # Adding NaN poisons incomplete windows without a masked write per output.
+            poison = np.where(mask[start:stop], np.nan, 0.0)
+            ssx = np.maximum(sxx - sx * sx / window, 0.0) + poison
+            ssy = np.maximum(syy - sy * sy / window, 0.0) + poison
+            out['mean_x'][start:stop] = sx / window + cx + poison
+            out['mean_y'][start:stop] = sy / window + cy + poison
+            out['var_x'][start:stop] = ssx / denom
+            out['var_y'][start:stop] = ssy / denom
+            out['cov'][start:stop] = (sxy - sx * sy / window) / denom + poison
+            unstable[start:stop] = ((terms[2, window:] > CONDITION_LIMIT * ssx)
+                                    | (terms[3, window:] > CONDITION_LIMIT * ssy))
+
+        unstable &= ~(flat_x | flat_y)
+        if unstable.any() and window > 1:
+            rows, cols = np.nonzero(unstable)
+            var_x, var_y, cov = _exact_moments(x, y, rows, cols, window, ddof)
+            out['var_x'][rows, cols] = var_x
+            out['var_y'][rows, cols] = var_y
+            out['cov'][rows, cols] = cov
+
+        np.copyto(out['var_x'], 0.0, where=flat_x)
+        np.copyto(out['var_y'], 0.0, where=flat_y)
+        np.copyto(out['cov'], 0.0, where=flat_x | flat_y)
+        scale = np.sqrt(out['var_x'] * out['var_y'])
+        out['corr'] = np.divide(out['cov'], scale, out=np.full(x.shape, np.nan), where=scale > 0)
+        if window == 2:
+            # Two distinct points are perfectly (anti-)correlated; avoid ±1 - ulp noise.
+            np.sign(out['corr'], out=out['corr'])
+    if window <= ddof:
+        # No degrees of freedom left: second moments are undefined, as in pandas.
+        for name in ('var_x', 'var_y', 'cov', 'corr'):
+            out[name][:] = np.nan
+    return out
+
+
+def rolling_std(values: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """Rolling standard deviation; the single-series half of `rolling_moments`."""
+    values = np.asarray(values, dtype=np.float64)
+    n_rows = values.shape[0]
+    out = np.full(values.shape, np.nan)
+    if window <= ddof or n_rows < window:
+        return out
+    valid = np.isfinite(values)
+    mask = incomplete_windows(values, window)
+    flat = constant_windows(values, window) & ~mask
+    unstable = np.zeros(values.shape, dtype=bool)
+    denom = window - ddof
+    with np.errstate(invalid='ignore'):
+        for start, stop in _tiles(n_rows, window):
+            acc = out[start:stop]
+            if window <= DIRECT_WINDOW:
+                lags = _lags(values, window, start, stop)
+                mean = np.zeros_like(acc)
+                for lag in lags:
+                    mean += lag
+                mean /= window
+                acc[:] = 0.0
+                dev = np.empty_like(acc)
+                for lag in lags:
+                    np.subtract(lag, mean, out=dev)
+                    acc += np.multiply(dev, dev, out=dev)
+                acc /= denom
+                continue
+            rows = slice(start - window + 1, stop)
+            center = _finite_mean(values[rows], valid[rows])
+            terms = np.zeros((2, stop - start + window, values.shape[1]))
+            np.subtract(values[rows], center, out=terms[0, 1:], where=valid[rows])
+            np.multiply(terms[0, 1:], terms[0, 1:], out=terms[1, 1:])
+            np.cumsum(terms, axis=1, out=terms)
+            s, ss = terms[:, window:] - terms[:, :-window]
+            squares = np.maximum(ss - s * s / window, 0.0)
+            acc[:] = squares / denom
+            unstable[start:stop] = ss > CONDITION_LIMIT * squares
+
+    unstable &= ~(flat | mask)
+    if unstable.any():
+        rows, cols = np.nonzero(unstable)
+        out[rows, cols] = _exact_moments(values, values, rows, cols, window, ddof)[0]
+    np.copyto(out, 0.0, where=flat)
+    np.copyto(out, np.nan, where=mask)
+    return np.sqrt(out, out=out)
+
+
+# ------------------------------------------------------------------------------
+# Cross-Sectional Kernels
+# ------------------------------------------------------------------------------
+
+def row_rank_pct(values: np.ndarray) -> np.ndarray:
+    """Percentile rank within each row, ties averaged (pandas rank(axis=1, pct=True)).
+
+    One argsort over the whole panel; tie groups are delimited on the sorted
+    rows and every member gets the mean of the group's first and last position.
+    """
+    values = as_floats(values)
+    n_rows, n_cols = values.shape
+    out = np.full(values.shape, np.nan, dtype=values.dtype)
+    if n_cols == 0:
+        return out
+    order = np.argsort(values, axis=1)
+    ordered = np.take_along_axis(values, order, axis=1)
+    valid = ~np.isnan(ordered)
+    count = valid.sum(axis=1, keepdims=True)
+    position = np.broadcast_to(np.arange(n_cols, dtype=np.int32), values.shape)
+
+    starts = np.ones(values.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    ends = np.ones(values.shape, dtype=bool)
+    ends[:, :-1] = starts[:, 1:]
+    first = np.maximum.accumulate(np.where(starts, position, np.int32(0)), axis=1)
+    last = np.minimum.accumulate(np.where(ends, position, np.int32(n_cols))[:, ::-1], axis=1)[:, ::-1]
+    first += last
+    ranks = first * 0.5 + 1.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ranks /= count
+    np.copyto(ranks, np.nan, where=~valid)
+    np.put_along_axis(out, order, ranks, axis=1)
+    return out
+
+
+def row_scale(values: np.ndarray, target: float = 1.0) -> np.ndarray:
+    """Rescale each row so the sum of absolute values equals `target`."""
+    values = np.asarray(values, dtype=np.float64)
+    norm = np.nansum(np.abs(values), axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return values * target / norm
+
+
+def group_demean(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Subtract the per-row mean of each group (integer codes, -1 for no group).
+
+    Means come from segment sums over (row, code) keys with np.bincount, so
+    every date and group is handled in one call. `codes` is a (dates, stocks)
+    array or one code per stock shared by all dates.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.broadcast_to(np.asarray(codes, dtype=np.int64), values.shape)
+    n_rows = values.shape[0]
+    n_groups = int(codes.max()) + 1 if codes.size else 0
+    out = np.full(values.shape, np.nan)
+    if n_groups <= 0:
+        return out
+    grouped = codes >= 0
+    keys = np.arange(n_rows)[:, None] * n_groups + codes
+    used = grouped & ~np.isnan(values)
+    sums = np.bincount(keys[used], weights=values[used], minlength=n_rows * n_groups)
+    counts = np.bincount(keys[used], minlength=n_rows * n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+        np.subtract(values, means[np.where(grouped, keys, 0)], out=out, where=grouped)
+    return out
@@ -0,0 +1,200 @@
+"""
+Streaming ClickHouse Loader for Alpha101 input panels.
+
+Reads ``market_stock_active_daily`` one calendar month at a time through the
+Arrow stream of clickhouse_connect (``query_arrow_stream``) and scatters each
+record batch straight into preallocated dates × stocks arrays: batch columns
+are viewed as NumPy arrays, stock codes are mapped to panel columns with
+``pyarrow.compute.index_in`` against the stock axis, so no long DataFrame and
+no per-row Python objects are ever built. While the caller computes on one
+month, a background thread is already streaming the next one.
+
+ClickHouseSource follows the FrameSource interface (``dates``, ``stocks``,
+``read``), so TiledRunner can run a full rebuild straight off the database:
+
+    source = ClickHouseSource(client, '2010-01-01', '2025-12-31')
+    for outputs in TiledRunner(graph).run(source):
+        ...
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from alpha101_engine import Alpha101Engine
+from alpha101_expr import INPUTS
+
+# Engine input -> SQL expression over market_stock_active_daily (t) and
+# stock_fundamental_daily (f). Prices are forward-adjusted; vwap is
+# amount (thousand CNY) * 1000 / (vol (lots) * 100), rescaled to qfq prices.
+FIELD_SQL = {
+    'open': 't.open_qfq',
+    'high': 't.high_qfq',
+    'low': 't.low_qfq',
+    'close': 't.close_qfq',
+    'volume': 't.vol',
+    'amount': 't.amount',
+    'vwap': 'if(t.vol > 0 AND t.close > 0, t.amount * 10 / t.vol * t.close_qfq / t.close, NULL)',
+    'cap': 'f.total_mv',
+}
+
+# IndClass level -> rel_stock_sector.sector_type (Shenwan levels 1-3).
+GROUP_TYPES = {'sector': 'SW1', 'industry': 'SW2', 'subindustry': 'SW3'}
+
+MARKET_TABLE = 'market_stock_active_daily'
+
+
+def month_bounds(dates: pd.DatetimeIndex) -> list:
+    """(YYYYMM, start, stop) row ranges of each calendar month in sorted `dates`."""
+    periods = dates.to_period('M')
+    edges = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1], True])
+    return [(str(periods[a]).replace('-', ''), int(a), int(b)) for a, b in zip(edges[:-1], edges[1:])]
+
+
+class ClickHouseSource:
+    """Month-partitioned, prefetching Arrow reader of engine input panels."""
+
+    def __init__(self, client, start_date, end_date, fields=INPUTS, stocks=None, prefetch: bool = True):
+        self.client = client
+        self.fields = [f for f in fields if f in FIELD_SQL]
+        self.prefetch = prefetch
+        # Blocks are filled on the worker thread, which does not see the caller's precision.
+        self.dtype = Alpha101Engine.dtype
+        self.start_date = pd.Timestamp(start_date).date()
+        self.end_date = pd.Timestamp(end_date).date()
+        self._universe = ""
+        if stocks is not None:
+            self._universe = "AND t.stock_code IN (" + ", ".join(f"'{s}'" for s in stocks) + ")"
+        # One worker thread owns every query, so the client never runs two at once.
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='alpha101-loader')
+        self._blocks = {}
+        self.stats = {'months': 0, 'batches': 0, 'rows': 0, 'fetch_seconds': 0.0, 'wait_seconds': 0.0}
+
+        self.dates, self.stocks = self._worker.submit(self._fetch_axes).result()
+        self.months = month_bounds(self.dates)
+        self._month_of_row = np.repeat(np.arange(len(self.months)), [b - a for _, a, b in self.months])
+        self._days = self.dates.to_numpy().astype('datetime64[D]')
+        self._stock_values = pa.array(self.stocks.to_numpy(dtype=object), type=pa.string())
+        self.groups = self._worker.submit(self._fetch_groups).result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._worker.shutdown(wait=True, cancel_futures=True)
+        self._blocks.clear()
+
+    # -------------------------------- queries ---------------------------------
+
+    def _fetch_axes(self):
+        where = f"t.trade_date >= '{self.start_date}' AND t.trade_date <= '{self.end_date}' {self._universe}"
+        dates = self.client.query(
+            f"SELECT DISTINCT t.trade_date FROM {MARKET_TABLE} AS t WHERE {where} ORDER BY t.trade_date"
+        ).result_rows
+        stocks = self.client.query(
+            f"SELECT DISTINCT t.stock_code FROM {MARKET_TABLE} AS t WHERE {where} ORDER BY t.stock_code"
+        ).result_rows
+        return (pd.DatetimeIndex([r[0] for r in dates], name='trade_date'),
+                pd.Index([r[0] for r in stocks], name='stock_code'))
+
+    def _fetch_groups(self) -> dict:
+        types = ", ".join(f"'{t}'" for t in GROUP_TYPES.values())
+        rel = self.client.query_df(
+            f"SELECT stock_code, sector_type, sector_name FROM rel_stock_sector WHERE sector_type IN ({types})"
+        )
+        groups = {}
+        for group, sector_type in GROUP_TYPES.items():
+            labels = rel[rel['sector_type'] == sector_type].drop_duplicates('stock_code')
+            groups[group] = labels.set_index('stock_code')['sector_name'].reindex(self.stocks)
+        return groups
+
+    def _fetch_month(self, month: int) -> dict:
+        """Stream one month into {field: (dates, stocks) array}, NaN where no row exists."""
+        start = time.perf_counter()
+        _, a, b = self.months[month]
+        days = self._days[a:b]
+        block = {f: np.full((b - a, len(self.stocks)), np.nan, dtype=self.dtype)
+                 for f in self.fields}
+        join = ("LEFT JOIN stock_fundamental_daily AS f "
+                "ON t.stock_code = f.stock_code AND t.trade_date = f.trade_date") if 'cap' in self.fields else ""
+        select = ", ".join(f"{FIELD_SQL[f]} AS {f}" for f in self.fields)
+        sql = f"""
+            SELECT t.trade_date AS trade_date, t.stock_code AS stock_code, {select}
+            FROM {MARKET_TABLE} AS t
+            {join}
+            WHERE t.trade_date >= '{pd.Timestamp(days[0]).date()}'
+              AND t.trade_date <= '{pd.Timestamp(days[-1]).date()}' {self._universe}
+        """
+        with self.client.query_arrow_stream(sql, use_strings=True) as stream:
+            for batch in stream:
+                batch_days = batch.column('trade_date').to_numpy(zero_copy_only=False).astype('datetime64[D]')
+                rows = np.searchsorted(days, batch_days)
+                cols = pc.fill_null(pc.index_in(batch.column('stock_code'), value_set=self._stock_values), -1)
+                cols = cols.to_numpy(zero_copy_only=False)
+                keep = cols >= 0
+                rows, cols = rows[keep], cols[keep]
+                for field in self.fields:
+                    values = batch.column(field).to_numpy(zero_copy_only=False)
+                    block[field][rows, cols] = values[keep]
+                self.stats['batches'] += 1
+                self.stats['rows'] += int(keep.sum())
+        self.stats['months'] += 1
+        self.stats['fetch_seconds'] += time.perf_counter() - start
+        return block
+
+    # --------------------------------- reads ----------------------------------
+
+    def _request(self, month: int):
+        if 0 <= month < len(self.months) and month not in self._blocks:
+            self._blocks[month] = self._worker.submit(self._fetch_month, month)
+
+    def _block(self, month: int) -> dict:
+        self._request(month)
+        start = time.perf_counter()
+        block = self._blocks[month].result()
+        self.stats['wait_seconds'] += time.perf_counter() - start
+        return block
+
+    def read(self, fields, start: int, stop: int) -> dict:
+        """Panels of `fields` for date rows [start, stop), plus group labels.
+
+        Months before `start` are released, and the month after `stop` starts
+        streaming in the background before this call returns.
+        """
+        first, last = self._month_of_row[start], self._month_of_row[stop - 1]
+        for month in [m for m in self._blocks if m < first]:
+            del self._blocks[month]
+        parts = {f: [] for f in fields}
+        for month in range(first, last + 1):
+            block = self._block(month)
+            if self.prefetch and month == last:
+                self._request(last + 1)
+            _, a, _ = self.months[month]
+            lo, hi = max(start, a) - a, min(stop, self.months[month][2]) - a
+            for field in fields:
+                parts[field].append(block[field][lo:hi])
+        index = self.dates[start:stop]
+        out = {}
+        for field in fields:
+            values = parts[field][0] if len(parts[field]) == 1 else np.concatenate(parts[field])
+            out[field] = pd.DataFrame(values, index=index, columns=self.stocks, copy=False)
+        out.update(self.groups)
+        return out
+
+    def iter_months(self, fields=None):
+        """Yield (YYYYMM, panels) month by month, prefetching the next month."""
+        fields = self.fields if fields is None else list(fields)
+        for label, a, b in self.months:
+            yield label, self.read(fields, a, b)
+
+    def load(self, fields=None) -> dict:
+        """Every requested field over the full date range, as engine input panels."""
+        fields = self.fields if fields is None else list(fields)
+        return self.read(fields, 0, len(self.dates))
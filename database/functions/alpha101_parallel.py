@@ -0,0 +1,204 @@
+"""
+Process-Pool Executor for Alpha101 stage plans.
+
+Runs a StagePlan on a pool of worker processes. Time-series stages are
+sharded by blocks of stocks (each worker sees the full history of its
+codes), cross-sectional stages by blocks of dates (each worker sees whole
+cross sections). Input panels and every materialized stage result live in
+shared memory: workers map them as zero-copy views and write their shard of
+each result straight into the shared output buffer, so nothing but block
+bounds and labels is pickled between processes.
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from alpha101_benchmark import synthetic_panels
+from alpha101_expr import INPUTS, compile_formulas, load_formulas
+from alpha101_planner import plan_stages
+
+# Shards per worker and stage; a few per worker evens out uneven blocks.
+SHARDS_PER_WORKER = 2
+
+_WORKER = {}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open an existing block without handing its lifetime to this process."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedPanels:
+    """Named float64 (dates × stocks) arrays backed by shared memory blocks."""
+
+    def __init__(self, shape: tuple):
+        self.shape = shape
+        self.blocks = {}
+
+    def create(self, key, values=None) -> np.ndarray:
+        """Allocate a block for `key`, optionally filled with `values`."""
+        block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(self.shape)) * 8, 1))
+        self.blocks[key] = block
+        array = np.ndarray(self.shape, dtype=np.float64, buffer=block.buf)
+        if values is not None:
+            np.copyto(array, values, casting='unsafe')
+        return array
+
+    def array(self, key) -> np.ndarray:
+        return np.ndarray(self.shape, dtype=np.float64, buffer=self.blocks[key].buf)
+
+    def names(self, keys) -> dict:
+        """Block names for the given keys, as sent to workers."""
+        return {key: self.blocks[key].name for key in keys}
+
+    def release(self, key):
+        block = self.blocks.pop(key)
+        block.close()
+        block.unlink()
+
+    def release_all(self):
+        for key in list(self.blocks):
+            self.release(key)
+
+
+def _init_worker(formulas: dict, names: list):
+    graph = compile_formulas(formulas)
+    _WORKER['graph'] = graph
+    _WORKER['plan'] = plan_stages(graph, names)
+
+
+def _run_shard(stage_index: int, bounds: tuple, shape: tuple, reads: dict, writes: dict,
+               index, columns, groups: dict):
+    """Evaluate one stage on one block of stocks (TS) or dates (CS)."""
+    graph, plan = _WORKER['graph'], _WORKER['plan']
+    stage = plan.stages[stage_index]
+    rows, cols = (slice(*bounds), slice(None)) if stage.kind == 'cs' else (slice(None), slice(*bounds))
+    index, columns = index[rows], columns[cols]
+    blocks = {key: _attach(name) for key, name in {**reads, **writes}.items()}
+    try:
+        def view(key):
+            array = np.ndarray(shape, dtype=np.float64, buffer=blocks[key].buf)[rows, cols]
+            return pd.DataFrame(array, index=index, columns=columns, copy=False)
+
+        data = {key: view(key) for key in reads if isinstance(key, str)}
+        data.update(groups)
+        values = {key: view(key) for key in reads if not isinstance(key, str)}
+        for node in stage.nodes:
+            for arg in node.args:
+                if arg.id not in values:
+                    values[arg.id] = graph._compute(arg, [], data)
+            values[node.id] = graph._compute(node, [values[a.id] for a in node.args], data)
+        for key in writes:
+            target = np.ndarray(shape, dtype=np.float64, buffer=blocks[key].buf)[rows, cols]
+            value = values[key]
+            np.copyto(target, value.to_numpy(dtype=np.float64) if isinstance(value, pd.DataFrame) else value)
+        del data, values
+    finally:
+        for block in blocks.values():
+            block.close()
+
+
+def _shards(size: int, count: int) -> list:
+    edges = np.linspace(0, size, min(count, size) + 1).astype(int)
+    return [(int(lo), int(hi)) for lo, hi in zip(edges[:-1], edges[1:]) if hi > lo]
+
+
+class ParallelExecutor:
+    """Evaluate alphas over a pool of `workers` processes.
+
+    The pool (and the compiled graph inside each worker) is created once and
+    reused across `run` calls; use it as a context manager or call `close`.
+    """
+
+    def __init__(self, formulas: dict = None, names=None, workers: int = 28):
+        self.formulas = load_formulas() if formulas is None else dict(formulas)
+        self.graph = compile_formulas(self.formulas)
+        self.names = list(self.graph.outputs) if names is None else list(names)
+        self.plan = plan_stages(self.graph, self.names)
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        initargs=(self.formulas, self.names))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.shutdown()
+
+    def run(self, data: dict) -> dict:
+        """Evaluate all alphas on a dict of dates × stocks panels (plus group labels)."""
+        panel = data['close']
+        index, columns = panel.index, panel.columns
+        shape = panel.shape
+        groups = {k: v for k, v in data.items() if k not in INPUTS}
+        shared = SharedPanels(shape)
+        stage_of = self.plan.assignment
+        try:
+            for name in {s for stage in self.plan.stages for s in stage.inputs} & set(INPUTS):
+                shared.create(name, data[name].reindex(index=index, columns=columns).to_numpy(dtype=np.float64))
+            live = set()
+            for stage in self.plan.stages:
+                computed = [k for k in stage.materialize if stage_of[k] == stage.index]
+                for key in computed:
+                    shared.create(key)
+                reads = shared.names(live | (stage.inputs & set(INPUTS)))
+                writes = shared.names(computed)
+                size = shape[0] if stage.kind == 'cs' else shape[1]
+                futures = [
+                    self.pool.submit(_run_shard, stage.index, bounds, shape, reads, writes,
+                                     index, columns, groups)
+                    for bounds in _shards(size, self.workers * SHARDS_PER_WORKER)
+                ]
+                for future in futures:
+                    future.result()
+                for key in live - stage.materialize:
+                    shared.release(key)
+                live = set(stage.materialize)
+            outputs = {}
+            for name in self.names:
+                node = self.graph.outputs[name]
+                outputs[name] = pd.DataFrame(shared.array(node.id).copy(), index=index, columns=columns)
+            return outputs
+        finally:
+            shared.release_all()
+
+
+# ------------------------------------------------------------------------------
+# Scaling Benchmark
+# ------------------------------------------------------------------------------
+
+def benchmark_scaling(workers=(1, 2, 4, 8, 16, 28), n_dates: int = 1000, n_stocks: int = 5000,
+                      names=None) -> pd.DataFrame:
+    """Wall time of a full run per worker count, with speedup against the first entry."""
+    data = synthetic_panels(n_stocks, n_dates)
+    rows = []
+    for count in workers:
+        with ParallelExecutor(names=names, workers=count) as executor:
+            executor.run({k: v.iloc[:50] if isinstance(v, pd.DataFrame) else v for k, v in data.items()})
+            start = time.perf_counter()
+            executor.run(data)
+            rows.append({'workers': count, 'seconds': time.perf_counter() - start})
+    result = pd.DataFrame(rows)
+    result['speedup'] = result['seconds'].iloc[0] / result['seconds']
+    result['efficiency'] = result['speedup'] * result['workers'].iloc[0] / result['workers']
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Alpha101 parallel executor scaling benchmark')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16, 28])
+    parser.add_argument('--dates', type=int, default=1000)
+    parser.add_argument('--stocks', type=int, default=5000)
+    args = parser.parse_args()
+    print(benchmark_scaling(args.workers, args.dates, args.stocks).to_string(index=False))
@@ -0,0 +1,166 @@
+"""
+Stage Planner for compiled Alpha101 graphs.
+
+Replaces the hand-built P1–P5 split. Every time-series operator needs the
+panel laid out per stock (full history of each code), every cross-sectional
+operator needs it per date (all codes of a day). The planner assigns each
+node of an AlphaGraph to the earliest stage of the right kind, so adjacent
+operators of the same kind are fused into one pass and the number of
+TS <-> CS alternations is the minimum the formulas allow. Element-wise
+operators carry no layout requirement and run in the stage of their latest
+argument. Only values read by a later stage (or requested as outputs) are
+materialized between stages.
+"""
+
+import time
+from collections import Counter
+
+from alpha101_expr import INPUTS, AlphaGraph
+from alpha101_kernels import MOMENTS
+
+STAGE_KINDS = ('ts', 'cs')
+
+
+class Stage:
+    """One materialization pass: nodes run in a single layout, in id order."""
+
+    def __init__(self, index: int, kind: str):
+        self.index = index
+        self.kind = kind
+        self.nodes = []
+        self.inputs = set()
+        self.materialize = set()
+
+    def __repr__(self):
+        return f"Stage({self.index}, {self.kind}, nodes={len(self.nodes)}, materialize={len(self.materialize)})"
+
+
+class StagePlan:
+    """Ordered stages for a set of alphas of one AlphaGraph."""
+
+    def __init__(self, graph: AlphaGraph, names: list, stages: list, assignment: dict):
+        self.graph = graph
+        self.names = names
+        self.stages = stages
+        self.assignment = assignment
+
+    def summary(self) -> list:
+        """Per-stage counts of fused operators, inputs read and values materialized."""
+        rows = []
+        for stage in self.stages:
+            ops = Counter(n.kind for n in stage.nodes)
+            rows.append({
+                'stage': stage.index,
+                'kind': stage.kind,
+                'ts_ops': ops['ts'],
+                'cs_ops': ops['cs'],
+                'elem_ops': ops['elem'],
+                'inputs': len(stage.inputs),
+                'materialized': len(stage.materialize),
+            })
+        return rows
+
+    def depth(self, name: str) -> int:
+        """Number of stages needed by one alpha."""
+        return self.assignment[self.graph.outputs[name].id] + 1
+
+    def execute(self, data: dict, on_stage=None) -> dict:
+        """Evaluate the plan stage by stage on a dict of dates × stocks panels.
+
+        Values are dropped after their last reader; between stages only the
+        materialized frontier is kept alive.
+        `on_stage(stage, frontier, seconds)` is called after every stage, e.g.
+        to checkpoint the frontier to disk.
+        """
+        graph = self.graph
+        leaves = {n.id: graph._compute(n, [], data) for n in graph.required(self.names)
+                  if n.op in ('input', 'const')}
+        remaining = graph.consumers(self.names)
+        values = dict(leaves)
+        for stage in self.stages:
+            start = time.perf_counter()
+            for node in stage.nodes:
+                values[node.id] = graph._compute(node, [values[a.id] for a in node.args], data)
+                for child in set(node.args):
+                    remaining[child.id] -= 1
+                    if remaining[child.id] == 0 and child.id not in leaves and child.id not in stage.materialize:
+                        del values[child.id]
+            frontier = {k: values[k] for k in stage.materialize}
+            values = {**leaves, **frontier}
+            if on_stage is not None:
+                on_stage(stage, frontier, time.perf_counter() - start)
+            del frontier
+        return {n: values[self.graph.outputs[n].id] for n in self.names}
+
+    def peak_values(self) -> int:
+        """Most panel-sized values alive at once during `execute`, inputs included."""
+        graph = self.graph
+        remaining = graph.consumers(self.names)
+        size = {n.id: len(MOMENTS) if n.op == 'moments' else 1 for n in graph.required(self.names)}
+        inputs = {n.id for n in graph.required(self.names) if n.op == 'input' and n.params[0] in INPUTS}
+        live = set(inputs)
+        peak = len(live)
+        for stage in self.stages:
+            for node in stage.nodes:
+                live.add(node.id)
+                peak = max(peak, sum(size[k] for k in live))
+                for child in set(node.args):
+                    remaining[child.id] -= 1
+                    if remaining[child.id] == 0 and child.id not in inputs and child.id not in stage.materialize:
+                        live.discard(child.id)
+            live = inputs | stage.materialize
+        return peak
+
+
+def _assign(nodes: list, first: str) -> dict:
+    """Earliest stage of each node when stage 0 has kind `first`."""
+    other = STAGE_KINDS[1] if first == STAGE_KINDS[0] else STAGE_KINDS[0]
+    stage = {}
+    for node in nodes:
+        if node.kind in ('input', 'const'):
+            stage[node.id] = -1
+            continue
+        level = max([stage[a.id] for a in node.args] + [0])
+        if node.kind in STAGE_KINDS and node.kind != (first if level % 2 == 0 else other):
+            level += 1
+        stage[node.id] = level
+    return stage
+
+
+def plan_stages(graph: AlphaGraph, names=None) -> StagePlan:
+    """Split the subgraph of `names` into the fewest alternating TS/CS stages."""
+    names = list(graph.outputs) if names is None else list(names)
+    nodes = graph.required(names)
+    outputs = {graph.outputs[n].id for n in names}
+
+    best = None
+    for first in STAGE_KINDS:
+        assignment = _assign(nodes, first)
+        n_stages = max(assignment[i] for i in outputs) + 1
+        crossing = sum(
+            1 for node in nodes for a in node.args
+            if assignment[a.id] >= 0 and assignment[a.id] < assignment[node.id]
+        )
+        if best is None or (n_stages, crossing) < best[:2]:
+            best = (n_stages, crossing, first, assignment)
+    n_stages, _, first, assignment = best
+
+    other = STAGE_KINDS[1] if first == STAGE_KINDS[0] else STAGE_KINDS[0]
+    stages = [Stage(i, first if i % 2 == 0 else other) for i in range(n_stages)]
+    last_use = {i: n_stages - 1 for i in outputs}
+    for node in nodes:
+        for arg in node.args:
+            last_use[arg.id] = max(last_use.get(arg.id, -1), assignment[node.id])
+    for node in nodes:
+        level = assignment[node.id]
+        if level < 0:
+            continue
+        stages[level].nodes.append(node)
+        stages[level].inputs.update(a.params[0] for a in node.args if a.op == 'input')
+        # A value read by a later stage is carried through every stage up to its last reader.
+        for later in range(level, last_use.get(node.id, level)):
+            stages[later].materialize.add(node.id)
+    for node_id in outputs:
+        if assignment[node_id] >= 0:
+            stages[n_stages - 1].materialize.add(node_id)
+    return StagePlan(graph, names, stages, assignment)
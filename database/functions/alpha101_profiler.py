@@ -0,0 +1,216 @@
+"""
+Opt-in Profiling for Alpha101Engine operators and alpha graphs.
+
+While an EngineProfiler is active, the public operators of Alpha101Engine
+(and AlphaGraph node evaluation) are wrapped to record call counts, wall
+time, input cells and peak allocated bytes. Outside the `with` block the
+original functions are restored, so disabled instrumentation costs nothing.
+
+Times are reported both inclusive ("seconds") and exclusive of nested
+operator calls ("self_seconds"), e.g. correlation -> moments. Per-alpha
+cost comes from `with profiler.alpha(name)` around hand-written code, or,
+for AlphaGraph runs, from the nodes each alpha needs: "seconds" is the
+standalone cost of the alpha's subgraph, "exclusive_seconds" the part no
+other alpha shares.
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+
+from alpha101_engine import Alpha101Engine
+from alpha101_expr import AlphaGraph
+
+LEAF_OPS = ('input', 'const')
+UNPROFILED = ('profile', 'precision')
+
+
+def _cells(args) -> int:
+    return sum(int(np.size(a)) for a in args if isinstance(a, (pd.DataFrame, pd.Series, np.ndarray)))
+
+
+def _new_stats() -> dict:
+    return {'calls': 0, 'seconds': 0.0, 'self_seconds': 0.0, 'cells': 0, 'peak_bytes': 0}
+
+
+class EngineProfiler:
+    """Collects per-operator and per-alpha costs while active."""
+
+    def __init__(self, track_memory: bool = True):
+        self.track_memory = track_memory
+        self.operators = {}
+        self.alphas = {}
+        self.nodes = {}
+        self._graphs = {}
+        self._stack = []
+        self._label = None
+        self._engine_calls = 0
+        self._originals = {}
+        self._started_tracemalloc = False
+
+    # ------------------------------ activation --------------------------------
+
+    def __enter__(self):
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        for name, member in vars(Alpha101Engine).items():
+            if isinstance(member, staticmethod) and not name.startswith('_') and name not in UNPROFILED:
+                self._originals[name] = member
+                setattr(Alpha101Engine, name, staticmethod(self._wrap(name, member.__func__)))
+        self._originals['_compute'] = AlphaGraph._compute
+        AlphaGraph._compute = self._wrap_node(AlphaGraph._compute)
+        return self
+
+    def __exit__(self, *exc):
+        AlphaGraph._compute = self._originals.pop('_compute')
+        for name, member in self._originals.items():
+            setattr(Alpha101Engine, name, member)
+        self._originals.clear()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @contextmanager
+    def alpha(self, name: str):
+        """Attribute operator calls inside the block to alpha `name`."""
+        previous, self._label = self._label, name
+        try:
+            yield
+        finally:
+            self._label = previous
+
+    # ------------------------------- recording --------------------------------
+
+    def _enter(self):
+        frame = {'start': time.perf_counter(), 'child_seconds': 0.0, 'base': 0, 'peak': 0}
+        if self.track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['base'] = current
+        self._stack.append(frame)
+        return frame
+
+    def _exit(self, frame):
+        self._stack.pop()
+        seconds = time.perf_counter() - frame['start']
+        peak = 0
+        if self.track_memory:
+            absolute = max(tracemalloc.get_traced_memory()[1], frame['peak'])
+            peak = absolute - frame['base']
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], absolute)
+        if self._stack:
+            self._stack[-1]['child_seconds'] += seconds
+        return seconds, seconds - frame['child_seconds'], peak
+
+    @staticmethod
+    def _add(table: dict, key, seconds, self_seconds, cells, peak):
+        stats = table.setdefault(key, _new_stats())
+        stats['calls'] += 1
+        stats['seconds'] += seconds
+        stats['self_seconds'] += self_seconds
+        stats['cells'] += cells
+        stats['peak_bytes'] = max(stats['peak_bytes'], peak)
+
+    def _wrap(self, name, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self._engine_calls += 1
+            frame = self._enter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds, self_seconds, peak = self._exit(frame)
+                cells = _cells(args)
+                self._add(self.operators, name, seconds, self_seconds, cells, peak)
+                if self._label is not None:
+                    self._add(self.alphas, self._label, seconds, self_seconds, cells, peak)
+        return wrapper
+
+    def _wrap_node(self, compute):
+        profiler = self
+
+        @wraps(compute)
+        def wrapper(graph, node, args, data):
+            if node.op in LEAF_OPS:
+                return compute(graph, node, args, data)
+            calls = profiler._engine_calls
+            frame = profiler._enter()
+            try:
+                return compute(graph, node, args, data)
+            finally:
+                seconds, self_seconds, peak = profiler._exit(frame)
+                cells = _cells(args)
+                profiler._graphs[id(graph)] = graph
+                profiler._add(profiler.nodes, (id(graph), node.id), seconds, seconds, cells, peak)
+                if profiler._engine_calls == calls:
+                    # Element-wise nodes never reach the engine; report them by graph op.
+                    profiler._add(profiler.operators, node.op, seconds, self_seconds, cells, peak)
+        return wrapper
+
+    # -------------------------------- reports ---------------------------------
+
+    def operator_report(self) -> pd.DataFrame:
+        """Operators ranked by exclusive wall time."""
+        frame = pd.DataFrame.from_dict(self.operators, orient='index')
+        if frame.empty:
+            return frame
+        frame.index.name = 'operator'
+        frame['share'] = frame['self_seconds'] / frame['self_seconds'].sum()
+        return frame.sort_values('self_seconds', ascending=False)
+
+    def alpha_report(self) -> pd.DataFrame:
+        """Alphas ranked by standalone cost (labelled calls plus graph subgraphs)."""
+        rows = {name: dict(stats, exclusive_seconds=stats['self_seconds'])
+                for name, stats in self.alphas.items()}
+        for graph_id, graph in self._graphs.items():
+            owners = {}
+            for name in graph.outputs:
+                for node in graph.required([name]):
+                    owners.setdefault(node.id, []).append(name)
+            for name in graph.outputs:
+                needed = [self.nodes[graph_id, n.id] for n in graph.required([name])
+                          if (graph_id, n.id) in self.nodes]
+                if not needed:
+                    continue
+                row = rows.setdefault(name, dict(_new_stats(), exclusive_seconds=0.0))
+                row['calls'] += sum(s['calls'] for s in needed)
+                row['seconds'] += sum(s['seconds'] for s in needed)
+                row['self_seconds'] += sum(s['seconds'] for s in needed)
+                row['cells'] += sum(s['cells'] for s in needed)
+                row['peak_bytes'] = max([row['peak_bytes']] + [s['peak_bytes'] for s in needed])
+                row['exclusive_seconds'] += sum(
+                    self.nodes[graph_id, n.id]['seconds'] for n in graph.required([name])
+                    if (graph_id, n.id) in self.nodes and len(owners[n.id]) == 1
+                )
+        frame = pd.DataFrame.from_dict(rows, orient='index')
+        if frame.empty:
+            return frame
+        frame.index.name = 'alpha'
+        return frame.drop(columns='self_seconds').sort_values('seconds', ascending=False)
+
+    def report(self, top: int = 20) -> str:
+        """Plain-text tables of the hottest operators and alphas."""
+        parts = ['== Operators ==', self.operator_report().head(top).to_string(),
+                 '', '== Alphas ==', self.alpha_report().head(top).to_string()]
+        return '\n'.join(parts)
+
+    def to_json(self, path=None) -> str:
+        """JSON dump of both reports; written to `path` when given."""
+        payload = {
+            'operators': self.operator_report().reset_index().to_dict(orient='records'),
+            'alphas': self.alpha_report().reset_index().to_dict(orient='records'),
+        }
+        text = json.dumps(payload, indent=2, default=float)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
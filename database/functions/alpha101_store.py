@@ -0,0 +1,236 @@
+"""
+Memory-Mapped Panel Store for Alpha101 inputs and intermediate factors.
+
+A directory of fixed-layout files that any process can map zero-copy:
+
+    meta.json            dtype, stock capacity, field -> file name, groups
+    dates.npy            datetime64[D] date axis
+    stocks.npy           stock axis (fixed-width unicode)
+    <group>.npy          (stock, label) records of one IndClass level, labels typed
+    <field>.<gen>.bin    raw dates × capacity array, row-major
+
+Rows are dates, so a date range is one contiguous byte range of every
+field file and appending a day is appending one row. Each file reserves
+spare stock columns beyond the current axis (filled with NaN), so stocks
+listed later take a free column without touching existing rows; only when
+the reserve runs out are the files rewritten under a new generation name.
+Readers map every field file at open and only fault in the pages they
+slice; a rewrite under a new generation unlinks the old files, which stay
+readable through the mappings of readers that opened them.
+
+    store = PanelStore.create('panels', data)          # or PanelStore('panels')
+    store.append(next_days)                            # daily update
+    panels = store.read(['close', 'volume'], *store.rows('2024-01-01', '2024-06-30'))
+    for outputs in TiledRunner(graph).run(store):      # FrameSource interface
+        ...
+
+There is a single writer per store; meta.json and the axis files are
+replaced atomically, so readers opened concurrently keep a consistent view.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from alpha101_engine import Alpha101Engine
+from alpha101_expr import GROUPS
+
+STORE_VERSION = 2
+# Spare stock columns reserved on every (re)layout, as a share of the axis.
+STOCK_RESERVE = 0.1
+
+
+def _replace_json(path: Path, payload: dict):
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(payload, indent=1, ensure_ascii=False))
+    os.replace(tmp, path)
+
+
+def _replace_npy(path: Path, values: np.ndarray):
+    tmp = path.with_name(path.stem + '.tmp.npy')
+    np.save(tmp, values)
+    os.replace(tmp, path)
+
+
+def _records(labels: pd.Series) -> np.ndarray:
+    """(stock, label) records; object labels become unicode, numeric ones keep their dtype."""
+    values = labels.to_numpy()
+    if values.dtype == object:
+        values = values.astype(str)
+    stocks = labels.index.to_numpy(dtype=str)
+    records = np.empty(len(labels), dtype=[('stock', stocks.dtype), ('label', values.dtype)])
+    records['stock'], records['label'] = stocks, values
+    return records
+
+
+class PanelStore:
+    """Date-appendable, memory-mapped dates × stocks panels sharing one axis pair."""
+
+    def __init__(self, root, mode: str = 'r'):
+        self.root = Path(root)
+        self.mode = mode
+        self.meta = json.loads((self.root / 'meta.json').read_text())
+        if self.meta['version'] != STORE_VERSION:
+            raise ValueError(f"Unsupported store version {self.meta['version']}")
+        self.dtype = np.dtype(self.meta['dtype'])
+        self.dates = pd.DatetimeIndex(np.load(self.root / 'dates.npy'), name='trade_date')
+        self.stocks = pd.Index(np.load(self.root / 'stocks.npy').astype(object), name='stock_code')
+        self.groups = {g: self._labels(g).reindex(self.stocks) for g in self.meta['groups']}
+        self._maps = {}
+        for field in self.meta['files']:
+            self._map(field)
+
+    @property
+    def fields(self) -> list:
+        return list(self.meta['files'])
+
+    @property
+    def capacity(self) -> int:
+        return self.meta['capacity']
+
+    def _labels(self, group: str) -> pd.Series:
+        records = np.load(self.root / f"{group}.npy")
+        return pd.Series(records['label'], index=records['stock'].astype(object), name=group)
+
+    def _map(self, field: str) -> np.ndarray:
+        """Whole-file mapping of one field, (mapped dates) × capacity."""
+        if field not in self._maps:
+            path = self.root / self.meta['files'][field]
+            rows = len(self.dates)
+            if rows == 0:
+                return np.empty((0, self.capacity), dtype=self.dtype)
+            self._maps[field] = np.memmap(path, dtype=self.dtype, mode=self.mode,
+                                          shape=(rows, self.capacity))
+        return self._maps[field]
+
+    # ---------------------------------- reads ---------------------------------
+
+    def rows(self, start_date=None, end_date=None) -> tuple:
+        """Row range [start, stop) of the dates within [start_date, end_date]."""
+        start = 0 if start_date is None else int(self.dates.searchsorted(pd.Timestamp(start_date)))
+        stop = len(self.dates) if end_date is None else int(self.dates.searchsorted(pd.Timestamp(end_date), 'right'))
+        return start, stop
+
+    def panel(self, field: str, start: int = 0, stop: int = None, columns: slice = slice(None)) -> pd.DataFrame:
+        """Zero-copy dates × stocks view of one field over rows [start, stop) and a column block."""
+        stop = len(self.dates) if stop is None else stop
+        values = self._map(field)[start:stop, :len(self.stocks)][:, columns]
+        return pd.DataFrame(values, index=self.dates[start:stop], columns=self.stocks[columns], copy=False)
+
+    def read(self, fields, start: int, stop: int, columns: slice = slice(None)) -> dict:
+        """Panels of `fields` for date rows [start, stop), plus group labels."""
+        out = {f: self.panel(f, start, stop, columns) for f in fields}
+        stocks = self.stocks[columns]
+        out.update({g: labels.reindex(stocks) for g, labels in self.groups.items()})
+        return out
+
+    def load(self, fields=None) -> dict:
+        """Every field (default: all) over the full date range, as engine input panels."""
+        return self.read(self.fields if fields is None else list(fields), 0, len(self.dates))
+
+    # --------------------------------- writes ---------------------------------
+
+    @classmethod
+    def create(cls, root, data: dict, fields=None, dtype=None) -> 'PanelStore':
+        """New store holding the panels of `data` (and its group labels)."""
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        panels = {k: v for k, v in data.items() if isinstance(v, pd.DataFrame)}
+        fields = [f for f in panels if fields is None or f in fields]
+        dtype = np.dtype(Alpha101Engine.dtype if dtype is None else dtype)
+        _replace_npy(root / 'dates.npy', np.empty(0, dtype='datetime64[D]'))
+        _replace_npy(root / 'stocks.npy', np.empty(0, dtype='<U1'))
+        _replace_json(root / 'meta.json', {
+            'version': STORE_VERSION, 'dtype': dtype.name, 'capacity': 0, 'generation': 0,
+            'files': {}, 'groups': [],
+        })
+        store = cls(root, mode='r+')
+        store.append({**{f: panels[f] for f in fields},
+                      **{g: data[g] for g in GROUPS.values() if g in data}})
+        return store
+
+    def append(self, data: dict):
+        """Add panels for dates after the last stored date.
+
+        Stocks new to the store get a free column (NaN on earlier dates);
+        stored fields missing from `data` are NaN on the new dates; fields
+        new to the store are NaN on the earlier dates. Group labels in
+        `data` overwrite those of the stocks they cover.
+        """
+        if self.mode == 'r':
+            raise PermissionError(f"Store {self.root} is opened read-only")
+        panels = {k: v for k, v in data.items() if isinstance(v, pd.DataFrame)}
+        new_index = next(iter(panels.values())).index
+        if len(self.dates) and new_index.min() <= self.dates[-1]:
+            raise ValueError(f"Appended dates must follow {self.dates[-1].date()}")
+
+        columns = pd.Index([]).append([p.columns for p in panels.values()]).unique()
+        stocks = self.stocks.append(columns.difference(self.stocks))
+        missing_fields = [f for f in panels if f not in self.meta['files']]
+        if len(stocks) > self.capacity or missing_fields:
+            self._relayout(len(stocks), missing_fields)
+
+        rows = len(new_index)
+        for field, name in self.meta['files'].items():
+            block = np.full((rows, self.capacity), np.nan, dtype=self.dtype)
+            if field in panels:
+                frame = panels[field].reindex(index=new_index)
+                block[:, stocks.get_indexer(frame.columns)] = frame.to_numpy(dtype=self.dtype)
+            with open(self.root / name, 'ab') as f:
+                f.write(block.tobytes())
+
+        for group in GROUPS.values():
+            if group in data:
+                labels = data[group].dropna()
+                if group in self.meta['groups']:
+                    held = self._labels(group)
+                    labels = pd.concat([held[~held.index.isin(labels.index)], labels])
+                _replace_npy(self.root / f"{group}.npy", _records(labels))
+                if group not in self.meta['groups']:
+                    self.meta['groups'].append(group)
+
+        _replace_npy(self.root / 'stocks.npy', stocks.to_numpy(dtype=str))
+        _replace_npy(self.root / 'dates.npy', self.dates.append(new_index).to_numpy().astype('datetime64[D]'))
+        _replace_json(self.root / 'meta.json', self.meta)
+        self.__init__(self.root, self.mode)
+
+    def _relayout(self, stocks: int, new_fields: list):
+        """Rewrite every field file with room for `stocks` plus the reserve, under a new generation."""
+        capacity = max(self.capacity, stocks + int(np.ceil(stocks * STOCK_RESERVE)))
+        generation = self.meta['generation'] + 1
+        files = {}
+        for field in [*self.meta['files'], *new_fields]:
+            name = files[field] = f"{field}.{generation}.bin"
+            if not len(self.dates):
+                (self.root / name).write_bytes(b'')
+                continue
+            target = np.memmap(self.root / name, dtype=self.dtype, mode='w+', shape=(len(self.dates), capacity))
+            target[:] = np.nan
+            if field in self.meta['files']:
+                target[:, :self.capacity] = self._map(field)
+            target.flush()
+            del target
+        old = list(self.meta['files'].values())
+        self._maps.clear()
+        self.meta.update(capacity=capacity, generation=generation, files=files)
+        _replace_json(self.root / 'meta.json', self.meta)
+        # Readers that mapped the old files keep them until they close.
+        for name in old:
+            (self.root / name).unlink(missing_ok=True)
+
+    def write_field(self, field: str, panel: pd.DataFrame):
+        """Store a full-history panel (e.g. an intermediate rank) aligned to the store axes."""
+        if self.mode == 'r':
+            raise PermissionError(f"Store {self.root} is opened read-only")
+        if field not in self.meta['files']:
+            self._relayout(len(self.stocks), [field])
+        frame = panel.reindex(index=self.dates, columns=self.stocks)
+        target = self._map(field)
+        target[:, :len(self.stocks)] = frame.to_numpy(dtype=self.dtype)
+        target.flush()
+
+    def nbytes(self) -> int:
+        return sum((self.root / name).stat().st_size for name in self.meta['files'].values())
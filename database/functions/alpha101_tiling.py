@@ -0,0 +1,100 @@
+"""
+Out-of-Core Alpha101 Evaluation by Date Tiles.
+
+Instead of holding the full history in RAM (and spilling stage outputs to
+Parquet), the history is processed in blocks of consecutive dates. Each
+tile is read together with a halo of preceding dates covering the longest
+chain of rolling windows in the requested alphas, streamed through every
+TS/CS stage of the plan, and emitted without the halo. The tile length is
+derived from a memory budget and the plan's peak number of live panels,
+so peak memory depends on the budget and the stock count, not on the
+length of the history.
+"""
+
+import numpy as np
+import pandas as pd
+
+from alpha101_engine import Alpha101Engine
+from alpha101_expr import INPUTS, AlphaGraph
+from alpha101_planner import plan_stages
+
+# Scratch panels assumed on top of live values for kernel temporaries.
+KERNEL_WORKSPACE = 8
+
+DEFAULT_BUDGET = 4 * 1024 ** 3
+
+
+class FrameSource:
+    """Date-sliceable source over in-memory panels.
+
+    Any object with the same `dates`, `stocks` and `read` members can feed
+    TiledRunner, e.g. a reader over a panel store or a database.
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.dates = data['close'].index
+        self.stocks = data['close'].columns
+
+    def read(self, fields, start: int, stop: int) -> dict:
+        """Panels of `fields` for date rows [start, stop), plus group labels."""
+        out = {f: self.data[f].iloc[start:stop] for f in fields}
+        out.update({k: v for k, v in self.data.items() if k not in INPUTS})
+        return out
+
+
+class TiledRunner:
+    """Evaluate alphas tile by tile within a memory budget (bytes)."""
+
+    def __init__(self, graph: AlphaGraph, names=None, memory_budget: int = DEFAULT_BUDGET,
+                 tile_rows: int = None):
+        self.graph = graph
+        self.names = list(graph.outputs) if names is None else list(names)
+        self.plan = plan_stages(graph, self.names)
+        self.halo = graph.history(self.names) - 1
+        self.memory_budget = memory_budget
+        self.tile_rows = tile_rows
+        self.fields = sorted({n.params[0] for n in graph.required(self.names)
+                              if n.op == 'input' and n.params[0] in INPUTS})
+
+    def rows_for(self, n_stocks: int) -> int:
+        """Output dates per tile that fit the budget once the halo is added."""
+        if self.tile_rows is not None:
+            return self.tile_rows
+        # A tile covers halo + rows dates while the plan runs; the previous tile's
+        # outputs (rows dates per alpha) may still be held by the consumer. Values are
+        # stored as the engine dtype, kernel temporaries accumulate in float64.
+        itemsize = np.dtype(Alpha101Engine.dtype).itemsize
+        working = n_stocks * (self.plan.peak_values() * itemsize + KERNEL_WORKSPACE * 8)
+        output = n_stocks * len(self.names) * itemsize
+        rows = (self.memory_budget - self.halo * working) // (working + output)
+        if rows < 1:
+            needed = self.halo * working + working + output
+            raise ValueError(
+                f"Memory budget of {self.memory_budget} bytes cannot hold a {self.halo}-date halo "
+                f"for {n_stocks} stocks; at least {needed} bytes are needed"
+            )
+        return int(rows)
+
+    def tiles(self, n_dates: int, n_stocks: int) -> list:
+        """(start, stop) output row bounds of every tile."""
+        rows = self.rows_for(n_stocks)
+        return [(start, min(start + rows, n_dates)) for start in range(0, n_dates, rows)]
+
+    def run(self, source, start_date=None, end_date=None):
+        """Yield {alpha: dates × stocks panel} for consecutive tiles of [start_date, end_date].
+
+        Halos reach back before `start_date` when the source has the history.
+        """
+        dates = source.dates
+        first = 0 if start_date is None else dates.searchsorted(pd.Timestamp(start_date))
+        last = len(dates) if end_date is None else dates.searchsorted(pd.Timestamp(end_date), side='right')
+        for start, stop in self.tiles(last - first, len(source.stocks)):
+            start, stop = first + start, first + stop
+            read_start = max(0, start - self.halo)
+            data = source.read(self.fields, read_start, stop)
+            outputs = self.plan.execute(data)
+            del data
+            # Copy the tile rows out alpha by alpha, so neither the full-height
+            # results nor the halo stay pinned by what the consumer holds.
+            yield {name: outputs.pop(name).iloc[start - read_start:].copy() for name in self.names}
@@ -0,0 +1,251 @@
+"""
+Partition-Aligned Bulk Writer for factor_db.factor_alphas_daily.
+
+Takes engine output (``{alpha_name: dates × stocks}`` panels, whole or as
+TiledRunner tiles) and writes it one ``toYYYYMM(trade_date)`` partition at a
+time over the Arrow insert path of clickhouse_connect:
+
+* each month is turned into one columnar Arrow table (all-NaN stock rows
+  dropped, NaN / inf stored as NULL) and inserted as a single block into a
+  month-private staging table, so it lands as one part;
+* the staged partition then atomically replaces the target partition with
+  ``ALTER TABLE ... REPLACE PARTITION``, which makes a rewrite of a month
+  idempotent and never leaves small parts behind for OPTIMIZE to merge;
+* months are written by a pool of threads, each with its own client, and a
+  failed month is retried from scratch with exponential backoff.
+
+    writer = FactorWriter(lambda: clickhouse_connect.get_client(...), workers=4)
+    for tile in TiledRunner(graph).run(source):
+        writer.write_tile(tile)
+    writer.flush()
+    writer.report()            # rows, seconds and rows/sec per month
+
+Writes overlay what the partition already holds: the month's existing rows
+are read back first, so alphas and dates absent from the output keep their
+values, while the written alphas on the written dates take the new values
+(NULL where the engine produced NaN).
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from alpha101_loader import month_bounds
+
+TABLE = 'factor_db.factor_alphas_daily'
+
+
+class FactorWriter:
+    """Parallel, retrying month-partition writer of alpha panels."""
+
+    def __init__(self, client_factory, table: str = TABLE, workers: int = 4,
+                 retries: int = 3, backoff: float = 2.0):
+        self.client_factory = client_factory
+        self.table = table
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='alpha101-writer')
+        self._futures = {}
+        self._pending = {}
+        self._columns = None
+        self._started = None
+        self.log = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    # --------------------------------- client ---------------------------------
+
+    def _client(self):
+        """Client of the calling thread; clickhouse_connect clients are not shared."""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.client_factory()
+        return client
+
+    @property
+    def columns(self) -> list:
+        if self._columns is None:
+            desc = self._client().query_df(f"DESCRIBE {self.table}")
+            self._columns = list(desc['name'])
+        return self._columns
+
+    # --------------------------------- arrow ----------------------------------
+
+    def _check(self, outputs: dict):
+        unknown = [n for n in outputs if n not in self.columns]
+        if unknown:
+            raise KeyError(f"Not columns of {self.table}: {', '.join(unknown)}")
+
+    def to_arrow(self, outputs: dict) -> pa.Table:
+        """One Arrow table in table column order; rows where every alpha is NaN are dropped."""
+        self._check(outputs)
+        names = [c for c in self.columns if c in outputs]
+        first = outputs[names[0]]
+        dates, stocks = first.index, first.columns
+        values = {}
+        for name in names:
+            panel = outputs[name].reindex(index=dates, columns=stocks)
+            block = panel.to_numpy(dtype=np.float64).ravel()
+            values[name] = np.where(np.isfinite(block), block, np.nan)
+        keep = ~np.logical_and.reduce([np.isnan(v) for v in values.values()])
+        rows = np.flatnonzero(keep)
+        day_index, stock_index = np.divmod(rows, len(stocks))
+        days = dates.to_numpy().astype('datetime64[D]')
+        stock_values = pa.array(stocks.to_numpy(dtype=object), type=pa.string())
+        columns = {
+            'trade_date': pa.array(days[day_index]),
+            'stock_code': pc.take(stock_values, pa.array(stock_index)),
+        }
+        for name in names:
+            columns[name] = pa.array(values[name][rows], from_pandas=True)
+        return pa.table(columns)
+
+    # --------------------------------- overlay --------------------------------
+
+    def _existing(self, client, month: str) -> dict:
+        """Rows already in the target partition as {alpha: dates × stocks panel}."""
+        frame = client.query_df(f"SELECT * FROM {self.table} WHERE toYYYYMM(trade_date) = {month}")
+        if frame.empty:
+            return {}
+        frame['trade_date'] = pd.to_datetime(frame['trade_date'])
+        wide = frame.set_index(['trade_date', 'stock_code']).astype(np.float64).unstack('stock_code')
+        return {name: wide[name] for name in wide.columns.unique(0)}
+
+    def _overlay(self, outputs: dict, existing: dict) -> dict:
+        """Written panels laid over the partition's rows, covering every stored alpha."""
+        if not existing:
+            return outputs
+        first, held = next(iter(outputs.values())), next(iter(existing.values()))
+        dates, stocks = held.index.union(first.index), held.columns.union(first.columns)
+        rows = dates.get_indexer(first.index)
+        merged = {}
+        for name in self.columns:
+            if name not in outputs and name not in existing:
+                continue
+            if name in existing:
+                values = existing[name].reindex(index=dates, columns=stocks).to_numpy(dtype=np.float64, copy=True)
+            else:
+                values = np.full((len(dates), len(stocks)), np.nan)
+            if name in outputs:
+                values[rows] = outputs[name].reindex(index=first.index, columns=stocks).to_numpy(dtype=np.float64)
+            merged[name] = pd.DataFrame(values, index=dates, columns=stocks)
+        return merged
+
+    # --------------------------------- writes ---------------------------------
+
+    def _stage_table(self, month: str) -> str:
+        return f"{self.table}_stage_{month}"
+
+    def _write_month(self, month: str, outputs: dict) -> int:
+        """Overlay one month on its partition, stage it and swap it into the target partition."""
+        self._check(outputs)
+        stage = self._stage_table(month)
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            client = self._client()
+            try:
+                table = self.to_arrow(self._overlay(outputs, self._existing(client, month)))
+                client.command(f"CREATE TABLE IF NOT EXISTS {stage} AS {self.table}")
+                client.command(f"TRUNCATE TABLE {stage}")
+                if table.num_rows:
+                    client.insert_arrow(stage, table,
+                                        settings={'max_insert_block_size': max(table.num_rows, 1 << 20)})
+                database, _, name = stage.rpartition('.')
+                database = f"'{database}'" if database else 'currentDatabase()'
+                parts = client.command(
+                    f"SELECT count() FROM system.parts "
+                    f"WHERE database = {database} AND table = '{name}' AND active"
+                )
+                if int(parts) > 1:
+                    client.command(f"OPTIMIZE TABLE {stage} FINAL")
+                client.command(f"ALTER TABLE {self.table} REPLACE PARTITION {month} FROM {stage}")
+                client.command(f"DROP TABLE IF EXISTS {stage}")
+            except Exception:
+                self._local.client = None
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+            self.log.append({'month': month, 'rows': table.num_rows, 'attempts': attempt + 1,
+                             'seconds': time.perf_counter() - start})
+            return table.num_rows
+
+    def _submit(self, month: str, outputs: dict):
+        if self._started is None:
+            self._started = time.perf_counter()
+        if month in self._futures and not self._futures[month].done():
+            self._futures[month].result()
+        self._futures[month] = self._pool.submit(self._write_month, month, outputs)
+        # Bound the months held in memory while the producer runs ahead.
+        running = [f for f in self._futures.values() if not f.done()]
+        if len(running) > 2 * self.workers:
+            wait(running[:len(running) - 2 * self.workers])
+
+    def write(self, outputs: dict):
+        """Write whole panels: every month they cover replaces its partition."""
+        for month, a, b in month_bounds(next(iter(outputs.values())).index):
+            self._submit(month, {name: panel.iloc[a:b] for name, panel in outputs.items()})
+        return self.flush()
+
+    def write_tile(self, tile: dict):
+        """Buffer one tile of consecutive dates; months it completes are written."""
+        for month, a, b in month_bounds(next(iter(tile.values())).index):
+            self._pending.setdefault(month, []).append({name: panel.iloc[a:b] for name, panel in tile.items()})
+        last = max(self._pending)
+        for month in sorted(m for m in self._pending if m < last):
+            self._submit(month, _concat(self._pending.pop(month)))
+
+    def flush(self) -> dict:
+        """Write buffered months, wait for every month and return the run stats."""
+        for month in sorted(self._pending):
+            self._submit(month, _concat(self._pending.pop(month)))
+        failed = {}
+        for month, future in self._futures.items():
+            try:
+                future.result()
+            except Exception as exc:
+                failed[month] = exc
+        self._futures = {}
+        if failed:
+            months = ', '.join(sorted(failed))
+            raise RuntimeError(f"Failed to write months {months}") from next(iter(failed.values()))
+        return self.stats()
+
+    # -------------------------------- reporting --------------------------------
+
+    def stats(self) -> dict:
+        rows = sum(entry['rows'] for entry in self.log)
+        seconds = time.perf_counter() - self._started if self._started is not None else 0.0
+        return {
+            'months': len(self.log),
+            'rows': rows,
+            'retries': sum(entry['attempts'] - 1 for entry in self.log),
+            'seconds': seconds,
+            'rows_per_sec': rows / seconds if seconds else 0.0,
+        }
+
+    def report(self) -> pd.DataFrame:
+        """Rows, attempts, seconds and rows/sec of every written month."""
+        frame = pd.DataFrame(self.log, columns=['month', 'rows', 'attempts', 'seconds'])
+        frame['rows_per_sec'] = frame['rows'] / frame['seconds']
+        return frame.sort_values('month').set_index('month')
+
+
+def _concat(pieces: list) -> dict:
+    if len(pieces) == 1:
+        return pieces[0]
+    return {name: pd.concat([p[name] for p in pieces]) for name in pieces[0]}
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The engine and the Streamlit app import their sibling modules by bare name.
+for path in ('database/functions', 'app/Quantlib'):
+    sys.path.insert(0, os.path.join(ROOT, path))
+
+
+@pytest.fixture(scope='session')
+def panels():
+    """Small random-walk OHLCV panels (300 dates × 60 stocks) with late listings and suspensions as NaN."""
+    rng = np.random.default_rng(7)
+    n_dates, n_stocks = 300, 60
+    index = pd.bdate_range('2010-01-04', periods=n_dates, name='trade_date')
+    columns = pd.Index([f'{i:06d}.{"SH" if i % 2 else "SZ"}' for i in range(n_stocks)], name='stock_code')
+    shape = (n_dates, n_stocks)
+
+    close = rng.uniform(3, 80, n_stocks) * np.exp(np.cumsum(rng.normal(0, 0.02, shape), axis=0))
+    open_ = close * np.exp(rng.normal(0, 0.008, shape))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, shape)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, shape)))
+    volume = rng.lognormal(13, 0.8, n_stocks) * rng.lognormal(0, 0.5, shape)
+    vwap = np.clip((open_ + high + low + close) / 4 * np.exp(rng.normal(0, 0.002, shape)), low, high)
+
+    listed = np.where(rng.random(n_stocks) < 0.2, rng.integers(0, n_dates, n_stocks), 0)
+    missing = np.arange(n_dates)[:, None] < listed
+    for row, col in zip(*np.nonzero(rng.random(shape) < 0.01)):
+        missing[row:row + rng.integers(1, 21), col] = True
+
+    frame = lambda a: pd.DataFrame(np.where(missing, np.nan, a), index=index, columns=columns)
+    data = {
+        'open': frame(open_), 'high': frame(high), 'low': frame(low), 'close': frame(close),
+        'volume': frame(volume), 'vwap': frame(vwap), 'amount': frame(volume * vwap),
+        'cap': frame(close * rng.lognormal(21, 1, n_stocks)),
+    }
+    sector = rng.integers(0, 31, n_stocks)
+    data['sector'] = pd.Series(sector, index=columns)
+    data['industry'] = pd.Series(sector * 4 + rng.integers(0, 4, n_stocks), index=columns)
+    data['subindustry'] = pd.Series(data['industry'].to_numpy() * 2 + rng.integers(0, 2, n_stocks), index=columns)
+    return data
@@ -0,0 +1,27 @@
+"""Benchmark regression gate."""
+
+from alpha101_benchmark import compare, main
+
+
+def result(seconds, peak=1024):
+    return {'seconds': seconds, 'peak_bytes': peak}
+
+
+def test_compare_flags_slowdowns_beyond_threshold():
+    report = compare({'sum': result(1.3), 'rank': result(1.1), 'new': result(1.0)},
+                     {'sum': result(1.0), 'rank': result(1.0)}, threshold=0.2)
+    assert list(report.index) == ['sum', 'rank']
+    assert report['regression'].tolist() == [True, False]
+
+
+def test_compare_without_overlap_keeps_columns():
+    report = compare({'sum': result(1.0)}, {'rank': result(1.0)})
+    assert report.empty
+    assert not report['regression'].any()
+
+
+def test_main_rejects_baseline_without_common_cases(tmp_path, capsys):
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text('{"scale": "small", "results": {"renamed": {"seconds": 1.0, "peak_bytes": 1}}}')
+    assert main(['--scale', 'small', '--repeat', '1', '--no-alphas', '--baseline', str(baseline)]) == 2
+    assert 'No comparable cases' in capsys.readouterr().err
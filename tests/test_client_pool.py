@@ -0,0 +1,91 @@
+"""Bounded ClickHouse client pool."""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('clickhouse_connect')
+
+from clickhouse_connect.driver.exceptions import OperationalError
+
+from client_pool import ClientPool, PooledClient
+from query_runs import RunRegistry
+
+
+class Client:
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.closed = False
+        self.settings = []
+
+    def query(self, sql, settings=None):
+        if self.broken:
+            raise OperationalError('connection reset')
+        self.settings.append(settings)
+        time.sleep(0.02)
+        return self
+
+    def ping(self):
+        return not self.broken
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_is_bounded_and_reuses_clients():
+    pool = ClientPool(Client, size=2)
+    threads = [threading.Thread(target=pool.call, args=('query', 'SELECT 1')) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    info = pool.info()
+    assert info['open'] == 2 and info['created'] == 2
+    assert info['checkouts'] == 8 and info['in_use'] == 0 and info['idle'] == 2
+
+
+def test_nested_checkout_reuses_the_thread_client():
+    pool = ClientPool(Client, size=1, timeout=0.1)
+    with pool.checkout() as outer:
+        with pool.checkout() as inner:
+            assert inner is outer
+        assert pool.call('query', 'SELECT 1') is outer
+
+
+def test_exhausted_pool_times_out():
+    pool = ClientPool(Client, size=1, timeout=0.05)
+    held = threading.Event()
+    done = threading.Event()
+
+    def hold():
+        with pool.checkout():
+            held.set()
+            done.wait(1)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait(1)
+    with pytest.raises(TimeoutError):
+        pool.call('query', 'SELECT 1')
+    done.set()
+    thread.join()
+    assert pool.info()['timeouts'] == 1
+
+
+def test_connection_errors_reconnect_once():
+    clients = iter([Client(broken=True), Client()])
+    pool = ClientPool(lambda: next(clients), size=1)
+    result = pool.call('query', 'SELECT 1')
+    assert not result.broken and pool.info()['reconnects'] == 1
+
+
+def test_pooled_client_tags_queries_of_a_run():
+    pool = ClientPool(Client, size=1)
+    runs = RunRegistry(kill=lambda sql: None)
+    client = PooledClient(pool, runs)
+    client.query('SELECT 1')
+    runs.new_run('session/page')
+    used = client.query('SELECT 2')
+    assert used.settings[0] is None
+    assert used.settings[1]['query_id'].startswith('qdb-')
@@ -0,0 +1,50 @@
+"""Formula compiler: shared subexpressions and evaluation against direct engine calls."""
+
+import numpy as np
+import pytest
+
+from alpha101_engine import Alpha101Engine as E
+from alpha101_expr import compile_formulas, parse
+
+
+def test_common_subexpressions_are_shared():
+    graph = compile_formulas({
+        'a': 'rank(delta(close, 3)) * -1',
+        'b': 'rank(delta(close, 3)) + ts_rank(volume, 5)',
+        'c': 'ts_rank(volume, 5) - correlation(rank(delta(close, 3)), volume, 10)',
+    })
+    report = graph.sharing_report()
+    assert report['operator_calls_saved'] > 0
+    shared = dict(report['top_shared'])
+    assert any('delta' in expr for expr in shared)
+
+
+def test_evaluate_matches_engine_calls(panels):
+    graph = compile_formulas({
+        'a': '-1 * correlation(rank(open), rank(volume), 10)',
+        'b': '((close > open) ? ts_argmax(close, 5) : decay_linear(low, 8))',
+        'c': 'indneutralize(sum(returns, 5), IndClass.industry)',
+    })
+    out = graph.evaluate(panels)
+    d = panels
+    returns = d['close'] / E.delay(d['close'], 1) - 1
+    expected = {
+        'a': -1 * E.correlation(E.rank(d['open']), E.rank(d['volume']), 10),
+        'b': E.if_else(d['close'] > d['open'], E.ts_argmax(d['close'], 5), E.decay_linear(d['low'], 8)),
+        'c': E.indneutralize(E.sum(returns, 5), d['industry']),
+    }
+    for name, panel in expected.items():
+        np.testing.assert_allclose(out[name].to_numpy(dtype=np.float64), panel.to_numpy(dtype=np.float64),
+                                   rtol=1e-9, equal_nan=True, err_msg=name)
+
+
+def test_depths_add_up_along_chains():
+    graph = compile_formulas({'a': 'ts_rank(sum(close, 10), 5)'})
+    assert graph.history() == 14
+
+
+def test_errors():
+    with pytest.raises(SyntaxError):
+        parse('rank(close')
+    with pytest.raises(ValueError):
+        compile_formulas({'x': 'foo(close)'})
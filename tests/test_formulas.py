@@ -0,0 +1,49 @@
+"""Formula library registry and subset compute."""
+
+import numpy as np
+import pytest
+
+from alpha101_expr import GROUPS, INPUTS, compile_formulas
+from alpha101_formulas import AlphaLibrary, default_library
+
+
+def test_registry_covers_every_alpha():
+    library = default_library()
+    assert default_library() is library
+    registry = library.registry()
+    assert len(library) == len(registry) == 101
+    assert list(registry.index) == list(library)
+    assert (registry['lookback'] >= 1).all() and (registry['stages'] >= 1).all()
+    assert library.lookback() == registry['lookback'].max()
+    assert library['alpha_101'].inputs == ('open', 'high', 'low', 'close')
+
+
+def test_select_and_required_inputs():
+    library = default_library()
+    short = library.select(max_lookback=20, groups=False)
+    assert short and all(library[n].lookback <= 20 and not library[n].groups for n in short)
+    price = library.select(inputs=['open', 'high', 'low', 'close'])
+    assert 'alpha_101' in price and all('volume' not in library[n].inputs for n in price)
+    needed = library.required_inputs(short)
+    assert set(needed) <= set(INPUTS) and len(library.select(groups=True)) == 101
+    assert set(library.required_inputs()) == set(INPUTS) | set(GROUPS.values())
+
+
+def test_subset_compute_matches_full_graph(panels):
+    library = default_library()
+    names = ['alpha_006', 'alpha_048', 'alpha_101']
+    expected = compile_formulas().evaluate(panels, names)
+    out = library.compute(panels, names)
+    assert list(out) == names
+    for name in names:
+        np.testing.assert_array_equal(out[name].to_numpy(), expected[name].to_numpy(), err_msg=name)
+    np.testing.assert_array_equal(library['alpha_101'](panels).to_numpy(), expected['alpha_101'].to_numpy())
+    assert library.compute(panels, ['alpha_101'], dtype='float32')['alpha_101'].to_numpy().dtype == np.float32
+
+
+def test_compute_rejects_unknown_alphas_and_missing_inputs(panels):
+    library = AlphaLibrary({'alpha_x': 'rank(volume)'})
+    with pytest.raises(KeyError, match='alpha_y'):
+        library.compute(panels, ['alpha_y'])
+    with pytest.raises(KeyError, match='volume'):
+        library.compute({'close': panels['close']}, ['alpha_x'])
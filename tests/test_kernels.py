@@ -0,0 +1,106 @@
+"""Kernel results against their pandas reference implementations."""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import alpha101_kernels as kernels
+from alpha101_engine import Alpha101Engine as E
+
+# Both sides of the lag-by-lag / cumsum split of the rolling kernels.
+WINDOWS = [1, 5, 20, 21, 60]
+
+
+def assert_frames(actual, expected, rtol=1e-7, atol=1e-9):
+    assert actual.shape == expected.shape
+    a, b = actual.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64)
+    np.testing.assert_array_equal(np.isnan(a), np.isnan(b))
+    np.testing.assert_allclose(a, b, rtol=rtol, atol=atol, equal_nan=True)
+
+
+@pytest.mark.parametrize('window', WINDOWS)
+def test_rolling_sum_matches_pandas(panels, window):
+    x = panels['close']
+    assert_frames(E.sum(x, window), E._ref_sum(x, window))
+
+
+@pytest.mark.parametrize('window', WINDOWS[1:])
+def test_rolling_std_matches_pandas(panels, window):
+    x = panels['close']
+    assert_frames(E.stddev(x, window), E._ref_stddev(x, window), atol=1e-7)
+
+
+@pytest.mark.parametrize('window', [5, 60])
+def test_rolling_std_ignores_inf_silently(window):
+    values = np.arange(200, dtype=np.float64).reshape(100, 2)
+    values[40, 0], values[70, 1] = np.inf, -np.inf
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        out = kernels.rolling_std(values, window)
+    assert np.isnan(out[40:40 + window, 0]).all()
+    assert np.isfinite(out[window - 1:40, 0]).all()
+
+
+# ------------------------------ panel mode ------------------------------
+
+@pytest.mark.parametrize('op', ['ts_argmax', 'ts_rank', 'decay_linear', 'sum', 'stddev', 'ts_min'])
+def test_panel_columns_equal_series_results(panels, op):
+    x = panels['close']
+    panel = getattr(E, op)(x, 10)
+    for column in x.columns[:5]:
+        series = getattr(E, op)(x[column], 10)
+        assert isinstance(series, pd.Series)
+        np.testing.assert_allclose(panel[column].to_numpy(), series.to_numpy(), equal_nan=True)
+
+
+# ---------------------------- rolling kernels ----------------------------
+
+def with_ties(panels):
+    """Close rounded to whole units so that windows hold ties."""
+    return panels['close'].round(0)
+
+
+@pytest.mark.parametrize('window', WINDOWS)
+@pytest.mark.parametrize('op', ['ts_argmax', 'ts_argmin'])
+def test_rolling_argext_matches_pandas(panels, op, window):
+    x = with_ties(panels)
+    assert_frames(getattr(E, op)(x, window), getattr(E, f'_ref_{op}')(x, window))
+
+
+@pytest.mark.parametrize('window', WINDOWS)
+def test_ts_rank_matches_rankdata(panels, window):
+    x = with_ties(panels)
+    assert_frames(E.ts_rank(x, window), E._ref_ts_rank(x, window))
+
+
+@pytest.mark.parametrize('window', WINDOWS)
+def test_decay_linear_matches_pandas(panels, window):
+    x = panels['close']
+    assert_frames(E.decay_linear(x, window), E._ref_decay_linear(x, window))
+
+
+@pytest.mark.parametrize('window', WINDOWS[1:])
+@pytest.mark.parametrize('op', ['correlation', 'covariance'])
+def test_rolling_moments_match_pandas(panels, op, window):
+    x, y = panels['close'], panels['volume']
+    assert_frames(getattr(E, op)(x, y, window), getattr(E, f'_ref_{op}')(x, y, window), rtol=1e-6)
+
+
+# --------------------------- cross-sectional ---------------------------
+
+def test_rank_matches_pandas(panels):
+    x = with_ties(panels)
+    assert_frames(E.rank(x), E._ref_rank(x))
+
+
+def test_scale_matches_pandas(panels):
+    x = panels['close'] - panels['open']
+    assert_frames(E.scale(x, 2.0), E._ref_scale(x, 2.0))
+
+
+@pytest.mark.parametrize('level', ['sector', 'industry'])
+def test_indneutralize_matches_groupby(panels, level):
+    x = panels['close']
+    assert_frames(E.indneutralize(x, panels[level]), E._ref_indneutralize(x, panels[level]))
@@ -0,0 +1,90 @@
+"""On-demand alpha evaluation against the engine on the same panels."""
+
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from lazy_alpha import LazyAlphaEvaluator
+
+ALPHA = 'alpha_101'     # (close - open) / ((high - low) + .001), one-day lookback
+
+
+class Result:
+    def __init__(self, rows):
+        self.result_rows = rows
+
+
+class FakeClient:
+    """Serves the trading-date and daily-bar queries of the evaluator from panels."""
+
+    def __init__(self, panels):
+        fields = ['open', 'high', 'low', 'close']
+        self.long = pd.concat({f: panels[f].stack() for f in fields}, axis=1).reset_index()
+        self.dates = sorted(self.long['trade_date'].unique())
+        self.queries = 0
+
+    def _range(self, sql):
+        start, end = re.search(r"trade_date >= '([\d-]+)' AND (?:t\.)?trade_date <= '([\d-]+)'", sql).groups()
+        return pd.Timestamp(start), pd.Timestamp(end)
+
+    def query(self, sql):
+        self.queries += 1
+        start, end = self._range(sql)
+        return Result([(d,) for d in self.dates if start <= d <= end])
+
+    def query_df(self, sql):
+        self.queries += 1
+        start, end = self._range(sql)
+        rows = self.long[(self.long['trade_date'] >= start) & (self.long['trade_date'] <= end)]
+        aliases = re.findall(r" AS (\w+)", sql.split('FROM')[0])
+        return rows[aliases].copy()
+
+
+def expected(panels, start, end):
+    p = {k: panels[k].loc[start:end] for k in ('open', 'high', 'low', 'close')}
+    value = (p['close'] - p['open']) / ((p['high'] - p['low']) + .001)
+    return value.stack().dropna()
+
+
+def test_compute_matches_engine_and_caches(panels):
+    client = FakeClient(panels)
+    evaluator = LazyAlphaEvaluator(client)
+    start, end = panels['close'].index[[100, 140]]
+    result = evaluator.compute(ALPHA, start.date(), end.date())
+    got = result.set_index(['trade_date', 'stock_code'])['alpha_val']
+    ref = expected(panels, start, end)
+    np.testing.assert_allclose(got.reindex(ref.index).to_numpy(dtype=np.float64), ref.to_numpy())
+
+    queries = client.queries
+    again = evaluator.compute(ALPHA, start.date(), end.date())
+    pd.testing.assert_frame_equal(again, result)
+    assert client.queries == queries + 1      # trading dates only
+    assert evaluator.stats == {'hits': 1, 'misses': 1}
+
+
+def test_concurrent_compute_keeps_cache_bounded(panels):
+    evaluator = LazyAlphaEvaluator(FakeClient(panels), max_entries=3)
+    dates = panels['close'].index
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(6):
+                a = dates[20 * ((offset + i) % 8)]
+                evaluator.compute(ALPHA, a.date(), (a + pd.Timedelta(days=10)).date())
+        except Exception as exc:     # noqa: BLE001 - surfaced through the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(evaluator._cache) <= 3
+    assert evaluator.stats['hits'] + evaluator.stats['misses'] == 48
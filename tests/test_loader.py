@@ -0,0 +1,99 @@
+"""Month-streaming ClickHouse loader against the panels it was fed."""
+
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+from alpha101_benchmark import synthetic_panels
+from alpha101_engine import Alpha101Engine
+from alpha101_loader import GROUP_TYPES, ClickHouseSource, month_bounds
+
+FIELDS = ['open', 'close', 'volume']
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.result_rows = rows
+
+
+class FakeStream:
+    def __init__(self, batches):
+        self.batches = batches
+
+    def __enter__(self):
+        return iter(self.batches)
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeClient:
+    """Answers the loader's axis, group and month queries from a long table."""
+
+    def __init__(self, panels, batch_rows=200):
+        long = pd.concat({f: panels[f].stack(future_stack=True) for f in FIELDS}, axis=1)
+        long.index.names = ['trade_date', 'stock_code']
+        self.long = long.dropna(how='all').reset_index()
+        self.groups = {g: panels[g] for g in GROUP_TYPES}
+        self.batch_rows = batch_rows
+        self.months = []
+
+    def query(self, sql):
+        column = 'trade_date' if 'DISTINCT t.trade_date' in sql else 'stock_code'
+        return FakeResult([(v,) for v in sorted(self.long[column].unique())])
+
+    def query_df(self, sql):
+        return pd.concat([
+            pd.DataFrame({'stock_code': labels.index, 'sector_type': GROUP_TYPES[g], 'sector_name': labels.values})
+            for g, labels in self.groups.items()
+        ], ignore_index=True)
+
+    def query_arrow_stream(self, sql, use_strings=True):
+        lo, hi = map(pd.Timestamp, re.findall(r"'(\d{4}-\d{2}-\d{2})'", sql))
+        self.months.append(lo.strftime('%Y%m'))
+        # Shuffled, so batches scatter rows across the whole month block.
+        rows = self.long[self.long['trade_date'].between(lo, hi)].sample(frac=1, random_state=0)
+        table = pa.Table.from_pandas(rows, preserve_index=False)
+        return FakeStream(table.to_batches(max_chunksize=self.batch_rows))
+
+
+@pytest.fixture
+def long_panels():
+    return synthetic_panels(40, 90, seed=3, suspension_rate=0.05)
+
+
+def test_month_bounds():
+    dates = pd.DatetimeIndex(['2024-01-30', '2024-01-31', '2024-02-01', '2024-03-04'])
+    assert month_bounds(dates) == [('202401', 0, 2), ('202402', 2, 3), ('202403', 3, 4)]
+
+
+def test_load_matches_source_panels(long_panels):
+    client = FakeClient(long_panels)
+    with ClickHouseSource(client, '2000-01-01', '2100-01-01', fields=FIELDS) as source:
+        out = source.load()
+        assert source.stats['months'] == len(source.months) and source.stats['batches'] > len(source.months)
+    for field in FIELDS:
+        expected = long_panels[field].reindex(index=out[field].index, columns=out[field].columns)
+        assert out[field].to_numpy().dtype == np.dtype(Alpha101Engine.dtype)
+        np.testing.assert_array_equal(out[field].to_numpy(),
+                                      expected.to_numpy(dtype=Alpha101Engine.dtype), err_msg=field)
+    for group in GROUP_TYPES:
+        pd.testing.assert_series_equal(out[group], long_panels[group].reindex(out[group].index),
+                                       check_names=False)
+
+
+def test_read_spans_months_and_prefetches(long_panels):
+    client = FakeClient(long_panels)
+    with ClickHouseSource(client, '2000-01-01', '2100-01-01', fields=FIELDS) as source:
+        _, a, b = source.months[1]
+        out = source.read(['close'], a - 2, b)
+        expected = long_panels['close'].reindex(index=out['close'].index, columns=out['close'].columns)
+        np.testing.assert_array_equal(out['close'].to_numpy(), expected.to_numpy(dtype=Alpha101Engine.dtype))
+        _, c, d = source.months[3]
+        source.read(['close'], c, d)
+        assert 0 not in source._blocks and 2 not in source._blocks
+    assert client.months[:3] == [m for m, _, _ in source.months[:3]]
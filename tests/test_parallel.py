@@ -0,0 +1,27 @@
+"""Process-pool executor against single-process evaluation."""
+
+import numpy as np
+
+from alpha101_expr import compile_formulas, load_formulas
+from alpha101_parallel import ParallelExecutor, _shards
+
+
+def test_shards_cover_range():
+    for size, count in [(10, 3), (3, 8), (300, 4)]:
+        shards = _shards(size, count)
+        assert shards[0][0] == 0 and shards[-1][1] == size
+        assert all(b == c for (_, b), (c, _) in zip(shards, shards[1:]))
+
+
+def test_run_matches_evaluate(panels):
+    names = ['alpha_001', 'alpha_013', 'alpha_048', 'alpha_101']
+    formulas = load_formulas()
+    expected = compile_formulas(formulas).evaluate(panels, names)
+    with ParallelExecutor(formulas, names, workers=2) as executor:
+        out = executor.run(panels)
+        again = executor.run(panels)
+    assert list(out) == names
+    for name in names:
+        np.testing.assert_allclose(out[name].to_numpy(), expected[name].to_numpy(dtype=np.float64),
+                                   rtol=1e-6, atol=1e-9, err_msg=name)
+        np.testing.assert_array_equal(again[name].to_numpy(), out[name].to_numpy())
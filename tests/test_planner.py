@@ -0,0 +1,28 @@
+"""TS/CS stage planner against unstaged evaluation."""
+
+import numpy as np
+
+from alpha101_expr import compile_formulas
+from alpha101_planner import plan_stages
+
+
+def test_execute_matches_evaluate(panels):
+    graph = compile_formulas()
+    plan = plan_stages(graph)
+    expected = graph.evaluate(panels)
+    stages = []
+    out = plan.execute(panels, on_stage=lambda stage, frontier, seconds: stages.append(stage.kind))
+    assert len(stages) == len(plan.stages)
+    for name, panel in expected.items():
+        np.testing.assert_array_equal(np.asarray(out[name], dtype=np.float64),
+                                      np.asarray(panel, dtype=np.float64), err_msg=name)
+
+
+def test_stages_alternate_and_subsets_stay_small():
+    graph = compile_formulas()
+    plan = plan_stages(graph)
+    kinds = [stage.kind for stage in plan.stages]
+    assert all(a != b for a, b in zip(kinds, kinds[1:]))
+    subset = plan_stages(graph, ['alpha_101'])
+    assert len(subset.stages) == 1 and subset.depth('alpha_101') == 1
+    assert subset.peak_values() < plan.peak_values()
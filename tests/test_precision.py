@@ -0,0 +1,46 @@
+"""Engine dtype policy: results are stored in the engine dtype."""
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alpha101_benchmark import operator_cases, synthetic_panels
+from alpha101_engine import Alpha101Engine
+
+PANELS = {k: v.astype(np.float32) if isinstance(v, pd.DataFrame) else v
+          for k, v in synthetic_panels(30, 120).items()}
+CASES = operator_cases(PANELS)
+
+
+@pytest.mark.parametrize('op', list(CASES))
+def test_operators_keep_float32(op):
+    with Alpha101Engine.precision('float32'):
+        out = CASES[op]()
+    assert isinstance(out, pd.DataFrame)
+    assert set(out.dtypes) == {np.dtype(np.float32)}, op
+
+
+def test_precision_restores_previous_dtype():
+    before = Alpha101Engine.dtype
+    with Alpha101Engine.precision('float32'):
+        assert Alpha101Engine.dtype == np.float32
+    assert Alpha101Engine.dtype == before
+
+
+def test_precision_is_per_thread():
+    entered, seen = threading.Event(), {}
+
+    def other_session():
+        entered.wait(5)
+        seen['dtype'] = Alpha101Engine.dtype
+        seen['rank'] = Alpha101Engine.rank(PANELS['close']).to_numpy().dtype
+
+    thread = threading.Thread(target=other_session)
+    thread.start()
+    with Alpha101Engine.precision('float32'):
+        entered.set()
+        thread.join(5)
+        assert Alpha101Engine.rank(PANELS['close']).to_numpy().dtype == np.float32
+    assert seen == {'dtype': np.float64, 'rank': np.float64}
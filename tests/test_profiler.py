@@ -0,0 +1,38 @@
+"""Opt-in operator/alpha profiling."""
+
+import json
+
+from alpha101_engine import Alpha101Engine
+from alpha101_expr import AlphaGraph, compile_formulas
+
+
+def test_profile_records_and_restores(panels):
+    original = Alpha101Engine.__dict__['correlation']
+    compute = AlphaGraph._compute
+    graph = compile_formulas()
+    names = ['alpha_006', 'alpha_101']
+    with Alpha101Engine.profile(track_memory=False) as prof:
+        graph.evaluate(panels, names)
+        with prof.alpha('manual'):
+            Alpha101Engine.sum(panels['close'], 5)
+    assert Alpha101Engine.__dict__['correlation'] is original
+    assert AlphaGraph._compute is compute
+
+    operators = prof.operator_report()
+    # Graph nodes reach the engine through moments; element-wise nodes report by op.
+    assert (operators.loc[['moments', 'sub', 'sum'], 'calls'] >= 1).all()
+    assert abs(operators['share'].sum() - 1) < 1e-9
+    assert (operators['self_seconds'] <= operators['seconds'] + 1e-9).all()
+
+    alphas = prof.alpha_report()
+    assert set(names) | {'manual'} <= set(alphas.index)
+    assert alphas.loc['manual', 'calls'] == 1
+    assert (alphas['exclusive_seconds'] <= alphas['seconds'] + 1e-9).all()
+    payload = json.loads(prof.to_json())
+    assert {r['alpha'] for r in payload['alphas']} == set(alphas.index)
+
+
+def test_profile_tracks_memory(panels):
+    with Alpha101Engine.profile() as prof:
+        Alpha101Engine.rank(panels['close'])
+    assert prof.operator_report().loc['rank', 'peak_bytes'] > 0
@@ -0,0 +1,125 @@
+"""QueryCache and the @cached decorator on a stand-in for QuantDB."""
+
+import datetime
+
+import pandas as pd
+import pytest
+
+from query_cache import QueryCache, cached, uncached
+from query_runs import QueryCancelled
+
+
+class Calendar:
+    def __init__(self, day):
+        self.day = day
+        self.error = None
+
+    def latest(self):
+        if self.error is not None:
+            raise self.error
+        return self.day
+
+
+class FakeDB:
+    def __init__(self, latest='2024-06-28'):
+        self.cache = QueryCache(max_bytes=1 << 20, latest_poll=0)
+        self.calendar = Calendar(latest)
+        self.calls = 0
+        self.fail = False
+
+    def get_latest_trade_date(self):
+        """Page-facing lookup with QuantDB's fallback to today."""
+        try:
+            return self.calendar.latest()
+        except Exception:
+            return datetime.date.today()
+
+    @cached(ttl=600)
+    def frame(self, date):
+        self.calls += 1
+        return pd.DataFrame({'date': [str(date)], 'n': [self.calls]})
+
+    @cached(ttl=600)
+    def snapshot(self, code, date):
+        self.calls += 1
+        try:
+            if self.fail:
+                raise ConnectionError('transient')
+            return {'code': code, 'calls': self.calls}
+        except Exception:
+            return uncached({})
+
+
+def test_hits_are_copies():
+    db = FakeDB()
+    first = db.frame('2024-06-03')
+    first.loc[0, 'n'] = -1
+    again = db.frame(pd.Timestamp('2024-06-03'))    # normalized to the same key
+    assert db.calls == 1 and again.loc[0, 'n'] == 1
+    assert db.cache.info()['hits'] == 1
+
+
+def test_fallback_results_are_not_cached():
+    db = FakeDB()
+    db.fail = True
+    assert db.snapshot('000001.SZ', '2024-06-03') == {}
+    assert db.cache.info()['entries'] == 0
+    db.fail = False
+    assert db.snapshot('000001.SZ', '2024-06-03') == {'code': '000001.SZ', 'calls': 2}
+    assert db.snapshot('000001.SZ', '2024-06-03') == {'code': '000001.SZ', 'calls': 2}
+
+
+def test_fallback_is_unwrapped_without_cache():
+    db = FakeDB()
+    db.cache, db.fail = None, True
+    assert db.snapshot('000001.SZ', '2024-06-03') == {}
+
+
+def test_latest_date_results_are_invalidated_when_it_advances():
+    db = FakeDB()
+    db.frame('2024-06-27')
+    db.frame('2024-06-28')
+    db.calendar.day = '2024-07-01'
+    db.frame('2024-06-27')
+    db.frame('2024-06-28')
+    assert db.calls == 3                            # only the then-latest date is refetched
+    assert db.cache.info()['invalidated'] == 1
+
+
+def test_superseded_runs_are_not_cached():
+    class Runs:
+        def superseded(self):
+            return True
+
+    db = FakeDB()
+    db.runs = Runs()
+    db.frame('2024-06-03')
+    db.frame('2024-06-03')
+    assert db.calls == 2
+
+
+def test_failed_latest_lookup_does_not_poison_the_cache():
+    db = FakeDB()
+    db.frame('2024-06-28')
+    db.calendar.error = ConnectionError('calendar refresh failed')
+    db.frame('2024-06-28')                          # still served from the cache
+    db.frame('2024-06-25')                          # computed but not cached
+    info = db.cache.info()
+    assert info['latest_date'] == '2024-06-28' and info['invalidated'] == 0 and info['entries'] == 1
+    db.calendar.error = None
+    db.frame('2024-06-25')
+    db.frame('2024-06-25')
+    db.frame('2024-06-28')
+    assert db.calls == 3
+    db.calendar.day = '2024-07-01'
+    db.frame('2024-06-28')                          # the live entry still expires with the date
+    assert db.calls == 4
+
+
+def test_cancelled_latest_lookup_propagates():
+    db = FakeDB()
+    db.frame('2024-06-28')
+    db.calendar.error = QueryCancelled('superseded')
+    with pytest.raises(QueryCancelled):
+        db.frame('2024-06-25')
+    assert db.calls == 1 and db.cache.info()['latest_date'] == '2024-06-28'
@@ -0,0 +1,135 @@
+"""Page runs, query cancellation and QuantDB.fetch_many deadlines."""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from query_runs import QueryCancelled, RunRegistry
+
+
+class Server:
+    """Queries block until released or killed by query_id."""
+
+    def __init__(self):
+        self.killed = []
+        self.release = threading.Event()
+        self.runs = RunRegistry(kill=self.kill)
+        self._running = {}
+
+    def kill(self, sql):
+        ids = re.findall(r"'([^']+)'", sql)
+        self.killed.extend(ids)
+        for qid in ids:
+            if qid in self._running:
+                self._running[qid].set()
+
+    def query(self, sql, seconds=None):
+        with self.runs.track(sql) as query_id:
+            if seconds is not None:
+                time.sleep(seconds)
+                return sql
+            killed = self._running[query_id] = threading.Event()
+            while not (killed.is_set() or self.release.is_set()):
+                time.sleep(0.01)
+            if killed.is_set():
+                raise RuntimeError(f"query {query_id} killed")
+            return sql
+
+
+def test_new_run_kills_previous_run_queries():
+    server = Server()
+    first = {}
+
+    def page():
+        first['run'] = server.runs.new_run('session/page')
+        try:
+            server.query('SELECT 1')
+        except RuntimeError:
+            pass
+        with pytest.raises(QueryCancelled):
+            server.query('SELECT 2', seconds=0)
+
+    thread = threading.Thread(target=page)
+    thread.start()
+    while not server.runs.info()['inflight']:
+        time.sleep(0.01)
+    server.runs.new_run('session/page')
+    thread.join(5)
+    info = server.runs.info()
+    assert len(server.killed) == 1 and info['cancelled'] == 1 and info['rejected'] == 1
+    assert info['inflight'] == 0 and info['cancelled_seconds'] > 0
+
+
+def test_cancel_task_only_kills_that_task():
+    server = Server()
+    task, other = threading.Event(), threading.Event()
+    outcome = {}
+
+    def query(name):
+        try:
+            outcome[name] = server.query('SELECT a')
+        except RuntimeError:
+            outcome[name] = 'killed'
+
+    workers = [threading.Thread(target=server.runs.bind(query, None, t), args=(name,))
+               for name, t in (('task', task), ('other', other))]
+    for worker in workers:
+        worker.start()
+    while server.runs.info()['inflight'] < 2:
+        time.sleep(0.01)
+    server.runs.cancel_task(task)
+    assert len(server.killed) == 1
+    server.release.set()
+    for worker in workers:
+        worker.join(5)
+    assert outcome == {'task': 'killed', 'other': 'SELECT a'}
+    with pytest.raises(QueryCancelled):
+        server.runs.bind(lambda: server.query('SELECT b', seconds=0), None, task)()
+
+
+@pytest.fixture
+def db():
+    pytest.importorskip('clickhouse_connect')
+    from QuantDB import QuantDB
+    server = Server()
+    db = object.__new__(QuantDB)
+    db.runs, db.server = server.runs, server
+    db._executor = ThreadPoolExecutor(max_workers=1)
+    yield db
+    server.release.set()
+    db._executor.shutdown(wait=True)
+
+
+def test_fetch_many_deadline_starts_when_the_query_runs(db):
+    calls = {k: (db.server.query, f'SELECT {k}', 0.3) for k in 'abc'}
+    result = db.fetch_many(calls, timeout=0.6)     # queued behind each other: 0.9s in total
+    assert result == {k: f'SELECT {k}' for k in 'abc'}
+
+
+def test_fetch_many_kills_timed_out_queries(db):
+    with pytest.raises(TimeoutError):
+        db.fetch_many({'slow': (db.server.query, 'SELECT slow'), 'queued': (db.server.query, 'SELECT q')},
+                      timeout=0.2)
+    assert len(db.server.killed) == 1
+    assert db.server.runs.info()['cancelled'] == 1
+
+
+def test_calendar_lookups_propagate_cancellation():
+    pytest.importorskip('clickhouse_connect')
+    from QuantDB import QuantDB
+
+    class Calendar:
+        def __getattr__(self, name):
+            def lookup(*args):
+                raise QueryCancelled('superseded')
+            return lookup
+
+    db = object.__new__(QuantDB)
+    db.calendar = Calendar()
+    for call in (db.get_latest_trade_date, lambda: db.get_previous_trading_date('2024-06-28'),
+                 lambda: db._window_start('2024-06-28', 20, 30)):
+        with pytest.raises(QueryCancelled):
+            call()
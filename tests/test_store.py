@@ -0,0 +1,57 @@
+"""Memory-mapped panel store: appends, relayouts and group labels."""
+
+import numpy as np
+import pandas as pd
+
+from alpha101_store import PanelStore
+
+
+def head(panels, rows, stocks=None):
+    out = {}
+    for name, value in panels.items():
+        if isinstance(value, pd.DataFrame):
+            value = value.iloc[rows]
+            out[name] = value if stocks is None else value.iloc[:, stocks]
+        else:
+            out[name] = value
+    return out
+
+
+def test_appends_match_source(tmp_path, panels):
+    store = PanelStore.create(tmp_path, head(panels, slice(0, 100), slice(0, 40)))
+    for start in range(100, 300, 50):
+        store.append(head(panels, slice(start, start + 50)))
+    assert store.meta['generation'] > 1     # new stocks outgrew the reserve
+    loaded = PanelStore(tmp_path).load(['close'])['close']
+    expected = panels['close'].copy()
+    expected.iloc[:100, 40:] = np.nan
+    np.testing.assert_array_equal(loaded.reindex(columns=expected.columns).to_numpy(), expected.to_numpy())
+
+
+def test_group_labels_keep_their_type(tmp_path, panels):
+    data = head(panels, slice(0, 20))
+    data['subindustry'] = data['subindustry'].map(lambda code: f'SW3-{code}')
+    PanelStore.create(tmp_path, data)
+    groups = PanelStore(tmp_path).groups
+    pd.testing.assert_series_equal(groups['industry'], panels['industry'], check_names=False)
+    assert groups['sector'].dtype == panels['sector'].dtype
+    assert list(groups['subindustry']) == list(data['subindustry'])
+
+
+def test_appended_labels_overwrite_covered_stocks(tmp_path, panels):
+    store = PanelStore.create(tmp_path, head(panels, slice(0, 20)))
+    moved = panels['sector'].iloc[:3] + 100
+    store.append({'close': panels['close'].iloc[20:25], 'sector': moved})
+    sector = PanelStore(tmp_path).groups['sector']
+    assert sector.iloc[:3].tolist() == moved.tolist()
+    assert sector.iloc[3:].tolist() == panels['sector'].iloc[3:].tolist()
+
+
+def test_reader_survives_relayout(tmp_path, panels):
+    store = PanelStore.create(tmp_path, head(panels, slice(0, 100), slice(0, 40)))
+    reader = PanelStore(tmp_path)
+    store.append(head(panels, slice(100, 120)))         # 60 stocks > 44 columns: new generation
+    assert store.meta['generation'] == reader.meta['generation'] + 1
+    # The reader has not touched 'volume' yet; its generation is unlinked by now.
+    expected = panels['volume'].iloc[:100, :40].to_numpy()
+    np.testing.assert_array_equal(reader.panel('volume').to_numpy(), expected)
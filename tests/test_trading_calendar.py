@@ -0,0 +1,90 @@
+"""In-memory trading calendar lookups and incremental refresh."""
+
+import datetime
+import re
+
+import pandas as pd
+import pytest
+
+from trading_calendar import TradingCalendar
+
+
+class Result:
+    def __init__(self, rows):
+        self.result_rows = rows
+
+
+class Client:
+    def __init__(self, days):
+        self.days = list(days)
+        self.queries = []
+
+    def query(self, sql):
+        self.queries.append(sql)
+        if 'max(trade_date)' in sql:
+            return Result([(self.days[-1],)])
+        after = sql.split("trade_date > '")[1][:10] if "trade_date > '" in sql else None
+        return Result([(d,) for d in self.days if after is None or str(d) > after])
+
+
+DAYS = [d.date() for d in pd.bdate_range('2024-01-02', '2024-03-29')]
+
+
+@pytest.fixture
+def calendar():
+    return TradingCalendar(Client(DAYS), refresh_interval=3600)
+
+
+def test_lookups(calendar):
+    assert calendar.latest() == DAYS[-1]
+    assert calendar.previous('2024-01-08') == datetime.date(2024, 1, 5)
+    assert calendar.previous('2024-01-06') == datetime.date(2024, 1, 5)    # Saturday
+    assert calendar.next('2024-01-05') == datetime.date(2024, 1, 8)
+    assert calendar.previous(DAYS[0]) is None and calendar.next(DAYS[-1]) is None
+    assert '2024-01-08' in calendar and '2024-01-06' not in calendar
+
+
+def test_offsets_and_windows(calendar):
+    assert calendar.offset('2024-01-10', -3) == datetime.date(2024, 1, 5)
+    assert calendar.offset('2024-01-06', 1) == datetime.date(2024, 1, 8)    # from the previous day
+    assert calendar.offset('2024-01-10', -1000) == DAYS[0]
+    assert calendar.offset('2030-01-01', 5) == DAYS[-1]
+    start = calendar.window_start('2024-02-29', 20)
+    assert len(calendar.between(start, '2024-02-29')) == 20
+
+
+def test_refresh_appends_new_days_only(calendar):
+    client = calendar.client
+    assert len(calendar) == len(DAYS)
+    client.days.append(datetime.date(2024, 4, 1))
+    assert calendar.latest() == DAYS[-1]               # within the refresh interval
+    calendar.refresh(force=True)
+    assert calendar.latest() == datetime.date(2024, 4, 1)
+    assert len(calendar) == len(DAYS) + 1
+    assert "trade_date > '2024-03-29'" in client.queries[-1]
+
+
+def test_kline_window_offsets_follow_the_market_calendar(calendar):
+    pytest.importorskip('clickhouse_connect')
+    from QuantDB import QuantDB
+
+    suspended = {datetime.date(2024, 2, 5), datetime.date(2024, 2, 6), datetime.date(2024, 2, 14)}
+    bars = pd.DataFrame({'trade_date': [d for d in DAYS if d not in suspended]})
+    bars['close'] = range(1, len(bars) + 1)
+    bars['pct_chg'] = 0.0
+
+    class Bars:
+        def query_df(self, sql):
+            lo, hi = re.findall(r"trade_date [<>]= '([\d-]+)'", sql)
+            dates = bars['trade_date'].astype(str)
+            return bars[(dates >= lo) & (dates <= hi)].reset_index(drop=True)
+
+    db = object.__new__(QuantDB)
+    db.cache, db.calendar, db.client = None, calendar, Bars()
+    df = db.get_kline_window('000001.SZ', '2024-02-09', days_before=5, days_after=5)
+    offsets = dict(zip(df['trade_date'].dt.date, df['day_offset']))
+    assert offsets[datetime.date(2024, 2, 9)] == 0
+    assert offsets[datetime.date(2024, 2, 2)] == -5 and offsets[datetime.date(2024, 2, 16)] == 5
+    assert sorted(offsets.values()) == [-5, -2, -1, 0, 1, 2, 4, 5]      # suspended days leave gaps
+    center = df.loc[df['day_offset'] == 0, 'norm_close']
+    assert center.tolist() == [1.0]
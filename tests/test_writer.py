@@ -0,0 +1,105 @@
+"""Month-partition writer against an in-memory partitioned table."""
+
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from alpha101_writer import FactorWriter
+
+ALPHAS = ['alpha_001', 'alpha_002', 'alpha_003']
+
+
+class FakeClickHouse:
+    """Partitions of one table as long frames; staging tables swap in whole."""
+
+    def __init__(self):
+        self.partitions = {}
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def client(self):
+        return self
+
+    def query_df(self, sql):
+        if sql.startswith('DESCRIBE'):
+            return pd.DataFrame({'name': ['trade_date', 'stock_code'] + ALPHAS})
+        month = re.search(r'toYYYYMM\(trade_date\) = (\d+)', sql).group(1)
+        with self.lock:
+            empty = pd.DataFrame(columns=['trade_date', 'stock_code'] + ALPHAS)
+            return self.partitions.get(month, empty).copy()
+
+    def command(self, sql):
+        with self.lock:
+            if sql.startswith('TRUNCATE'):
+                self.stages[sql.split()[-1]] = []
+            elif 'system.parts' in sql:
+                return 1
+            elif 'REPLACE PARTITION' in sql:
+                month, stage = re.search(r'REPLACE PARTITION (\d+) FROM (\S+)', sql).groups()
+                frames = [t.to_pandas() for t in self.stages[stage]]
+                self.partitions[month] = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def insert_arrow(self, table, data, settings=None):
+        with self.lock:
+            self.stages[table].append(data)
+
+    def panel(self, name):
+        frame = pd.concat(self.partitions.values(), ignore_index=True)
+        frame['trade_date'] = pd.to_datetime(frame['trade_date'])
+        return frame.pivot(index='trade_date', columns='stock_code', values=name).astype(np.float64)
+
+
+def assert_stored(db, name, expected):
+    stored = db.panel(name)
+    assert list(stored.index) == list(expected.index)
+    assert list(stored.columns) == list(expected.columns)
+    np.testing.assert_array_equal(stored.to_numpy(), expected.to_numpy())
+
+
+def panels(seed, dates, stocks=('000001.SZ', '000002.SZ', '600000.SH')):
+    rng = np.random.default_rng(seed)
+    index = pd.DatetimeIndex(dates, name='trade_date')
+    return {name: pd.DataFrame(rng.normal(size=(len(index), len(stocks))), index=index, columns=list(stocks))
+            for name in ALPHAS}
+
+
+def test_write_roundtrip():
+    db = FakeClickHouse()
+    outputs = panels(0, pd.bdate_range('2024-01-02', '2024-03-29'))
+    outputs['alpha_001'].iloc[3, 1] = np.inf
+    with FactorWriter(db.client, workers=2) as writer:
+        stats = writer.write(outputs)
+    assert stats['months'] == 3 and set(db.partitions) == {'202401', '202402', '202403'}
+    expected = outputs['alpha_001'].where(np.isfinite(outputs['alpha_001']))
+    assert_stored(db, 'alpha_001', expected)
+
+
+def test_partial_write_keeps_other_dates_and_alphas():
+    db = FakeClickHouse()
+    january = pd.bdate_range('2024-01-02', '2024-01-31')
+    full = panels(0, january)
+    with FactorWriter(db.client) as writer:
+        writer.write(full)
+        # Rewrite one alpha on the last week only.
+        update = {'alpha_002': panels(1, january[-5:])['alpha_002']}
+        update['alpha_002'].iloc[0, 0] = np.nan
+        writer.write(update)
+
+    for name in ('alpha_001', 'alpha_003'):
+        assert_stored(db, name, full[name])
+    expected = full['alpha_002'].copy()
+    expected.iloc[-5:] = update['alpha_002'].to_numpy()
+    assert_stored(db, 'alpha_002', expected)
+
+
+def test_unknown_alpha_is_rejected_without_retries():
+    db = FakeClickHouse()
+    with FactorWriter(db.client, backoff=60) as writer:
+        with pytest.raises(RuntimeError) as err:
+            writer.write({'alpha_999': panels(0, pd.bdate_range('2024-01-02', '2024-01-05'))['alpha_001']})
+    assert isinstance(err.value.__cause__, KeyError)